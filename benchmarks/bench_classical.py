@@ -0,0 +1,301 @@
+"""Benchmarks of the workout implementations against the statsmodels/scipy
+backed ones
+
+Measures latency, throughput and peak memory of every public test for
+a range of sample sizes (and batch sizes for the batch tests) and writes the
+results as JSON. Passing a previous results file with --baseline reports
+cases which got slower and exits with status 1 when there are any.
+
+usage:
+    python benchmarks/bench_classical.py --sizes 10 1000 100000 \
+        --batch-sizes 1 100 10000 --output results.json
+    python benchmarks/bench_classical.py --baseline results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "src"))
+
+import classical.categorical as categorical  # noqa: E402
+import classical.means as means  # noqa: E402
+import classical.proportions as proportions  # noqa: E402
+import classical.workout.categorical as workout_categorical  # noqa: E402
+import classical.workout.means as workout_means  # noqa: E402
+import classical.workout.proportions as workout_proportions  # noqa: E402
+
+BACKENDS = {
+    "statsmodels": {"means": means, "proportions": proportions,
+                    "categorical": categorical},
+    "workout": {"means": workout_means, "proportions": workout_proportions,
+                "categorical": workout_categorical},
+}
+
+
+def normal_sample(rng, size):
+    return (rng.normal(50, 1, size),)
+
+
+def two_normal_samples(rng, size):
+    return (rng.normal(50, 1, size), rng.normal(50.1, 1, size))
+
+
+def three_normal_samples(rng, size):
+    return tuple(rng.normal(50 + i / 10, 1, size) for i in range(3))
+
+
+def binary_sample(rng, size):
+    return (rng.integers(0, 2, size),)
+
+
+def two_binary_samples(rng, size):
+    return (rng.integers(0, 2, size), rng.integers(0, 2, size))
+
+
+def labelled_sample(rng, size):
+    return (rng.normal(50, 1, size), rng.integers(0, 3, size))
+
+
+def group_counts(rng, size):
+    nobs = np.full(size, 1000)
+    return (rng.binomial(nobs, 0.3), nobs)
+
+
+def group_count_batches(rng, size):
+    nobs = np.full((size, 10), 1000)
+    return (rng.binomial(nobs, 0.3), nobs)
+
+
+def contingency_table(rng, size):
+    return (rng.integers(50, 100, (size, 4)),)
+
+
+def ragged_tables(rng, size):
+    nrows = rng.integers(3, 6, size)
+    offsets = np.cumsum(nrows) - nrows
+    return (rng.integers(50, 100, (nrows.sum(), 4)), offsets)
+
+
+def count_batches(rng, size):
+    nobs1, nobs2 = np.full(size, 1000), np.full(size, 1200)
+    return (rng.binomial(nobs1, 0.3), nobs1, rng.binomial(nobs2, 0.3), nobs2)
+
+
+# case name (the classical.dispatch threshold name), function, module,
+# input builder, extra keyword arguments, whether the size is a batch size,
+# and how many leading arguments classical.dispatch counts as the input
+# size
+CASES = [
+    ("one_mean_conf_interval", "one_mean_conf_interval", "means",
+     normal_sample, {}, False, 1),
+    ("one_mean_hypothesis", "one_mean_hypothesis", "means", normal_sample,
+     {"null_val": 50}, False, 1),
+    ("two_means_diff_conf_interval", "two_means_diff_conf_interval",
+     "means", two_normal_samples, {"conf_level": 0.95, "pooled": True},
+     False, 2),
+    ("two_means_hypothesis", "two_means_hypothesis", "means",
+     two_normal_samples, {"pooled": True}, False, 2),
+    ("multiple_mean_hypothesis", "multiple_mean_hypothesis", "means",
+     three_normal_samples, {}, False, 3),
+    ("multiple_mean_hypothesis_by_label",
+     "multiple_mean_hypothesis_by_label", "means", labelled_sample,
+     {"n_groups": 3}, False, 1),
+    ("one_prop_conf_interval", "one_prop_conf_interval", "proportions",
+     binary_sample, {}, False, 1),
+    ("one_prop_hypothesis", "one_prop_hypothesis", "proportions",
+     binary_sample, {"null_val": 0.5}, False, 1),
+    ("two_props_diff_conf_interval", "two_props_diff_conf_interval",
+     "proportions", two_binary_samples, {"conf_level": 0.95}, False, 2),
+    ("two_props_hypothesis", "two_props_hypothesis", "proportions",
+     two_binary_samples, {}, False, 2),
+    ("one_categorical_hypothesis", "one_categorical_hypothesis",
+     "categorical", group_counts, {}, False, 1),
+    ("one_categorical_hypothesis_batch", "one_categorical_hypothesis",
+     "categorical", group_count_batches, {}, True, 1),
+    ("two_categorical_hypothesis", "two_categorical_hypothesis",
+     "categorical", contingency_table, {}, False, 1),
+    ("two_categorical_hypothesis_ragged", "two_categorical_hypothesis_ragged",
+     "categorical", ragged_tables, {}, True, 1),
+    ("two_props_diff_conf_interval_batch",
+     "two_props_diff_conf_interval_batch", "proportions", count_batches,
+     {"conf_level": 0.95}, True, 1),
+    ("two_props_hypothesis_batch", "two_props_hypothesis_batch",
+     "proportions", count_batches, {}, True, 1),
+]
+
+
+def measure(func, args, kwargs, min_time: float, max_repeats: int) -> dict:
+    """Times repeated calls of func and measures peak memory of one call
+
+    Args:
+        func (callable): benchmarked function
+        args (tuple): positional arguments
+        kwargs (dict): keyword arguments
+        min_time (float): minimum total time spent in repeated calls
+        max_repeats (int): maximum number of timed calls
+
+    Returns:
+        dict: latency statistics in seconds and peak memory in bytes
+    """
+    func(*args, **kwargs)
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < max_repeats and (
+            time.perf_counter() - start < min_time or len(timings) < 3):
+        call_start = time.perf_counter()
+        func(*args, **kwargs)
+        timings.append(time.perf_counter() - call_start)
+
+    tracemalloc.start()
+    func(*args, **kwargs)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"median": float(np.median(timings)),
+            "min": float(np.min(timings)),
+            "repeats": len(timings),
+            "peak_memory": peak_memory}
+
+
+def run(sizes: list, batch_sizes: list, cases: list, min_time: float,
+        max_repeats: int, seed: int) -> list:
+    """Runs the benchmark cases for every backend and size
+
+    Returns:
+        list: one result record per case, backend and size
+    """
+    results = []
+    for (name, function, module, build_input, kwargs, batched,
+         n_samples) in CASES:
+        if cases and name not in cases:
+            continue
+        for size in (batch_sizes if batched else sizes):
+            args = build_input(np.random.default_rng(seed), size)
+            # the input size classical.dispatch compares with thresholds
+            dispatch_size = int(sum(np.size(arg) for arg in args[:n_samples]))
+            for backend, modules in BACKENDS.items():
+                func = getattr(modules[module], function, None)
+                if func is None:
+                    continue
+                timing = measure(func, args, kwargs, min_time, max_repeats)
+                record = {"case": name, "backend": backend,
+                          "batched": batched, "size": size,
+                          "dispatch_size": dispatch_size}
+                record.update(timing)
+                record["throughput"] = size / timing["median"]
+                results.append(record)
+                print("{case:<36} {backend:<12} {size:>10} "
+                      "{median:>12.3e}s {peak_memory:>12}B".format(**record),
+                      file=sys.stderr)
+    return results
+
+
+def crossovers(results: list) -> dict:
+    """Finds for every case the smallest input size from which the
+    statsmodels backend is faster than workout for all larger sizes
+
+    Sizes are counted as classical.dispatch counts them (e.g. the values of
+    both samples of a two sample test), and
+    classical.dispatch.load_thresholds reads these as dispatch thresholds.
+
+    Returns:
+        dict: case name to crossover size (None when workout is faster at
+              the largest size)
+    """
+    timings = {}
+    for record in results:
+        key = (record["case"], record["dispatch_size"])
+        timings.setdefault(key, {})[record["backend"]] = record["median"]
+    crossover = {}
+    for case in sorted({record["case"] for record in results}):
+        sizes = sorted(size for (name, size) in timings if name == case)
+        crossover[case] = None
+        for size in reversed(sizes):
+            timing = timings[(case, size)]
+            if len(timing) < 2 or timing["statsmodels"] >= timing["workout"]:
+                break
+            crossover[case] = size
+    return crossover
+
+
+def compare(results: list, baseline: list, tolerance: float) -> list:
+    """Compares median latencies with a baseline run
+
+    Args:
+        results (list): current result records
+        baseline (list): baseline result records
+        tolerance (float): allowed relative slow down
+
+    Returns:
+        list: records of the regressed cases with their baseline latency
+    """
+    baseline_timings = {(r["case"], r["backend"], r["size"]): r["median"]
+                        for r in baseline}
+    regressions = []
+    for record in results:
+        key = (record["case"], record["backend"], record["size"])
+        base = baseline_timings.get(key)
+        if base is not None and record["median"] > base * (1 + tolerance):
+            regression = dict(record, baseline_median=base,
+                              slowdown=record["median"] / base)
+            regressions.append(regression)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10, 1000, 100000, 1000000],
+                        help="sample sizes, up to 10^8")
+    parser.add_argument("--batch-sizes", type=int, nargs="+",
+                        default=[1, 100, 10000, 100000],
+                        help="batch sizes of the batch tests")
+    parser.add_argument("--cases", nargs="*", default=None,
+                        help="names of the benchmarked cases")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="minimum seconds spent per measurement")
+    parser.add_argument("--max-repeats", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="file to write JSON results to")
+    parser.add_argument("--baseline", help="JSON results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative slow down against baseline")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.batch_sizes, args.cases, args.min_time,
+                  args.max_repeats, args.seed)
+    report = {"python": platform.python_version(),
+              "numpy": np.__version__,
+              "machine": platform.machine(),
+              "results": results,
+              "crossovers": crossovers(results)}
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)["results"]
+        report["regressions"] = compare(results, baseline, args.tolerance)
+        for regression in report["regressions"]:
+            print("REGRESSION {case} {backend} {size}: {slowdown:.2f}x"
+                  .format(**regression), file=sys.stderr)
+        status = 1 if report["regressions"] else 0
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output)
+    else:
+        print(output)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Load test of the batching stats service
+
+Runs many concurrent client coroutines, each sending two proportion tests
+one after another to a local StatsService, and reports throughput, request
+latency percentiles and mean batch size. The same requests are also run
+as direct unbatched calls of classical.workout and of the statsmodels
+backed classical.proportions for comparison.
+
+usage:
+    python benchmarks/load_service.py --clients 1000 --requests 20 \
+        --max-batch-size 1024 --max-delay 0.001
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "src"))
+
+import classical.proportions as proportions  # noqa: E402
+import classical.workout.proportions as workout_proportions  # noqa: E402
+from classical.service import StatsService  # noqa: E402
+from classical.summary import SummaryStats  # noqa: E402
+
+
+async def client(service: StatsService, counts: np.ndarray,
+                 latencies: list):
+    """Sends the requests of one client one after another"""
+    for count1, count2 in counts:
+        start = time.perf_counter()
+        await service.two_props_hypothesis(count1, 1000, count2, 1000)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_service(counts: np.ndarray, max_batch_size: int,
+                      max_delay: float, max_pending: int) -> dict:
+    """Runs all clients concurrently against one service
+
+    Returns:
+        dict: throughput, latency percentiles and mean batch size
+    """
+    latencies = []
+    async with StatsService(max_batch_size, max_delay,
+                            max_pending) as service:
+        start = time.perf_counter()
+        await asyncio.gather(*[client(service, client_counts, latencies)
+                               for client_counts in counts])
+        elapsed = time.perf_counter() - start
+        n_batches = service.n_batches
+    return {"throughput": len(latencies) / elapsed,
+            "latency_p50": float(np.percentile(latencies, 50)),
+            "latency_p99": float(np.percentile(latencies, 99)),
+            "mean_batch_size": len(latencies) / n_batches}
+
+
+def run_direct(module, counts: np.ndarray) -> dict:
+    """Runs the same requests as single unbatched calls
+
+    Returns:
+        dict: throughput
+    """
+    start = time.perf_counter()
+    for count1, count2 in counts.reshape(-1, 2):
+        module.two_props_hypothesis(SummaryStats.from_counts(count1, 1000),
+                                    SummaryStats.from_counts(count2, 1000))
+    return {"throughput": counts.size / 2 / (time.perf_counter() - start)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--clients", type=int, default=1000,
+                        help="number of concurrent clients")
+    parser.add_argument("--requests", type=int, default=20,
+                        help="requests sent by every client")
+    parser.add_argument("--max-batch-size", type=int, default=1024)
+    parser.add_argument("--max-delay", type=float, default=0.001,
+                        help="seconds a batch waits for more requests")
+    parser.add_argument("--max-pending", type=int, default=65536,
+                        help="max number of queued requests")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    counts = rng.binomial(1000, 0.3, (args.clients, args.requests, 2))
+    report = {"service": asyncio.run(run_service(counts, args.max_batch_size,
+                                                 args.max_delay,
+                                                 args.max_pending)),
+              "direct_workout": run_direct(workout_proportions, counts),
+              "direct_statsmodels": run_direct(proportions, counts)}
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
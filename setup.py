@@ -19,8 +19,8 @@ setuptools.setup(
     ],
     package_dir={"": "src"},
     packages=setuptools.find_packages(where="src"),
-    python_requires=">=3.6",
-    install_requires=["numpy==1.19.5",
-                      "scipy==1.5.4", "pandas==1.1.5",
-                      "statsmodels==0.12.2"]
+    python_requires=">=3.9",
+    install_requires=["numpy==1.21.6",
+                      "scipy==1.8.1", "pandas==1.3.5",
+                      "statsmodels==0.13.2"]
 )
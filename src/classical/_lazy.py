@@ -0,0 +1,29 @@
+"""Lazy loading of heavy backend modules
+
+statsmodels and scipy.stats take a long time to import, so the modules
+using them load them on first use instead of at import time.
+"""
+
+import importlib
+
+
+class LazyModule:
+    """Proxy of a module which is imported on first attribute access"""
+
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name (str): full name of the module
+        """
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self) -> str:
+        return "LazyModule({!r})".format(self._name)
@@ -5,13 +5,17 @@ functions:
 
 1. one_categorical_hypothesis
 2. two_categorical_hypothesis
+3. two_categorical_hypothesis_ragged
 """
 
 import numpy as np
-import scipy.stats
+from classical._lazy import LazyModule
 
+scipy_stats = LazyModule("scipy.stats")
 
-def one_categorical_hypothesis(counts: np.ndarray, nobs: np.ndarray) -> tuple:
+
+def one_categorical_hypothesis(counts: np.ndarray, nobs: np.ndarray,
+                               mask: np.ndarray = None) -> tuple:
     """Applying chi square test goodness of fit
 
     Ho: the observed counts of the input groups follow population distribution
@@ -19,15 +23,28 @@ def one_categorical_hypothesis(counts: np.ndarray, nobs: np.ndarray) -> tuple:
         (not random pick form population)
 
     Args:
-        counts (np.ndarray): input group  observed counts
-        nobs (np.ndarray): input group total count
+        counts (np.ndarray): input group  observed counts, or 2d array of
+                             experiments x groups to test all at once
+        nobs (np.ndarray): input group total count (same shape as counts)
+        mask (np.ndarray, optional): True for missing groups, which are
+                                     left out of the test
 
     Returns:
-        tuple: chi square value, p value
+        tuple: chi square value, p value (arrays of one value per
+               experiment for 2d counts)
     """
-    p_expected = sum(counts) / sum(nobs)
+    counts, nobs = np.asarray(counts), np.asarray(nobs)
+    if mask is not None:
+        present = ~np.broadcast_to(mask, counts.shape)
+        if counts.ndim == 1:
+            return one_categorical_hypothesis(counts[present], nobs[present])
+        return __stack_results([
+            one_categorical_hypothesis(row_counts[row], row_nobs[row])
+            for row_counts, row_nobs, row in zip(counts, nobs, present)])
+    p_expected = np.sum(counts, axis=-1, keepdims=True) / \
+        np.sum(nobs, axis=-1, keepdims=True)
     expected_counts = nobs * p_expected
-    result = scipy.stats.chisquare(counts, expected_counts)
+    result = scipy_stats.chisquare(counts, expected_counts, axis=-1)
     chi_square, p_value = result.statistic, result.pvalue
     return chi_square, p_value
 
@@ -40,10 +57,45 @@ def two_categorical_hypothesis(observed: np.ndarray) -> tuple:
 
     Args:
         observed (np.ndarray): 2d array the rows represent first variable
-                                        the columns represent second variable
+                                        the columns represent second variable,
+                               or 3d array stacking k tables of the same
+                               shape to test all at once
 
     Returns:
-        tuple: chi square value, p value
+        tuple: chi square value, p value (arrays of k values for a stack
+               of tables)
     """
-    chi_square, p_value, _, _ = scipy.stats.chi2_contingency(observed)
+    observed = np.asarray(observed)
+    if observed.ndim == 3:
+        return __stack_results([two_categorical_hypothesis(table)
+                                for table in observed])
+    chi_square, p_value, _, _ = scipy_stats.chi2_contingency(observed)
     return chi_square, p_value
+
+
+def two_categorical_hypothesis_ragged(observed: np.ndarray,
+                                      offsets: np.ndarray) -> tuple:
+    """Applying chi square independence test to many tables with the same
+    columns and different numbers of rows
+
+    Args:
+        observed (np.ndarray): 2d array of the rows of all tables, one
+                               table after the other
+        offsets (np.ndarray): index of the first row of every table
+
+    Returns:
+        tuple: arrays of chi square values and p values, one per table
+    """
+    tables = np.split(np.asarray(observed), np.asarray(offsets)[1:])
+    return __stack_results([two_categorical_hypothesis(table)
+                            for table in tables])
+
+
+def __stack_results(results: list) -> tuple:
+    """Stacks the results of tests of several tables into arrays
+
+    Returns:
+        tuple: arrays of chi square values and p values
+    """
+    chi_square, p_value = zip(*results)
+    return np.array(chi_square), np.array(p_value)
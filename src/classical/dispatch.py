@@ -0,0 +1,511 @@
+"""Statistical tests dispatched to the fastest backend per call
+
+Every test exists in two implementations with the same signature: the
+statsmodels/scipy backed modules (classical.means, classical.proportions,
+classical.categorical) and the workout ones (classical.workout.*). The
+functions here pick one of them per call:
+
+- summary statistics and batch inputs always go to workout, which needs no
+  raw data and has no per call overhead
+- raw arrays go to workout below the function's size threshold and to
+  statsmodels from it on; the thresholds are the crossover sizes measured
+  by benchmarks/bench_classical.py
+- calls where the implementations differ in method (unpooled t tests,
+  whose workout df is min(n1, n2) - 1 instead of Welch's, 2x2 tables,
+  which scipy corrects for continuity, and one proportion tests against 0,
+  for which statsmodels uses the sample variance) always go to statsmodels
+
+The backend can be forced per call with `backend` or globally with
+`set_backend`, and thresholds changed with `set_threshold` or
+`load_thresholds`.
+
+1. one_mean_conf_interval
+2. one_mean_hypothesis
+3. two_means_diff_conf_interval
+4. two_means_hypothesis
+5. multiple_mean_hypothesis
+6. multiple_mean_hypothesis_by_label
+7. one_prop_conf_interval
+8. one_prop_hypothesis
+9. two_props_diff_conf_interval
+10. two_props_hypothesis
+11. two_props_diff_conf_interval_batch
+12. two_props_hypothesis_batch
+13. one_categorical_hypothesis
+14. two_categorical_hypothesis
+15. two_categorical_hypothesis_ragged
+"""
+
+import json
+import numpy as np
+import classical.categorical as categorical
+import classical.means as means
+import classical.proportions as proportions
+import classical.workout.categorical as workout_categorical
+import classical.workout.means as workout_means
+import classical.workout.proportions as workout_proportions
+from classical.summary import SummaryStats
+
+BACKENDS = ("auto", "workout", "statsmodels")
+
+# input size (number of values) from which statsmodels is faster than
+# workout, None when workout is faster for every size, as the crossovers of
+# `python benchmarks/bench_classical.py` (sizes up to 10^6)
+DEFAULT_THRESHOLDS = {
+    "one_mean_conf_interval": None,
+    "one_mean_hypothesis": None,
+    "two_means_diff_conf_interval": None,
+    "two_means_hypothesis": None,
+    "multiple_mean_hypothesis": None,
+    "multiple_mean_hypothesis_by_label": None,
+    "one_prop_conf_interval": None,
+    "one_prop_hypothesis": None,
+    "two_props_diff_conf_interval": None,
+    "two_props_hypothesis": None,
+    "two_props_diff_conf_interval_batch": None,
+    "two_props_hypothesis_batch": None,
+    "one_categorical_hypothesis": 1000000,
+    # 2d counts of many experiments
+    "one_categorical_hypothesis_batch": None,
+    "two_categorical_hypothesis": None,
+    "two_categorical_hypothesis_ragged": None,
+}
+
+_MODULES = {
+    "means": {"workout": workout_means, "statsmodels": means},
+    "proportions": {"workout": workout_proportions,
+                    "statsmodels": proportions},
+    "categorical": {"workout": workout_categorical,
+                    "statsmodels": categorical},
+}
+
+_thresholds = dict(DEFAULT_THRESHOLDS)
+_backend = "auto"
+
+
+def set_backend(backend: str):
+    """Sets the backend used by calls which do not pass one
+
+    Args:
+        backend (str): auto/workout/statsmodels
+
+    Raises:
+        ValueError: when the backend is invalid
+    """
+    global _backend
+    _backend = __check_backend(backend)
+
+
+def set_threshold(name: str, size: int):
+    """Sets input size from which a test is dispatched to statsmodels
+
+    Args:
+        name (str): test function name
+        size (int): input size, None to always use workout
+
+    Raises:
+        ValueError: when the function name is unknown
+    """
+    if name not in DEFAULT_THRESHOLDS:
+        raise ValueError("unknown function {}".format(name))
+    _thresholds[name] = size
+
+
+def load_thresholds(path: str):
+    """Sets thresholds from the crossovers of a benchmark results file
+
+    Args:
+        path (str): JSON output of benchmarks/bench_classical.py
+    """
+    with open(path) as fh:
+        crossovers = json.load(fh)["crossovers"]
+    for name, size in crossovers.items():
+        if name in DEFAULT_THRESHOLDS:
+            set_threshold(name, size)
+
+
+def reset_thresholds():
+    """Restores the default thresholds and backend"""
+    global _backend
+    _thresholds.clear()
+    _thresholds.update(DEFAULT_THRESHOLDS)
+    _backend = "auto"
+
+
+def choose_backend(name: str, *samples, backend: str = None,
+                   same_method: bool = True) -> str:
+    """Chooses the backend for a call of a test function
+
+    Args:
+        name (str): test function name
+        *samples: raw sample arrays or SummaryStats of the call
+        backend (str, optional): auto/workout/statsmodels.
+                                 Defaults to the global backend.
+        same_method (bool, optional): whether both backends compute the
+                                      same result for this call.
+                                      Defaults to True.
+
+    Returns:
+        str: workout or statsmodels
+    """
+    backend = __check_backend(backend or _backend)
+    if backend != "auto":
+        return backend
+    if not same_method:
+        return "statsmodels"
+    if any(isinstance(sample, SummaryStats) for sample in samples):
+        return "workout"
+    threshold = _thresholds[name]
+    if threshold is None:
+        return "workout"
+    size = sum(np.size(sample) for sample in samples)
+    return "workout" if size < threshold else "statsmodels"
+
+
+def one_mean_conf_interval(values: np.ndarray, conf_level: float = 0.95,
+                           backend: str = None) -> tuple:
+    """calculates confidence interval for mean
+
+    Args:
+        values (np.array or SummaryStats): list of sample values
+        conf_level (float, optional): confidence level. Defaults to 0.95.
+        backend (str, optional): auto/workout/statsmodels.
+                                 Defaults to the global backend.
+
+    Returns:
+        tuple: lower and upper bounds of confidence interval
+    """
+    module = __get_module("means", "one_mean_conf_interval", values,
+                          backend=backend)
+    return module.one_mean_conf_interval(values, conf_level)
+
+
+def one_mean_hypothesis(values: np.ndarray, null_val: float = 0,
+                        alternative: str = "two-sided",
+                        backend: str = None) -> tuple:
+    """Null hypothesis testing that mean of population is equal to null_val
+
+    Args:
+        values (np.ndarray or SummaryStats): sample values
+        null_val (float, optional): null value. Defaults to 0.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+        backend (str, optional): auto/workout/statsmodels.
+                                 Defaults to the global backend.
+
+    Returns:
+        tuple: t statistic,  p_value of the test
+    """
+    module = __get_module("means", "one_mean_hypothesis", values,
+                          backend=backend)
+    return module.one_mean_hypothesis(values, null_val, alternative)
+
+
+def two_means_diff_conf_interval(values1: np.ndarray, values2: np.ndarray,
+                                 conf_level: float, pooled: bool = False,
+                                 backend: str = None) -> tuple:
+    """Calculates confidence interval for the difference of two means
+
+    Args:
+        values1 (np.array or SummaryStats): sample 1 values
+        values2 (np.array or SummaryStats): sample 2 values
+        conf_level (float): confidence level
+        pooled (bool, optional): whether to calculate pooled std.
+                                 Defaults to False.
+        backend (str, optional): auto/workout/statsmodels.
+                                 Defaults to the global backend.
+
+    Returns:
+        tuple: lower and upper values of confidence interval
+    """
+    module = __get_module("means", "two_means_diff_conf_interval",
+                          values1, values2, backend=backend,
+                          same_method=pooled)
+    return module.two_means_diff_conf_interval(values1, values2, conf_level,
+                                               pooled)
+
+
+def two_means_hypothesis(values1: np.ndarray, values2: np.ndarray,
+                         pooled: bool = False,
+                         alternative: str = "two-sided",
+                         backend: str = None) -> tuple:
+    """Perform t test comparing two means
+
+    Args:
+        values1 (np.array or SummaryStats): sample 1 values
+        values2 (np.array or SummaryStats): sample 2 values
+        pooled (bool, optional): whether to calculate pooled std.
+                                 Defaults to False.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+        backend (str, optional): auto/workout/statsmodels.
+                                 Defaults to the global backend.
+    Returns:
+        tuple: t statistic,  p_value of the test
+    """
+    module = __get_module("means", "two_means_hypothesis", values1, values2,
+                          backend=backend, same_method=pooled)
+    return module.two_means_hypothesis(values1, values2, pooled, alternative)
+
+
+def multiple_mean_hypothesis(*args, backend: str = None) -> tuple:
+    """Computes Anova test to get whether the mean of at least one group is
+    different
+    Args:
+        *args consecutive sample group values each group sample
+              is represented by a list or SummaryStats
+        backend (str, optional): auto/workout/statsmodels.
+                                 Defaults to the global backend.
+    Returns:
+        tuple: f statistic, p value
+    """
+    module = __get_module("means", "multiple_mean_hypothesis", *args,
+                          backend=backend)
+    return module.multiple_mean_hypothesis(*args)
+
+
+def multiple_mean_hypothesis_by_label(values: np.ndarray,
+                                      labels: np.ndarray = None,
+                                      n_groups: int = None,
+                                      backend: str = None) -> tuple:
+    """Computes Anova test on a sample whose groups are given by labels
+    instead of separate arrays
+
+    Args:
+        values (np.ndarray or SummaryStats): sample values, or a summary
+            holding one array element per group
+        labels (np.ndarray, optional): integer group (0 to n_groups - 1) of
+            every value, not needed for a summary
+        n_groups (int, optional): number of groups. Defaults to the largest
+                                  label + 1.
+        backend (str, optional): auto/workout/statsmodels.
+                                 Defaults to the global backend.
+
+    Returns:
+        tuple: f statistic, p value
+    """
+    module = __get_module("means", "multiple_mean_hypothesis_by_label",
+                          values, backend=backend)
+    return module.multiple_mean_hypothesis_by_label(values, labels, n_groups)
+
+
+def one_prop_conf_interval(values: np.ndarray, conf_level: float = 0.95,
+                           backend: str = None) -> tuple:
+    """calculates confidence interval for a proportion
+
+    Args:
+        values (np.array or SummaryStats): sample values
+                                           (values are of values 0 and 1)
+        conf_level (float): confidence level
+        backend (str, optional): auto/workout/statsmodels.
+                                 Defaults to the global backend.
+
+    Returns:
+        tuple: lower and upper bounds of confidence interval
+    """
+    module = __get_module("proportions", "one_prop_conf_interval", values,
+                          backend=backend)
+    return module.one_prop_conf_interval(values, conf_level)
+
+
+def one_prop_hypothesis(values: np.ndarray, null_val: float = 0,
+                        alternative: str = "two-sided",
+                        backend: str = None) -> tuple:
+    """z test for comparing the proportion of 1 population with null value
+
+    Args:
+        values (np.ndarray or SummaryStats): sample binary(0/1) values
+        null_val (float, optional): null value. Defaults to 0.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+        backend (str, optional): auto/workout/statsmodels.
+                                 Defaults to the global backend.
+
+    Returns:
+        tuple: z statistic, p value
+    """
+    module = __get_module("proportions", "one_prop_hypothesis", values,
+                          backend=backend, same_method=null_val != 0)
+    return module.one_prop_hypothesis(values, null_val, alternative)
+
+
+def two_props_diff_conf_interval(values1: np.ndarray, values2: np.ndarray,
+                                 conf_level: float,
+                                 backend: str = None) -> tuple:
+    """Calculates the confidence interval for the diff between two proportions
+
+    Args:
+        values1 (np.array or SummaryStats): sample 1 binary(0/1) values
+        values2 (np.array or SummaryStats): sample 2 binary(0/1) values
+        conf_level (float): confidence level
+        backend (str, optional): auto/workout/statsmodels.
+                                 Defaults to the global backend.
+
+    Returns:
+        tuple: lower and upper values of confidence interval
+    """
+    module = __get_module("proportions", "two_props_diff_conf_interval",
+                          values1, values2, backend=backend)
+    return module.two_props_diff_conf_interval(values1, values2, conf_level)
+
+
+def two_props_hypothesis(values1: np.ndarray, values2: np.ndarray,
+                         alternative: str = "two-sided",
+                         backend: str = None) -> tuple:
+    """z test for comparing two proportions
+
+    Args:
+        values1 (np.array or SummaryStats): sample 1 binary(0/1) values
+        values2 (np.array or SummaryStats): sample 2 binary(0/1) values
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+        backend (str, optional): auto/workout/statsmodels.
+                                 Defaults to the global backend.
+
+    Returns:
+        tuple: z_statistic and p value of the test
+    """
+    module = __get_module("proportions", "two_props_hypothesis",
+                          values1, values2, backend=backend)
+    return module.two_props_hypothesis(values1, values2, alternative)
+
+
+def two_props_diff_conf_interval_batch(counts1: np.ndarray, nobs1: np.ndarray,
+                                       counts2: np.ndarray, nobs2: np.ndarray,
+                                       conf_level: float,
+                                       backend: str = None) -> tuple:
+    """Calculates confidence intervals for the diff between two proportions
+    for many pairs of samples at once
+
+    Args:
+        counts1 (np.ndarray): sample 1 counts of ones, shape (k,) or (k, m)
+        nobs1 (np.ndarray): sample 1 number of observations
+        counts2 (np.ndarray): sample 2 counts of ones
+        nobs2 (np.ndarray): sample 2 number of observations
+        conf_level (float): confidence level
+        backend (str, optional): auto/workout/statsmodels.
+                                 Defaults to the global backend.
+
+    Returns:
+        tuple: arrays of lower and upper values of confidence intervals
+    """
+    module = __get_module("proportions",
+                          "two_props_diff_conf_interval_batch", counts1,
+                          backend=backend)
+    return module.two_props_diff_conf_interval_batch(counts1, nobs1, counts2,
+                                                     nobs2, conf_level)
+
+
+def two_props_hypothesis_batch(counts1: np.ndarray, nobs1: np.ndarray,
+                               counts2: np.ndarray, nobs2: np.ndarray,
+                               alternative: str = "two-sided",
+                               backend: str = None) -> tuple:
+    """z tests for comparing two proportions for many pairs of samples at once
+
+    Args:
+        counts1 (np.ndarray): sample 1 counts of ones, shape (k,) or (k, m)
+        nobs1 (np.ndarray): sample 1 number of observations
+        counts2 (np.ndarray): sample 2 counts of ones
+        nobs2 (np.ndarray): sample 2 number of observations
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+        backend (str, optional): auto/workout/statsmodels.
+                                 Defaults to the global backend.
+
+    Returns:
+        tuple: arrays of z statistics and p values of the tests
+    """
+    module = __get_module("proportions", "two_props_hypothesis_batch",
+                          counts1, backend=backend)
+    return module.two_props_hypothesis_batch(counts1, nobs1, counts2, nobs2,
+                                             alternative)
+
+
+def one_categorical_hypothesis(counts: np.ndarray, nobs: np.ndarray,
+                               mask: np.ndarray = None,
+                               backend: str = None) -> tuple:
+    """Applying chi square test goodness of fit
+
+    Args:
+        counts (np.ndarray): input group  observed counts, or 2d array of
+                             experiments x groups to test all at once
+        nobs (np.ndarray): input group total count (same shape as counts)
+        mask (np.ndarray, optional): True for missing groups, which are
+                                     left out of the test
+        backend (str, optional): auto/workout/statsmodels.
+                                 Defaults to the global backend.
+
+    Returns:
+        tuple: chi square value, p value (arrays of one value per
+               experiment for 2d counts)
+    """
+    name = "one_categorical_hypothesis"
+    if np.ndim(counts) > 1:
+        name = "one_categorical_hypothesis_batch"
+    module = __get_module("categorical", name, counts, backend=backend)
+    return module.one_categorical_hypothesis(counts, nobs, mask)
+
+
+def two_categorical_hypothesis(observed: np.ndarray,
+                               backend: str = None) -> tuple:
+    """Applying chi square independence test to compare two variables
+
+    Args:
+        observed (np.ndarray): 2d array the rows represent first variable
+                                        the columns represent second variable,
+                               or 3d array stacking k tables of the same
+                               shape to test all at once
+        backend (str, optional): auto/workout/statsmodels.
+                                 Defaults to the global backend.
+
+    Returns:
+        tuple: chi square value, p value (arrays of k values for a stack
+               of tables)
+    """
+    module = __get_module("categorical", "two_categorical_hypothesis",
+                          observed, backend=backend,
+                          same_method=np.shape(observed)[-2:] != (2, 2))
+    return module.two_categorical_hypothesis(observed)
+
+
+def two_categorical_hypothesis_ragged(observed: np.ndarray,
+                                      offsets: np.ndarray,
+                                      backend: str = None) -> tuple:
+    """Applying chi square independence test to many tables with the same
+    columns and different numbers of rows
+
+    Args:
+        observed (np.ndarray): 2d array of the rows of all tables, one
+                               table after the other
+        offsets (np.ndarray): index of the first row of every table
+        backend (str, optional): auto/workout/statsmodels.
+                                 Defaults to the global backend.
+
+    Returns:
+        tuple: arrays of chi square values and p values, one per table
+    """
+    nrows = np.diff(np.append(offsets, len(observed)))
+    has_2x2 = np.shape(observed)[1] == 2 and bool(np.any(nrows == 2))
+    module = __get_module("categorical",
+                          "two_categorical_hypothesis_ragged", observed,
+                          backend=backend, same_method=not has_2x2)
+    return module.two_categorical_hypothesis_ragged(observed, offsets)
+
+
+def __get_module(kind: str, name: str, *samples, backend: str = None,
+                 same_method: bool = True):
+    """Gets module of the backend chosen for a call"""
+    chosen = choose_backend(name, *samples, backend=backend,
+                            same_method=same_method)
+    return _MODULES[kind][chosen]
+
+
+def __check_backend(backend: str) -> str:
+    """Validates backend name
+
+    Raises:
+        ValueError: when the backend is invalid
+    """
+    if backend not in BACKENDS:
+        raise ValueError("invalid backend")
+    return backend
@@ -0,0 +1,267 @@
+"""Reading test inputs from event logs
+
+Readers reduce CSV and .npy files straight to the summaries the tests
+take, without loading whole files: CSV files are parsed in chunks of
+`chunksize` rows with pandas (imported on first use) and .npy files are
+memory mapped and summarized a block at a time, so memory stays bounded by
+the chunk size whatever the size of the logs. Several files are read in
+parallel threads (`n_jobs`) and their summaries merged.
+
+The summaries of every arm feed the tests directly: SummaryStats for the
+means and proportion tests (counts of ones and observations for
+one_categorical_hypothesis are their `total` and `n`), and observed tables
+for two_categorical_hypothesis.
+
+1. read_csv_summaries
+2. read_csv_table
+3. read_npy_summaries
+4. read_npy_table
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from classical._lazy import LazyModule
+from classical.summary import SummaryStats
+from classical.tables import ContingencyTable
+
+pd = LazyModule("pandas")
+
+
+def read_csv_summaries(paths, value_column: str, arm_column: str = None,
+                       chunksize: int = 1 << 20, n_jobs: int = 1):
+    """Summarizes a value column of CSV files per arm
+
+    Rows with a missing arm or value are left out.
+
+    Args:
+        paths (str, os.PathLike or list): CSV file path(s)
+        value_column (str): column of the values (0/1 for proportions)
+        arm_column (str, optional): column of the arm of every row.
+                                    Defaults to a single arm.
+        chunksize (int, optional): rows parsed at once. Defaults to 2**20.
+        n_jobs (int, optional): number of files read in parallel.
+                                Defaults to 1.
+
+    Returns:
+        dict: arm to SummaryStats of its values (SummaryStats without
+              arm_column)
+    """
+    def read(path):
+        summaries = {}
+        columns = [value_column] + ([arm_column] if arm_column else [])
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize):
+            values = chunk[value_column].to_numpy(dtype=float)
+            if arm_column is None:
+                codes, arms = np.zeros(len(values), dtype=np.intp), [None]
+            else:
+                codes, arms = pd.factorize(chunk[arm_column])
+            valid = (codes >= 0) & ~np.isnan(values)
+            if not valid.all():
+                values, codes = values[valid], codes[valid]
+            stats = SummaryStats.from_labels(values, codes, len(arms))
+            for i, arm in enumerate(arms):
+                __merge_into(summaries, arm, SummaryStats(
+                    stats.n[i], stats.total[i], stats.m2[i]))
+        return summaries
+
+    summaries = {}
+    for file_summaries in __map_files(read, __as_list(paths), n_jobs):
+        for arm, stats in file_summaries.items():
+            __merge_into(summaries, arm, stats)
+    if arm_column is None:
+        return summaries.get(None, SummaryStats())
+    return summaries
+
+
+def read_csv_table(paths, column1: str, column2: str,
+                   chunksize: int = 1 << 20, n_jobs: int = 1) -> tuple:
+    """Builds contingency table of two categorical columns of CSV files
+
+    Rows with a missing category are left out.
+
+    Args:
+        paths (str, os.PathLike or list): CSV file path(s)
+        column1 (str): column of the first variable (table rows)
+        column2 (str): column of the second variable (table columns)
+        chunksize (int, optional): rows parsed at once. Defaults to 2**20.
+        n_jobs (int, optional): number of files read in parallel.
+                                Defaults to 1.
+
+    Returns:
+        tuple: observed counts, categories of the rows, categories of the
+               columns (in order of first appearance)
+    """
+    def read(path):
+        table = ([], [], np.zeros((0, 0), dtype=np.int64))
+        for chunk in pd.read_csv(path, usecols=[column1, column2],
+                                 chunksize=chunksize):
+            codes1, labels1 = pd.factorize(chunk[column1])
+            codes2, labels2 = pd.factorize(chunk[column2])
+            observed = ContingencyTable(len(labels1), len(labels2)).update(
+                codes1, codes2).observed
+            table = __merge_tables(table, (list(labels1), list(labels2),
+                                          observed))
+        return table
+
+    table = ([], [], np.zeros((0, 0), dtype=np.int64))
+    for file_table in __map_files(read, __as_list(paths), n_jobs):
+        table = __merge_tables(table, file_table)
+    rows, columns, observed = table
+    return (observed, rows, columns)
+
+
+def read_npy_summaries(paths, arm_paths=None, n_arms: int = None,
+                       n_jobs: int = 1) -> SummaryStats:
+    """Summarizes values stored in .npy files per arm, memory mapping them
+
+    Args:
+        paths (str, os.PathLike or list): .npy file path(s) of the values
+        arm_paths (str, os.PathLike or list, optional): .npy file path(s)
+            of the integer arm (0 to n_arms - 1) of every value, one per
+            values file. Defaults to a single arm.
+        n_arms (int, optional): number of arms. Defaults to the largest
+                                arm + 1.
+        n_jobs (int, optional): number of files read in parallel.
+                                Defaults to 1.
+
+    Raises:
+        ValueError: when no paths are given, or paths and arm_paths differ
+                    in number
+
+    Returns:
+        SummaryStats: summary of the values, holding one array element per
+                      arm when arm_paths are given
+    """
+    paths = __as_list(paths)
+    if arm_paths is None:
+        return __reduce(__map_files(
+            lambda path: SummaryStats.from_values(__load(path)), paths,
+            n_jobs))
+    files = __pair(paths, __as_list(arm_paths))
+    if n_arms is None:
+        n_arms = max(int(__load(arm_path).max(initial=-1)) + 1
+                     for _, arm_path in files)
+    return __reduce(__map_files(
+        lambda files: SummaryStats.from_labels(__load(files[0]),
+                                               __load(files[1]), n_arms),
+        files, n_jobs))
+
+
+def read_npy_table(paths1, paths2, n_rows: int, n_cols: int,
+                   n_jobs: int = 1) -> np.ndarray:
+    """Builds contingency table of integer codes stored in .npy files,
+    memory mapping them
+
+    Args:
+        paths1 (str, os.PathLike or list): .npy file path(s) of the first
+                                           variable codes
+        paths2 (str, os.PathLike or list): .npy file path(s) of the second
+                                           variable codes
+        n_rows (int): number of categories of the first variable
+        n_cols (int): number of categories of the second variable
+        n_jobs (int, optional): number of files read in parallel.
+                                Defaults to 1.
+
+    Raises:
+        ValueError: when no paths are given, or paths1 and paths2 differ in
+                    number
+
+    Returns:
+        np.ndarray: observed counts
+    """
+    tables = __map_files(
+        lambda files: ContingencyTable(n_rows, n_cols).update(
+            __load(files[0]), __load(files[1])),
+        __pair(__as_list(paths1), __as_list(paths2)), n_jobs)
+    return __reduce(tables).observed
+
+
+def __load(path: str) -> np.ndarray:
+    """Memory maps a .npy file"""
+    return np.load(path, mmap_mode="r")
+
+
+def __as_list(paths) -> list:
+    """Gets file paths as a list
+
+    Raises:
+        ValueError: when there are no paths
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        return [paths]
+    paths = list(paths)
+    if not paths:
+        raise ValueError("no file paths given")
+    return paths
+
+
+def __pair(paths1: list, paths2: list) -> list:
+    """Pairs the files of two variables
+
+    Raises:
+        ValueError: when the numbers of files differ
+    """
+    if len(paths1) != len(paths2):
+        raise ValueError("got {} and {} file paths".format(len(paths1),
+                                                           len(paths2)))
+    return list(zip(paths1, paths2))
+
+
+def __map_files(func, items: list, n_jobs: int) -> list:
+    """Applies func to every file, in parallel threads when n_jobs > 1
+
+    Returns:
+        list: results in the order of the files
+    """
+    if n_jobs == 1 or len(items) == 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(n_jobs) as pool:
+        return list(pool.map(func, items))
+
+
+def __reduce(summaries: list):
+    """Merges summaries (or tables) of all files"""
+    result = summaries[0]
+    for summary in summaries[1:]:
+        result = result.merge(summary)
+    return result
+
+
+def __merge_into(summaries: dict, arm, stats: SummaryStats):
+    """Merges the summary of an arm into the summaries of all arms"""
+    if arm in summaries:
+        stats = summaries[arm].merge(stats)
+    summaries[arm] = stats
+
+
+def __merge_tables(table: tuple, other: tuple) -> tuple:
+    """Adds two tables whose rows and columns are labelled by categories,
+    extending the first one with the categories it does not have
+
+    Returns:
+        tuple: categories of the rows, categories of the columns, counts
+    """
+    rows, columns, observed = table
+    other_rows, other_columns, other_observed = other
+    rows, columns = list(rows), list(columns)
+    row_index = __extend_labels(rows, other_rows)
+    column_index = __extend_labels(columns, other_columns)
+    merged = np.zeros((len(rows), len(columns)), dtype=np.int64)
+    merged[:observed.shape[0], :observed.shape[1]] = observed
+    merged[np.ix_(row_index, column_index)] += other_observed
+    return (rows, columns, merged)
+
+
+def __extend_labels(labels: list, new_labels: list) -> list:
+    """Appends unseen labels in place
+
+    Returns:
+        list: index of every new label in labels
+    """
+    index = {label: i for i, label in enumerate(labels)}
+    for label in new_labels:
+        if label not in index:
+            index[label] = len(labels)
+            labels.append(label)
+    return [index[label] for label in new_labels]
@@ -7,12 +7,19 @@ The module contains useful functions for evaluating AB tests
 2. one_mean_hypothesis
 3. two_means_diff_conf_interval
 4. two_means_hypothesis
+5. multiple_mean_hypothesis
+6. multiple_mean_hypothesis_by_label
 
 """
 import numpy as np
-import statsmodels.stats.api as sms
-from statsmodels.stats.weightstats import ttest_ind
-import scipy.stats
+import classical.workout.utils as utils
+from classical._lazy import LazyModule
+from classical.summary import SummaryStats, as_summary
+
+sms = LazyModule("statsmodels.stats.api")
+oneway = LazyModule("statsmodels.stats.oneway")
+weightstats = LazyModule("statsmodels.stats.weightstats")
+scipy_stats = LazyModule("scipy.stats")
 
 
 def one_mean_conf_interval(values: np.ndarray,
@@ -20,12 +27,16 @@ def one_mean_conf_interval(values: np.ndarray,
     """calculates confidence interval for mean
 
     Args:
-        values (np.array): list of sample values
+        values (np.array or SummaryStats): list of sample values
         conf_level (float, optional): confidence level. Defaults to 0.95.
 
     Returns:
         tuple: lower and upper bounds of confidence interval
     """
+    if isinstance(values, SummaryStats):
+        std_mean = values.std / np.sqrt(values.n)
+        return __t_conf_interval(values.mean, std_mean, values.n - 1,
+                                 conf_level)
     return sms.DescrStatsW(values).tconfint_mean(alpha=1-conf_level)
 
 
@@ -34,7 +45,7 @@ def one_mean_hypothesis(values: np.ndarray, null_val: float = 0,
     """Null hypothesis testing that mean of population is equal to null_val
 
     Args:
-        values (np.ndarray): sample values
+        values (np.ndarray or SummaryStats): sample values
         null_val (float, optional): null value. Defaults to 0.
         alternative (str, optional): two-sided/larger/smaller.
                                      Defaults to "two-sided".
@@ -42,6 +53,10 @@ def one_mean_hypothesis(values: np.ndarray, null_val: float = 0,
     Returns:
         tuple: t statistic,  p_value of the test
     """
+    if isinstance(values, SummaryStats):
+        std_mean = values.std / np.sqrt(values.n)
+        return __t_test(values.mean - null_val, std_mean, values.n - 1,
+                        alternative)
     stats = sms.DescrStatsW(values)
     tstat, pvalue, _ = stats.ttest_mean(null_val, alternative=alternative)
     return (tstat, pvalue)
@@ -53,8 +68,8 @@ def two_means_diff_conf_interval(values1: np.ndarray, values2: np.ndarray,
     """Calculates confidence interval for the difference of two means
 
     Args:
-        values1 (np.array): sample 1 values
-        values2 (np.array): sample 2 values
+        values1 (np.array or SummaryStats): sample 1 values
+        values2 (np.array or SummaryStats): sample 2 values
         conf_level (float): confidence level
         pooled (bool, optional): whether to calculate pooled std.
                                  Defaults to False.
@@ -62,6 +77,9 @@ def two_means_diff_conf_interval(values1: np.ndarray, values2: np.ndarray,
     Returns:
         tuple: lower and upper values of confidence interval
     """
+    if __has_summary(values1, values2):
+        diff, std_diff, dof = __compare_means(values1, values2, pooled)
+        return __t_conf_interval(diff, std_diff, dof, conf_level)
     cm = sms.CompareMeans(sms.DescrStatsW(values1), sms.DescrStatsW(values2))
     alpha = 1 - conf_level
     diff_ci = cm.tconfint_diff(usevar='pooled' if pooled else "unequal",
@@ -75,8 +93,8 @@ def two_means_hypothesis(values1: np.ndarray, values2: np.ndarray,
     """Perform t test  comparing two means
 
     Args:
-        values1 (np.array): sample 1 values
-        values2 (np.array): sample 2 values
+        values1 (np.array or SummaryStats): sample 1 values
+        values2 (np.array or SummaryStats): sample 2 values
         pooled (bool, optional): whether to calculate pooled std.
                                  Defaults to False.
         alternative (str, optional): two-sided/larger/smaller.
@@ -84,9 +102,13 @@ def two_means_hypothesis(values1: np.ndarray, values2: np.ndarray,
     Returns:
         tuple: t statistic,  p_value of the test
     """
+    if __has_summary(values1, values2):
+        diff, std_diff, dof = __compare_means(values1, values2, pooled)
+        return __t_test(diff, std_diff, dof, alternative)
     usevar = 'pooled' if pooled else "unequal"
-    (tstat, pval, df) = ttest_ind(values1, values2, usevar=usevar,
-                                  alternative=alternative)
+    (tstat, pval, df) = weightstats.ttest_ind(values1, values2,
+                                              usevar=usevar,
+                                              alternative=alternative)
     return (tstat, pval)
 
 
@@ -95,9 +117,101 @@ def multiple_mean_hypothesis(*args) -> tuple:
     different
     Args:
         *args consecutive sample group values each group sample
-              is represented by a list
+              is represented by a list or SummaryStats
+    Returns:
+        tuple: f statistic, p value
+    """
+    if __has_summary(*args):
+        groups = [arg if isinstance(arg, SummaryStats)
+                  else SummaryStats.from_values(np.asarray(arg, dtype=float))
+                  for arg in args]
+        means = np.array([group.mean for group in groups])
+        variances = np.array([group.var for group in groups])
+        nobs = np.array([group.n for group in groups])
+        result = oneway.anova_generic(means, variances, nobs,
+                                      use_var="equal")
+        return (result.statistic, result.pvalue)
+    result = scipy_stats.f_oneway(*args)
+    return (result.statistic, result.pvalue)
+
+
+def multiple_mean_hypothesis_by_label(values: np.ndarray,
+                                      labels: np.ndarray = None,
+                                      n_groups: int = None) -> tuple:
+    """Computes Anova test on a sample whose groups are given by labels
+    instead of separate arrays
+
+    Args:
+        values (np.ndarray or SummaryStats): sample values, or a summary
+            holding one array element per group
+        labels (np.ndarray, optional): integer group (0 to n_groups - 1) of
+            every value, not needed for a summary
+        n_groups (int, optional): number of groups. Defaults to the largest
+                                  label + 1.
+
     Returns:
         tuple: f statistic, p value
     """
-    result = scipy.stats.f_oneway(*args)
+    if not isinstance(values, SummaryStats):
+        values = SummaryStats.from_labels(values, labels, n_groups)
+    nonempty = np.asarray(values.n) > 0
+    nobs = np.asarray(values.n)[nonempty]
+    means = np.asarray(values.total, dtype=float)[nonempty] / nobs
+    m2 = np.asarray(values.m2, dtype=float)[nonempty]
+    variances = np.divide(m2, nobs - 1, out=np.zeros(len(m2)),
+                          where=nobs > 1)
+    result = oneway.anova_generic(means, variances, nobs, use_var="equal")
     return (result.statistic, result.pvalue)
+
+
+def __t_conf_interval(estimate: float, std: float, df: float,
+                      conf_level: float) -> tuple:
+    """Calculates t confidence interval from an estimate and its std
+
+    Returns:
+        tuple: lower and upper bounds of confidence interval
+    """
+    t_critical = utils.get_t_critical(conf_level, df)
+    return (estimate - t_critical * std, estimate + t_critical * std)
+
+
+def __t_test(diff: float, std: float, df: float,
+             alternative: str) -> tuple:
+    """t test of an estimate minus its null value
+
+    Returns:
+        tuple: t statistic, p value of the test
+    """
+    t_statistic = diff / std
+    return (t_statistic, utils.get_t_pvalue(t_statistic, df, alternative))
+
+
+def __has_summary(*args) -> bool:
+    """Checks whether any of the samples is passed as SummaryStats"""
+    return any(isinstance(arg, SummaryStats) for arg in args)
+
+
+def __compare_means(values1, values2, pooled: bool = False) -> tuple:
+    """Calculates difference of two means with its standard error and
+    degrees of freedom (Welch-Satterthwaite when not pooled)
+
+    Args:
+        values1 (np.array or SummaryStats): sample 1 values
+        values2 (np.array or SummaryStats): sample 2 values
+        pooled (bool, optional): whether to calculate pooled std.
+                                 Defaults to False.
+
+    Returns:
+        tuple: difference of means, standard error, degrees of freedom
+    """
+    stats1, stats2 = as_summary(values1), as_summary(values2)
+    n1, n2 = stats1.n, stats2.n
+    if pooled:
+        dof = n1 + n2 - 2
+        var_pooled = (stats1.m2 + stats2.m2) / dof
+        std_diff = np.sqrt(var_pooled * (1 / n1 + 1 / n2))
+    else:
+        v1, v2 = stats1.var / n1, stats2.var / n2
+        std_diff = np.sqrt(v1 + v2)
+        dof = (v1 + v2)**2 / (v1**2 / (n1 - 1) + v2**2 / (n2 - 1))
+    return (stats1.mean - stats2.mean, std_diff, dof)
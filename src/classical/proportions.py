@@ -7,11 +7,20 @@ The module contains useful functions for evaluating AB tests
 2. one_prop_hypothesis
 3. two_props_diff_conf_interval
 4. two_props_hypothesis
+5. two_props_diff_conf_interval_batch
+6. two_props_hypothesis_batch
+
+Samples are arrays of 0/1 or boolean values, or their SummaryStats: counts
+of ones given directly as SummaryStats.from_counts(successes, trials), and
+bit-packed arrays as SummaryStats.from_packed(packed, n).
 
 """
 
 import numpy as np
-import statsmodels.stats.proportion as prop_stats
+from classical._lazy import LazyModule
+from classical.summary import as_binary_summary
+
+prop_stats = LazyModule("statsmodels.stats.proportion")
 
 
 def one_prop_conf_interval(values: np.ndarray,
@@ -19,14 +28,15 @@ def one_prop_conf_interval(values: np.ndarray,
     """calculates confidence interval for a proportion
 
     Args:
-        values (np.array): sample values (values are of values 0 and 1)
+        values (np.array or SummaryStats): sample values
+                                           (values are of values 0 and 1)
         conf_level (float): confidence level
 
     Returns:
         tuple: lower and upper bounds of confidence interval
     """
-    ci = prop_stats.proportion_confint(values.sum(), len(values),
-                                       alpha=1-conf_level)
+    count, nob = __get_count_nobs(values)
+    ci = prop_stats.proportion_confint(count, nob, alpha=1-conf_level)
     return ci
 
 
@@ -36,7 +46,7 @@ def one_prop_hypothesis(values: np.ndarray,
     """[z test for comparing the proportion of 1 population with null value
 
     Args:
-        values (np.ndarray): sample values
+        values (np.ndarray or SummaryStats): sample values
         null_val (float, optional): null value. Defaults to 0.
         alternative (str, optional): two-sided/larger/smaller.
                                      Defaults to "two-sided".
@@ -44,9 +54,10 @@ def one_prop_hypothesis(values: np.ndarray,
     Returns:
         tuple: z statistic, p value
     """
-    count = np.sum(values)
-    nob = len(values)
-    return prop_stats.proportions_ztest(count, nob, alternative=alternative)
+    count, nob = __get_count_nobs(values)
+    return prop_stats.proportions_ztest(count, nob, value=null_val,
+                                        alternative=alternative,
+                                        prop_var=null_val)
 
 
 def two_props_diff_conf_interval(values1: np.ndarray, values2: np.ndarray,
@@ -54,15 +65,15 @@ def two_props_diff_conf_interval(values1: np.ndarray, values2: np.ndarray,
     """Calculates the confidence interval for the diff between two proportions
 
     Args:
-        values1 (np.array): sample 1 binary(0/1) values
-        values2 (np.array): sample 2 binary(0/1) values
+        values1 (np.array or SummaryStats): sample 1 binary(0/1) values
+        values2 (np.array or SummaryStats): sample 2 binary(0/1) values
         conf_level (float): confidence level
 
     Returns:
         tuple: lower and upper values of confidence interval
     """
-    count1, count2 = values1.sum(), values2.sum()
-    nobs1, nobs2 = len(values1), len(values2)
+    count1, nobs1 = __get_count_nobs(values1)
+    count2, nobs2 = __get_count_nobs(values2)
     ci = prop_stats.confint_proportions_2indep(count1, nobs1, count2, nobs2,
                                                alpha=1-conf_level,
                                                method="wald")
@@ -75,15 +86,77 @@ def two_props_hypothesis(values1: np.ndarray,
     """z test for comparing two proportions
 
     Args:
-        values1 (np.array): sample 1 binary(0/1) values
-        values2 (np.array): sample 2 binaray(0/1) values
+        values1 (np.array or SummaryStats): sample 1 binary(0/1) values
+        values2 (np.array or SummaryStats): sample 2 binaray(0/1) values
         alternative (str, optional): two-sided/larger/smaller.
                                      Defaults to "two-sided".
 
     Returns:
         tuple: z_statistic and p value of the test
     """
-    samples = np.vstack((values1, values2))
-    counts = samples.sum(axis=1)
-    nobs = [np.size(samples, 1)]*2
-    return prop_stats.proportions_ztest(counts, nobs, alternative=alternative)
+    count1, nobs1 = __get_count_nobs(values1)
+    count2, nobs2 = __get_count_nobs(values2)
+    return prop_stats.proportions_ztest([count1, count2], [nobs1, nobs2],
+                                        alternative=alternative)
+
+
+def two_props_diff_conf_interval_batch(counts1: np.ndarray, nobs1: np.ndarray,
+                                       counts2: np.ndarray, nobs2: np.ndarray,
+                                       conf_level: float) -> tuple:
+    """Calculates confidence intervals for the diff between two proportions
+    for many pairs of samples at once
+
+    Args:
+        counts1 (np.ndarray): sample 1 counts of ones, shape (k,) or (k, m)
+        nobs1 (np.ndarray): sample 1 number of observations
+        counts2 (np.ndarray): sample 2 counts of ones
+        nobs2 (np.ndarray): sample 2 number of observations
+        conf_level (float): confidence level
+
+    Returns:
+        tuple: arrays of lower and upper values of confidence intervals
+    """
+    ci = prop_stats.confint_proportions_2indep(counts1, nobs1, counts2, nobs2,
+                                               alpha=1-conf_level,
+                                               method="wald")
+    return ci
+
+
+def two_props_hypothesis_batch(counts1: np.ndarray, nobs1: np.ndarray,
+                               counts2: np.ndarray, nobs2: np.ndarray,
+                               alternative: str = "two-sided") -> tuple:
+    """z tests for comparing two proportions for many pairs of samples at once
+
+    Args:
+        counts1 (np.ndarray): sample 1 counts of ones, shape (k,) or (k, m)
+        nobs1 (np.ndarray): sample 1 number of observations
+        counts2 (np.ndarray): sample 2 counts of ones
+        nobs2 (np.ndarray): sample 2 number of observations
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+
+    Returns:
+        tuple: arrays of z statistics and p values of the tests
+    """
+    # the score test without correction uses the pooled proportion under
+    # the null, which is the same statistic as proportions_ztest
+    result = prop_stats.test_proportions_2indep(counts1, nobs1,
+                                                counts2, nobs2,
+                                                method="score",
+                                                compare="diff",
+                                                alternative=alternative,
+                                                correction=False)
+    return (result.statistic, result.pvalue)
+
+
+def __get_count_nobs(values) -> tuple:
+    """Gets count of ones and number of observations of a binary sample
+
+    Args:
+        values (np.array or SummaryStats): sample binary(0/1) values
+
+    Returns:
+        tuple: count of ones, number of observations
+    """
+    stats = as_binary_summary(values)
+    return stats.total, stats.n
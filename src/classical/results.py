@@ -0,0 +1,251 @@
+"""Structured results of the tests
+
+The tests return plain tuples, whose meaning depends on the test. These
+classes give them named fields (statistic, p value, confidence interval
+bounds, degrees of freedom, numbers of observations, effect size and
+power):
+TestResult holds the result of one call in a slots object, BatchResult the
+results of many calls (or of one batch call) as one array per field, in
+the shape of the batch inputs. BatchResult converts to a NumPy record
+array, or to a pandas DataFrame (one row per test) which uses its arrays
+without copying them on pandas 2 and later.
+
+1. TestResult
+2. BatchResult
+"""
+
+import numpy as np
+from classical._lazy import LazyModule
+
+pd = LazyModule("pandas")
+
+FIELDS = ("statistic", "p_value", "lower", "upper", "df", "n", "effect",
+          "power", "n2")
+# fields are float, missing values are nan
+DTYPE = np.dtype([(field, np.float64) for field in FIELDS])
+
+_TEST = ("statistic", "p_value")
+_INTERVAL = ("lower", "upper")
+# fields of the results of the tests, in order; other functions are named
+# like a test, or a confidence interval when their name says so
+RESULT_FIELDS = {
+    # classical.means
+    "two_means_test": ("statistic", "p_value", "lower", "upper"),
+    "two_means_cuped_test": ("effect", "statistic", "p_value", "lower",
+                             "upper"),
+    # classical.proportions (z statistics)
+    "one_prop_hypothesis": _TEST,
+    "two_props_hypothesis": _TEST,
+    "two_props_hypothesis_batch": _TEST,
+    "one_prop_conf_interval": _INTERVAL,
+    "two_props_diff_conf_interval": _INTERVAL,
+    "two_props_diff_conf_interval_batch": _INTERVAL,
+    # classical.categorical (chi square statistics)
+    "one_categorical_hypothesis": _TEST,
+    "two_categorical_hypothesis": _TEST,
+    "two_categorical_hypothesis_ragged": _TEST,
+    # classical.workout.ratios (z statistics)
+    "one_ratio_hypothesis": _TEST,
+    "two_ratios_hypothesis": _TEST,
+    "one_ratio_conf_interval": _INTERVAL,
+    "two_ratios_diff_conf_interval": _INTERVAL,
+    # classical.workout.power, sample sizes of sample 1 (and 2)
+    "one_mean_sample_size": ("n",),
+    "two_means_sample_size": ("n", "n2"),
+    "one_prop_sample_size": ("n",),
+    "two_props_sample_size": ("n", "n2"),
+    "one_mean_power": ("power",),
+    "two_means_power": ("power",),
+    "one_prop_power": ("power",),
+    "two_props_power": ("power",),
+    "one_mean_mde": ("effect",),
+    "two_means_mde": ("effect",),
+    "one_prop_mde": ("effect",),
+    "two_props_mde": ("effect",),
+    # observed difference and p value of simulation.permutation
+    "two_means_permutation_test": ("effect", "p_value"),
+    "two_props_permutation_test": ("effect", "p_value"),
+}
+
+
+class TestResult:
+    """Result of one test call"""
+
+    __slots__ = FIELDS
+    # not a test case, for pytest
+    __test__ = False
+
+    def __init__(self, statistic: float = np.nan, p_value: float = np.nan,
+                 lower: float = np.nan, upper: float = np.nan,
+                 df: float = np.nan, n: float = np.nan,
+                 effect: float = np.nan, power: float = np.nan,
+                 n2: float = np.nan):
+        """
+        Args:
+            statistic (float, optional): test statistic
+            p_value (float, optional): p value
+            lower (float, optional): lower bound of confidence interval
+            upper (float, optional): upper bound of confidence interval
+            df (float, optional): degrees of freedom
+            n (float, optional): number of observations (of sample 1 for
+                                 two sample sizes)
+            effect (float, optional): effect size
+            power (float, optional): power
+            n2 (float, optional): number of observations of sample 2
+        """
+        self.statistic = statistic
+        self.p_value = p_value
+        self.lower = lower
+        self.upper = upper
+        self.df = df
+        self.n = n
+        self.effect = effect
+        self.power = power
+        self.n2 = n2
+
+    @classmethod
+    def from_test(cls, test: str, result: tuple,
+                  **fields) -> "TestResult":
+        """Names the fields of the tuple returned by a test
+
+        Args:
+            test (str): name of the test function
+            result (tuple): tuple returned by the test (or array, for
+                            the power functions)
+            **fields: other fields, e.g. n or effect
+
+        Returns:
+            TestResult: result of the test
+        """
+        fields.update(zip(_get_result_fields(test), _as_tuple(result)))
+        return cls(**fields)
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in FIELDS}
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TestResult):
+            return NotImplemented
+        return all(np.array_equal(getattr(self, field),
+                                  getattr(other, field), equal_nan=True)
+                   for field in FIELDS)
+
+    def __repr__(self) -> str:
+        return "TestResult({})".format(", ".join(
+            "{}={!r}".format(field, value)
+            for field, value in self.to_dict().items()
+            if not np.all(np.isnan(value))))
+
+
+class BatchResult:
+    """Results of many tests, stored as one float array per field"""
+
+    __slots__ = ("columns", "shape")
+
+    def __init__(self, **columns):
+        """
+        Args:
+            **columns: arrays (or scalars, broadcast) of any of the fields,
+                       the others are filled with nan
+
+        Raises:
+            ValueError: when a field name is invalid
+        """
+        invalid = set(columns) - set(FIELDS)
+        if invalid:
+            raise ValueError("invalid fields {}".format(sorted(invalid)))
+        arrays = np.broadcast_arrays(*[np.asarray(value, dtype=np.float64)
+                                       for value in columns.values()])
+        # shape of the batch, e.g. (k, m) for k experiments of m metrics
+        self.shape = arrays[0].shape if arrays else (0,)
+        size = np.size(arrays[0]) if arrays else 0
+        given = dict(zip(columns, [np.ravel(array) for array in arrays]))
+        self.columns = {field: given[field] if field in given
+                        else np.full(size, np.nan) for field in FIELDS}
+
+    @classmethod
+    def from_test(cls, test: str, result: tuple, **fields) -> "BatchResult":
+        """Names the arrays of the tuple returned by a batch test
+
+        Args:
+            test (str): name of the test function
+            result (tuple): tuple of arrays returned by the test (or
+                            array, for the power functions)
+            **fields: other fields, e.g. n or effect
+
+        Returns:
+            BatchResult: results of the tests
+        """
+        fields.update(zip(_get_result_fields(test), _as_tuple(result)))
+        return cls(**fields)
+
+    @classmethod
+    def from_results(cls, results) -> "BatchResult":
+        """Collects results of single calls
+
+        Args:
+            results (iterable): TestResult of every call
+
+        Returns:
+            BatchResult: results of all calls
+        """
+        records = np.array([tuple(getattr(result, field) for field in FIELDS)
+                            for result in results], dtype=DTYPE)
+        return cls(**{field: records[field] for field in FIELDS})
+
+    def __len__(self) -> int:
+        """number of tests"""
+        return len(self.columns[FIELDS[0]])
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.columns[field].reshape(self.shape)
+
+    def __getattr__(self, field: str) -> np.ndarray:
+        if field in FIELDS:
+            return self.columns[field].reshape(self.shape)
+        raise AttributeError(field)
+
+    def to_records(self) -> np.ndarray:
+        """Gets results as a record array with one record per test
+
+        Returns:
+            np.ndarray: structured array of dtype DTYPE, in the shape of
+                        the batch
+        """
+        records = np.empty(self.shape, dtype=DTYPE)
+        for field in FIELDS:
+            records[field] = self[field]
+        return records
+
+    def to_frame(self, index=None):
+        """Gets results as a DataFrame sharing the arrays of the fields
+
+        Args:
+            index (array-like, optional): index of the frame, e.g. the
+                                          experiment of every test
+
+        The frame is built with copy=False, which shares the arrays with
+        pandas 2 and later; older pandas copy them into one block.
+
+        Returns:
+            pd.DataFrame: one row per test (in C order of the batch shape)
+                          and one column per field
+        """
+        return pd.DataFrame(self.columns, index=index, copy=False)
+
+    def __repr__(self) -> str:
+        return "BatchResult({} results)".format(len(self))
+
+
+def _get_result_fields(test: str) -> tuple:
+    """Gets names of the fields of the tuple returned by a test"""
+    if test in RESULT_FIELDS:
+        return RESULT_FIELDS[test]
+    if test.endswith(("conf_interval", "conf_interval_batch")):
+        return _INTERVAL
+    return _TEST
+
+
+def _as_tuple(result) -> tuple:
+    """Wraps the single array returned by power functions"""
+    return result if isinstance(result, tuple) else (result,)
@@ -0,0 +1,204 @@
+"""Running many tests in parallel
+
+A scorecard runs the same tests over many experiments and metrics. The
+runner takes them as a list of Tasks (experiment x metric x test) and
+shards them over a thread or process pool, yielding every result as soon
+as it is ready.
+
+Tests are the functions of classical.dispatch, named by their function
+name, so every call picks its backend as usual; module level callables are
+accepted as well. In a process pool, array arguments (positional or
+keyword) of at least `shared_memory_bytes` are copied once into shared
+memory and workers map them instead of receiving a pickled copy with every
+task, so an array used by many tasks is transferred once. Results that may
+be views of a shared array are copied before the worker unmaps it.
+
+A task failing or running longer than `timeout` seconds gives a result
+with its error, without stopping the other tasks. Python cannot interrupt
+a running call, so a timed out task keeps its worker busy until it
+returns, and no task is given to that worker in the meantime.
+
+1. Task
+2. TaskResult
+3. run_tasks
+"""
+
+import os
+import time
+from collections import namedtuple
+from concurrent import futures
+from multiprocessing import shared_memory
+import numpy as np
+import classical.dispatch as dispatch
+
+Task = namedtuple("Task", ["experiment", "metric", "test", "args",
+                           "kwargs"], defaults=[None])
+TaskResult = namedtuple("TaskResult", ["experiment", "metric", "test",
+                                       "result", "error"])
+
+TESTS = tuple(name for name in dispatch.DEFAULT_THRESHOLDS
+              if hasattr(dispatch, name))
+EXECUTORS = ("thread", "process")
+
+_SharedArray = namedtuple("_SharedArray", ["name", "shape", "dtype"])
+
+
+def run_tasks(tasks, executor: str = "thread", max_workers: int = None,
+              timeout: float = None, shared_memory_bytes: int = 1 << 20):
+    """Runs tests in a pool and yields their results as they finish
+
+    Args:
+        tasks (iterable): Task of every test to run, whose `test` is the
+            name of a classical.dispatch function (or a module level
+            callable) called as test(*args, **kwargs)
+        executor (str, optional): thread/process. Defaults to "thread".
+        max_workers (int, optional): number of workers.
+                                     Defaults to the number of cores.
+        timeout (float, optional): seconds after which a task is reported
+                                   as failed with a TimeoutError.
+        shared_memory_bytes (int, optional): size from which arrays are
+            passed to processes through shared memory. Defaults to 1MB.
+
+    Raises:
+        ValueError: when the executor or a test name is invalid
+
+    Yields:
+        TaskResult: experiment, metric, test, result of the call (None on
+                    failure) and error raised (None on success)
+    """
+    if executor not in EXECUTORS:
+        raise ValueError("invalid executor")
+    tasks = list(tasks)
+    for task in tasks:
+        if not callable(task.test) and task.test not in TESTS:
+            raise ValueError("invalid test {!r}".format(task.test))
+    max_workers = max_workers or os.cpu_count()
+    if executor == "thread":
+        pool = futures.ThreadPoolExecutor(max_workers)
+    else:
+        pool = futures.ProcessPoolExecutor(max_workers)
+    segments = {}
+    pending = {}
+    # timed out tasks whose call is still running
+    hung = set()
+    queue = iter(tasks)
+    exhausted = False
+    try:
+        while True:
+            # the worker of a timed out task stays busy until its call
+            # returns, so tasks are only submitted to free workers: a task
+            # starts when it is submitted and its deadline counts from then
+            hung = {future for future in hung if not future.done()}
+            while not exhausted and len(pending) + len(hung) < max_workers:
+                task = next(queue, None)
+                if task is None:
+                    exhausted = True
+                    break
+                args, kwargs = task.args, task.kwargs or {}
+                if executor == "process":
+                    args = tuple(
+                        _share_array(arg, segments, shared_memory_bytes)
+                        for arg in args)
+                    kwargs = {
+                        key: _share_array(value, segments,
+                                          shared_memory_bytes)
+                        for key, value in kwargs.items()}
+                future = pool.submit(_run_task, task.test, args, kwargs)
+                pending[future] = (task, time.monotonic())
+            if not pending:
+                if exhausted:
+                    return
+                # every worker is hung, wait for one of them to return
+                futures.wait(hung, return_when=futures.FIRST_COMPLETED)
+                continue
+            wait_time = None
+            if timeout is not None:
+                first_deadline = min(start for _, start in pending.values())
+                wait_time = max(first_deadline + timeout - time.monotonic(),
+                                0)
+            done, _ = futures.wait(set(pending) | hung, wait_time,
+                                   return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                if future not in pending:
+                    continue
+                task, _ = pending.pop(future)
+                error = future.exception()
+                result = None if error is not None else future.result()
+                yield _task_result(task, result, error)
+            if timeout is not None:
+                now = time.monotonic()
+                for future, (task, start) in list(pending.items()):
+                    if now - start >= timeout:
+                        del pending[future]
+                        if not future.cancel():
+                            hung.add(future)
+                        error = TimeoutError(
+                            "task exceeded {}s".format(timeout))
+                        yield _task_result(task, None, error)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        for segment in segments.values():
+            segment.close()
+            segment.unlink()
+
+
+def _run_task(test, args: tuple, kwargs: dict):
+    """Calls a test in a worker, mapping arrays passed in shared memory"""
+    func = test if callable(test) else getattr(dispatch, test)
+    segments = []
+    shared = []
+    args = tuple(_attach_array(arg, segments, shared)
+                 if isinstance(arg, _SharedArray) else arg for arg in args)
+    kwargs = {key: _attach_array(value, segments, shared)
+              if isinstance(value, _SharedArray) else value
+              for key, value in kwargs.items()}
+    try:
+        return _copy_views(func(*args, **kwargs), shared)
+    finally:
+        # views must be released before the segments are closed
+        del args, kwargs, shared
+        for segment in segments:
+            segment.close()
+
+
+def _task_result(task: Task, result, error) -> TaskResult:
+    return TaskResult(task.experiment, task.metric, task.test, result,
+                      error)
+
+
+def _share_array(arg, segments: dict, min_bytes: int):
+    """Replaces a large array by the descriptor of a shared memory copy,
+    copying every array once however many tasks use it"""
+    if not isinstance(arg, np.ndarray) or arg.nbytes < min_bytes or \
+            arg.dtype.hasobject:
+        return arg
+    segment = segments.get(id(arg))
+    if segment is None:
+        segment = shared_memory.SharedMemory(create=True, size=arg.nbytes)
+        np.ndarray(arg.shape, arg.dtype, segment.buf)[...] = arg
+        segments[id(arg)] = segment
+    return _SharedArray(segment.name, arg.shape, arg.dtype)
+
+
+def _attach_array(shared: _SharedArray, segments: list,
+                  arrays: list) -> np.ndarray:
+    """Maps an array from shared memory without copying it"""
+    segment = shared_memory.SharedMemory(name=shared.name)
+    segments.append(segment)
+    array = np.ndarray(shared.shape, shared.dtype, segment.buf)
+    arrays.append(array)
+    return array
+
+
+def _copy_views(result, arrays: list):
+    """Copies a result (or the items of a tuple result) that may be a view
+    of one of the arrays, so that it outlives their memory"""
+    if isinstance(result, tuple):
+        items = [_copy_views(item, arrays) for item in result]
+        if hasattr(result, "_fields"):
+            return type(result)(*items)
+        return type(result)(items)
+    if isinstance(result, (np.ndarray, np.generic)) and \
+            any(np.may_share_memory(result, array) for array in arrays):
+        return result.copy()
+    return result
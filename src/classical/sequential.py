@@ -0,0 +1,135 @@
+"""Always valid sequential tests for continuously monitored experiments
+
+Fixed horizon tests are only valid when evaluated once. The mixture
+sequential probability ratio test (mSPRT) gives p values and confidence
+sequences which stay valid however often they are looked at, so results
+can be checked after every new batch of data.
+
+The test keeps a SummaryStats per arm, so each update costs only the
+summary of the new batch and no past data is kept or rescanned.
+
+The confidence sequence is the running intersection of the intervals of
+every update. A new interval which does not overlap it (with probability
+at most alpha when the assumptions of the test hold, more often when they
+do not, e.g. when the effect drifts over time) restarts the sequence from
+the new interval and sets `inconsistent`.
+
+1. SequentialTest
+"""
+
+import math
+from classical.summary import SummaryStats
+
+
+class SequentialTest:
+    """mSPRT comparing the means (or proportions) of two arms
+
+    The mixture over the effect size is a normal distribution centered at
+    the null value with variance `mixture_variance`, which should be of the
+    order of the squared effect sizes expected in the experiment.
+    """
+
+    def __init__(self, mixture_variance: float, alpha: float = 0.05,
+                 null_val: float = 0, kind: str = "means"):
+        """
+        Args:
+            mixture_variance (float): variance of the mixing distribution
+                                      over the difference of means
+            alpha (float, optional): significance level. Defaults to 0.05.
+            null_val (float, optional): difference of means under the null.
+                                        Defaults to 0.
+            kind (str, optional): means/proportions. Defaults to "means".
+
+        Raises:
+            ValueError: when kind is invalid
+        """
+        if kind not in ("means", "proportions"):
+            raise ValueError("invalid kind")
+        self.mixture_variance = mixture_variance
+        self.alpha = alpha
+        self.null_val = null_val
+        self.kind = kind
+        self.stats1 = SummaryStats()
+        self.stats2 = SummaryStats()
+        self.p_value = 1.0
+        self.lower = -math.inf
+        self.upper = math.inf
+        # whether the intervals of two updates were ever disjoint
+        self.inconsistent = False
+
+    def update(self, values1=None, values2=None) -> tuple:
+        """Adds new observations of one or both arms and updates the results
+
+        Args:
+            values1 (np.ndarray or SummaryStats, optional): arm 1 values
+            values2 (np.ndarray or SummaryStats, optional): arm 2 values
+
+        Returns:
+            tuple: difference of means, always valid p value, lower and upper
+                   bounds of the confidence sequence
+        """
+        self.stats1 = self.__add(self.stats1, values1)
+        self.stats2 = self.__add(self.stats2, values2)
+        if min(self.stats1.n, self.stats2.n) < 2:
+            return self.result()
+
+        diff = self.stats1.mean - self.stats2.mean
+        var = self.__get_variance(self.stats1) + \
+            self.__get_variance(self.stats2)
+        if var <= 0:
+            return self.result()
+        tau2 = self.mixture_variance
+        log_ratio = 0.5 * math.log(var / (var + tau2)) + \
+            tau2 * (diff - self.null_val)**2 / (2 * var * (var + tau2))
+        self.p_value = min(self.p_value, math.exp(min(-log_ratio, 0.0)))
+
+        radius = math.sqrt(var * (var + tau2) / tau2 *
+                           (math.log((var + tau2) / var) +
+                            2 * math.log(1 / self.alpha)))
+        lower, upper = diff - radius, diff + radius
+        if lower > self.upper or upper < self.lower:
+            # an empty intersection would give an inverted interval
+            self.inconsistent = True
+            self.lower, self.upper = lower, upper
+        else:
+            self.lower = max(self.lower, lower)
+            self.upper = min(self.upper, upper)
+        return self.result()
+
+    def result(self) -> tuple:
+        """Gets current results without adding observations
+
+        Returns:
+            tuple: difference of means, always valid p value, lower and upper
+                   bounds of the confidence sequence
+        """
+        if min(self.stats1.n, self.stats2.n) == 0:
+            diff = math.nan
+        else:
+            diff = self.stats1.mean - self.stats2.mean
+        return (diff, self.p_value, self.lower, self.upper)
+
+    @property
+    def reject(self) -> bool:
+        """whether the null hypothesis is rejected at level alpha"""
+        return self.p_value <= self.alpha
+
+    @staticmethod
+    def __add(stats: SummaryStats, values) -> SummaryStats:
+        """Merges new values of an arm into its summary"""
+        if values is None:
+            return stats
+        if not isinstance(values, SummaryStats):
+            if len(values) == 0:
+                return stats
+            values = SummaryStats.from_values(values)
+        if stats.n == 0:
+            return SummaryStats(values.n, values.total, values.m2)
+        return stats.merge(values)
+
+    def __get_variance(self, stats: SummaryStats) -> float:
+        """Variance of the mean of an arm"""
+        if self.kind == "proportions":
+            p = stats.mean
+            return p * (1 - p) / stats.n
+        return stats.var / stats.n
@@ -0,0 +1,283 @@
+"""Asyncio service batching concurrent test requests
+
+Web handlers usually ask for one test at a time, and a single call costs
+far more in Python overhead than in arithmetic. StatsService queues the
+requests of all coroutines, collects those arriving within `max_delay`
+seconds (up to `max_batch_size`), evaluates each kind of test of the batch
+in one vectorized call of classical.workout and hands every caller its
+own result.
+
+Arguments are checked and converted in the calling coroutine, so an
+invalid request raises in its caller and never reaches a batch; a batch
+which still fails is evaluated request by request, so every error only
+reaches the caller whose request raised it.
+
+The queue holds at most `max_pending` requests; callers wait for room when
+it is full, which slows down producers instead of letting the queue grow
+without bound.
+
+usage:
+    async with StatsService(max_batch_size=1024, max_delay=0.001) as service:
+        z, p_value = await service.two_props_hypothesis(120, 1000, 150, 1000)
+
+1. StatsService
+"""
+
+import asyncio
+import numpy as np
+import classical.workout.means as means
+import classical.workout.proportions as proportions
+from classical.summary import SummaryStats, as_summary
+
+
+class StatsService:
+    """Evaluates two sample tests of concurrent callers in batches"""
+
+    def __init__(self, max_batch_size: int = 1024, max_delay: float = 0.001,
+                 max_pending: int = 65536):
+        """
+        Args:
+            max_batch_size (int, optional): max number of requests evaluated
+                                            at once. Defaults to 1024.
+            max_delay (float, optional): seconds a batch waits for more
+                requests after its first one. Defaults to 0.001.
+            max_pending (int, optional): max number of queued requests.
+                                         Defaults to 65536.
+        """
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.n_requests = 0
+        self.n_batches = 0
+        self._queue = None
+        self._worker = None
+
+    async def start(self):
+        """Starts the batching worker in the running event loop"""
+        if self._worker is None:
+            self._queue = asyncio.Queue(self.max_pending)
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Evaluates the queued requests and stops the worker"""
+        if self._worker is not None:
+            await self._queue.join()
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def __aenter__(self) -> "StatsService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def two_props_hypothesis(self, count1: int, nobs1: int,
+                                   count2: int, nobs2: int,
+                                   alternative: str = "two-sided") -> tuple:
+        """z test for comparing two proportions
+
+        Args:
+            count1 (int): sample 1 count of ones
+            nobs1 (int): sample 1 number of observations
+            count2 (int): sample 2 count of ones
+            nobs2 (int): sample 2 number of observations
+            alternative (str, optional): two-sided/larger/smaller.
+                                         Defaults to "two-sided".
+
+        Returns:
+            tuple: z_statistic and p value of the test
+        """
+        return await self._submit(("two_props_hypothesis", alternative),
+                                  self.__counts(count1, nobs1, count2, nobs2))
+
+    async def two_props_diff_conf_interval(self, count1: int, nobs1: int,
+                                           count2: int, nobs2: int,
+                                           conf_level: float = 0.95) -> tuple:
+        """Calculates the confidence interval for the diff between two
+        proportions
+
+        Args:
+            count1 (int): sample 1 count of ones
+            nobs1 (int): sample 1 number of observations
+            count2 (int): sample 2 count of ones
+            nobs2 (int): sample 2 number of observations
+            conf_level (float, optional): confidence level.
+                                          Defaults to 0.95.
+
+        Returns:
+            tuple: lower and upper values of confidence interval
+        """
+        return await self._submit(
+            ("two_props_diff_conf_interval", conf_level),
+            self.__counts(count1, nobs1, count2, nobs2))
+
+    async def two_means_hypothesis(self, values1, values2,
+                                   pooled: bool = False,
+                                   alternative: str = "two-sided") -> tuple:
+        """t test comparing two means
+
+        Args:
+            values1 (np.array or SummaryStats): sample 1 values
+            values2 (np.array or SummaryStats): sample 2 values
+            pooled (bool, optional): whether to calculate pooled std.
+                                     Defaults to False.
+            alternative (str, optional): two-sided/larger/smaller.
+                                         Defaults to "two-sided".
+
+        Returns:
+            tuple: t_statistic and p_value of the test
+        """
+        return await self._submit(
+            ("two_means_hypothesis", pooled, alternative),
+            self.__summaries(values1, values2))
+
+    async def two_means_diff_conf_interval(self, values1, values2,
+                                           conf_level: float = 0.95,
+                                           pooled: bool = False) -> tuple:
+        """Calculates confidence interval for the difference of two means
+
+        Args:
+            values1 (np.array or SummaryStats): sample 1 values
+            values2 (np.array or SummaryStats): sample 2 values
+            conf_level (float, optional): confidence level.
+                                          Defaults to 0.95.
+            pooled (bool, optional): whether to calculate pooled std.
+                                     Defaults to False.
+
+        Returns:
+            tuple: lower and upper values of confidence interval
+        """
+        return await self._submit(
+            ("two_means_diff_conf_interval", conf_level, pooled),
+            self.__summaries(values1, values2))
+
+    async def _submit(self, key: tuple, args: tuple) -> tuple:
+        """Queues a request and waits for its result"""
+        if self._worker is None:
+            raise RuntimeError("service is not started")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((key, args, future))
+        return await future
+
+    async def _run(self):
+        """Collects batches of requests and evaluates them"""
+        while True:
+            batch = [await self._queue.get()]
+            self.__drain(batch)
+            if len(batch) < self.max_batch_size:
+                # one sleep per batch is much cheaper than waiting on the
+                # queue for every request
+                await asyncio.sleep(self.max_delay)
+                self.__drain(batch)
+            self.__evaluate(batch)
+            self.n_requests += len(batch)
+            self.n_batches += 1
+            for _ in batch:
+                self._queue.task_done()
+
+    def __drain(self, batch: list):
+        """Moves queued requests to the batch, up to max_batch_size"""
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                return
+
+    def __evaluate(self, batch: list):
+        """Evaluates every kind of test of a batch in one vectorized call
+        and resolves the futures of the callers"""
+        groups = {}
+        for key, args, future in batch:
+            groups.setdefault(key, []).append((args, future))
+        for key, requests in groups.items():
+            futures = [future for _, future in requests]
+            try:
+                results = self.__compute(key, [args for args, _ in requests])
+            except Exception:
+                # evaluates requests one by one, so an error only reaches
+                # the caller whose request raised it
+                for args, future in requests:
+                    self.__resolve(future, key, [args])
+                continue
+            for i, future in enumerate(futures):
+                if not future.done():
+                    future.set_result(tuple(result[i] for result in results))
+
+    def __resolve(self, future: asyncio.Future, key: tuple, requests: list):
+        """Computes a single request and resolves its future"""
+        try:
+            results = self.__compute(key, requests)
+        except Exception as error:
+            if not future.done():
+                future.set_exception(error)
+            return
+        if not future.done():
+            future.set_result(tuple(result[0] for result in results))
+
+    @staticmethod
+    def __compute(key: tuple, requests: list) -> tuple:
+        """Computes the results of the requests of one kind of test
+
+        Returns:
+            tuple: arrays of every result field, one element per request
+        """
+        name, *options = key
+        if name.startswith("two_props"):
+            counts1, nobs1, counts2, nobs2 = np.array(requests).T
+            if name == "two_props_hypothesis":
+                return proportions.two_props_hypothesis_batch(
+                    counts1, nobs1, counts2, nobs2, *options)
+            return proportions.two_props_diff_conf_interval_batch(
+                counts1, nobs1, counts2, nobs2, *options)
+
+        fields = np.array([(stats1.n, stats1.total, stats1.m2,
+                            stats2.n, stats2.total, stats2.m2)
+                           for stats1, stats2 in requests], dtype=float).T
+        stats1, stats2 = SummaryStats(*fields[:3]), SummaryStats(*fields[3:])
+        if name == "two_means_hypothesis":
+            pooled, alternative = options
+            return means.two_means_hypothesis(stats1, stats2, pooled,
+                                              alternative)
+        conf_level, pooled = options
+        return means.two_means_diff_conf_interval(stats1, stats2, conf_level,
+                                                  pooled)
+
+    @staticmethod
+    def __counts(*counts) -> tuple:
+        """Converts counts and numbers of observations to floats in the
+        calling coroutine, so invalid arguments fail only their caller
+
+        Raises:
+            ValueError: when a value is not a finite number
+        """
+        try:
+            counts = tuple(float(count) for count in counts)
+        except (TypeError, ValueError):
+            raise ValueError("counts must be numbers") from None
+        if not all(np.isfinite(counts)):
+            raise ValueError("counts must be finite")
+        return counts
+
+    @classmethod
+    def __summaries(cls, values1, values2) -> tuple:
+        """Summarizes raw samples in the calling coroutine, so batches only
+        carry summaries
+
+        Raises:
+            ValueError: when a summary field is not a number
+        """
+        summaries = []
+        for values in (values1, values2):
+            stats = as_summary(values)
+            try:
+                fields = [float(field)
+                          for field in (stats.n, stats.total, stats.m2)]
+            except (TypeError, ValueError):
+                raise ValueError("values must be numbers") from None
+            summaries.append(SummaryStats(*fields))
+        return tuple(summaries)
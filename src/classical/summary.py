@@ -0,0 +1,449 @@
+"""Summary statistics of samples
+
+The tests for means and proportions only need the number of observations,
+the sum of the values and their spread, so they accept these summaries in
+place of the raw sample values.
+
+Binary (0/1) samples are summarized by their count of ones alone, which
+can be taken from boolean arrays or from bits packed with np.packbits, 1/8
+of the memory of a boolean array.
+
+CrossMoments extends the summary to metrics paired with covariates, for
+regression adjusted (CUPED) comparisons.
+
+1. SummaryStats
+2. CrossMoments
+3. as_summary
+4. as_binary_summary
+"""
+
+import numpy as np
+
+# number of values summarized at once, small enough to stay in cache
+BLOCK_SIZE = 1 << 16
+# number of set bits of every byte value
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)],
+                     dtype=np.uint8)
+
+
+class SummaryStats:
+    """Sufficient statistics of a sample: number of observations, sum of
+    values and sum of squared deviations from the mean (m2)
+
+    The fields may also be arrays holding the summaries of several groups,
+    as built by `from_labels`.
+
+    Summaries of disjoint samples are merged with `merge` (or `+`), so they
+    can be aggregated per partition and combined afterwards. `update` folds
+    new chunks of values into the summary in place, which allows summarizing
+    streams that do not fit in memory.
+    """
+
+    __slots__ = ("n", "total", "m2")
+
+    def __init__(self, n: int = 0, total: float = 0.0, m2: float = 0.0):
+        """
+        Args:
+            n (int, optional): number of observations. Defaults to 0.
+            total (float, optional): sum of values. Defaults to 0.
+            m2 (float, optional): sum of squared deviations from the mean.
+                                  Defaults to 0.
+        """
+        self.n = n
+        self.total = total
+        self.m2 = m2
+
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> "SummaryStats":
+        """Summarizes raw sample values
+
+        Large arrays are processed in cache sized blocks whose summaries are
+        merged, so the data is read from memory once and the sum of squared
+        deviations stays numerically stable.
+
+        Args:
+            values (np.ndarray): sample values
+
+        Returns:
+            SummaryStats: summary of the sample
+        """
+        values = np.asarray(values)
+        n = len(values)
+        if n <= BLOCK_SIZE:
+            total = np.sum(values)
+            m2 = np.sum((values - total / n)**2)
+            return cls(n, total, m2)
+        stats = cls()
+        for start in range(0, n, BLOCK_SIZE):
+            stats.update(values[start:start + BLOCK_SIZE])
+        return stats
+
+    @classmethod
+    def from_labels(cls, values: np.ndarray, labels: np.ndarray,
+                    n_groups: int = None) -> "SummaryStats":
+        """Summarizes every group of a labelled sample at once
+
+        Per group counts, sums and squared deviations are weighted
+        bincounts over cache sized blocks, so the sample is read once and
+        never split into per group arrays.
+
+        Args:
+            values (np.ndarray): sample values
+            labels (np.ndarray): integer group (0 to n_groups - 1) of every
+                                 value
+            n_groups (int, optional): number of groups. Defaults to the
+                                      largest label + 1.
+
+        Raises:
+            ValueError: when values and labels have different lengths
+
+        Returns:
+            SummaryStats: summary holding one array element per group
+        """
+        values, labels = np.asarray(values), np.asarray(labels)
+        if len(values) != len(labels):
+            raise ValueError("values and labels have different lengths")
+        if n_groups is None:
+            n_groups = int(labels.max()) + 1 if len(labels) else 0
+        n = np.zeros(n_groups, dtype=np.int64)
+        total = np.zeros(n_groups)
+        m2 = np.zeros(n_groups)
+        for start in range(0, len(values), BLOCK_SIZE):
+            block = values[start:start + BLOCK_SIZE]
+            label = labels[start:start + BLOCK_SIZE]
+            count = np.bincount(label, minlength=n_groups)
+            block_total = np.bincount(label, weights=block,
+                                      minlength=n_groups)
+            block_mean = block_total / np.maximum(count, 1)
+            deviation = block - block_mean[label]
+            block_m2 = np.bincount(label, weights=deviation * deviation,
+                                   minlength=n_groups)
+            # Chan et al. update, written to leave empty groups at zero
+            merged_n = n + count
+            delta = block_mean - total / np.maximum(n, 1)
+            m2 += block_m2 + delta**2 * n * count / np.maximum(merged_n, 1)
+            total += block_total
+            n = merged_n
+        return cls(n, total, m2)
+
+    @classmethod
+    def from_chunks(cls, chunks) -> "SummaryStats":
+        """Summarizes a sample streamed as chunks of values
+
+        Only one chunk is held in memory at a time.
+
+        Args:
+            chunks (iterable): iterable of np.ndarray chunks of sample values
+
+        Returns:
+            SummaryStats: summary of the sample
+        """
+        stats = cls()
+        for chunk in chunks:
+            stats.update(chunk)
+        return stats
+
+    @classmethod
+    def from_sums(cls, n: int, total: float,
+                  total_sq: float) -> "SummaryStats":
+        """Creates summary from the sum and the sum of squares of values
+
+        Args:
+            n (int): number of observations
+            total (float): sum of values
+            total_sq (float): sum of squared values
+
+        Returns:
+            SummaryStats: summary of the sample
+        """
+        m2 = np.maximum(total_sq - total**2 / n, 0.0)
+        return cls(n, total, m2)
+
+    @classmethod
+    def from_counts(cls, count: int, n: int) -> "SummaryStats":
+        """Creates summary of a binary (0/1) sample from its count of ones
+
+        Args:
+            count (int): number of ones
+            n (int): number of observations
+
+        Returns:
+            SummaryStats: summary of the sample
+        """
+        # float, as count**2 overflows int64 from about 3e9
+        count = np.asarray(count, dtype=float)[()]
+        return cls(n, count, count - count**2 / n)
+
+    @classmethod
+    def from_binary(cls, values: np.ndarray) -> "SummaryStats":
+        """Summarizes a binary (0/1 or boolean) sample from its count of
+        ones, without computing deviations from the mean
+
+        Args:
+            values (np.ndarray): sample binary values
+
+        Returns:
+            SummaryStats: summary of the sample
+        """
+        values = np.asarray(values)
+        if values.dtype == bool:
+            count = np.count_nonzero(values)
+        else:
+            count = np.sum(values)
+        return cls.from_counts(count, len(values))
+
+    @classmethod
+    def from_packed(cls, packed: np.ndarray, n: int) -> "SummaryStats":
+        """Summarizes a binary sample packed into bits with np.packbits
+
+        Args:
+            packed (np.ndarray): uint8 array of packed sample values
+            n (int): number of observations (the packed array is padded to
+                     a multiple of 8 bits, whose padding bits are ignored)
+
+        Raises:
+            ValueError: when packed is not an uint8 array of n bits
+
+        Returns:
+            SummaryStats: summary of the sample
+        """
+        packed = np.asarray(packed)
+        if packed.dtype != np.uint8 or len(packed) != (n + 7) // 8:
+            raise ValueError("packed must be the uint8 packbits of n values")
+        count = 0
+        if n % 8:
+            # padding bits of the last byte are not necessarily zero
+            count = int(_POPCOUNT[packed[-1] & (0xFF << (8 - n % 8) & 0xFF)])
+            packed = packed[:-1]
+        for start in range(0, len(packed), BLOCK_SIZE):
+            block = packed[start:start + BLOCK_SIZE]
+            if hasattr(np, "bitwise_count"):
+                count += int(np.sum(np.bitwise_count(block), dtype=np.int64))
+            else:
+                count += int(np.sum(_POPCOUNT[block], dtype=np.int64))
+        return cls.from_counts(count, n)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.n
+
+    @property
+    def var(self) -> float:
+        """sample variance (ddof=1)"""
+        return self.m2 / (self.n - 1)
+
+    @property
+    def std(self) -> float:
+        """sample standard deviation (ddof=1)"""
+        return np.sqrt(self.var)
+
+    def merge(self, other: "SummaryStats") -> "SummaryStats":
+        """Combines summaries of two disjoint samples
+
+        Uses Chan et al. parallel update of the sum of squared deviations.
+        Summaries holding arrays are merged elementwise, and empty samples
+        (or groups) leave the other summary unchanged.
+
+        Args:
+            other (SummaryStats): summary of the other sample
+
+        Returns:
+            SummaryStats: summary of both samples
+        """
+        n = self.n + other.n
+        delta = other.total / np.maximum(other.n, 1) - \
+            self.total / np.maximum(self.n, 1)
+        m2 = self.m2 + other.m2 + \
+            delta**2 * self.n * other.n / np.maximum(n, 1)
+        return SummaryStats(n, self.total + other.total, m2)
+
+    __add__ = merge
+
+    def update(self, values: np.ndarray) -> "SummaryStats":
+        """Folds a chunk of new values into the summary in place
+
+        Args:
+            values (np.ndarray): chunk of sample values
+
+        Returns:
+            SummaryStats: the updated summary
+        """
+        if len(values) == 0:
+            return self
+        chunk = SummaryStats.from_values(values)
+        if self.n == 0:
+            merged = chunk
+        else:
+            merged = self.merge(chunk)
+        self.n, self.total, self.m2 = merged.n, merged.total, merged.m2
+        return self
+
+    def __repr__(self) -> str:
+        return "SummaryStats(n={!r}, total={!r}, m2={!r})".format(
+            self.n, self.total, self.m2)
+
+
+class CrossMoments:
+    """Sufficient statistics of metrics and their covariates: number of
+    observations, sums and sums of squared deviations of both, and the sum
+    of cross products of deviations (c_xy) of every metric with its
+    covariate
+
+    Every field but n holds one element per metric. Like SummaryStats,
+    moments of disjoint samples are merged with `merge` (or `+`) and new
+    chunks folded in place with `update`.
+    """
+
+    __slots__ = ("n", "total_y", "total_x", "m2_y", "m2_x", "c_xy")
+
+    def __init__(self, n: int = 0, total_y=0.0, total_x=0.0, m2_y=0.0,
+                 m2_x=0.0, c_xy=0.0):
+        """
+        Args:
+            n (int, optional): number of observations. Defaults to 0.
+            total_y (np.ndarray, optional): sums of metrics. Defaults to 0.
+            total_x (np.ndarray, optional): sums of covariates.
+                                            Defaults to 0.
+            m2_y (np.ndarray, optional): sums of squared deviations of
+                                         metrics. Defaults to 0.
+            m2_x (np.ndarray, optional): sums of squared deviations of
+                                         covariates. Defaults to 0.
+            c_xy (np.ndarray, optional): sums of cross products of
+                                         deviations. Defaults to 0.
+        """
+        self.n = n
+        self.total_y = total_y
+        self.total_x = total_x
+        self.m2_y = m2_y
+        self.m2_x = m2_x
+        self.c_xy = c_xy
+
+    @classmethod
+    def from_values(cls, values: np.ndarray,
+                    covariates: np.ndarray) -> "CrossMoments":
+        """Computes moments of a metrics matrix and its covariates
+
+        Rows are processed in cache sized blocks whose moments are merged,
+        so the data is read from memory once.
+
+        Args:
+            values (np.ndarray): metric values, rows x metrics
+            covariates (np.ndarray): covariate of every metric value (same
+                                     shape), or one covariate per row
+
+        Returns:
+            CrossMoments: moments of the sample
+        """
+        values = np.asarray(values, dtype=float)
+        if values.ndim == 1:
+            values = values[:, np.newaxis]
+        covariates = np.asarray(covariates, dtype=float)
+        if covariates.ndim == 1:
+            covariates = covariates[:, np.newaxis]
+        block_rows = max(BLOCK_SIZE // values.shape[1], 1)
+        moments = cls()
+        for start in range(0, len(values), block_rows):
+            moments.update(values[start:start + block_rows],
+                           covariates[start:start + block_rows])
+        return moments
+
+    @property
+    def mean_y(self) -> np.ndarray:
+        return self.total_y / self.n
+
+    @property
+    def mean_x(self) -> np.ndarray:
+        return self.total_x / self.n
+
+    @property
+    def summary(self) -> SummaryStats:
+        """summary of the metrics alone"""
+        return SummaryStats(self.n, self.total_y, self.m2_y)
+
+    def merge(self, other: "CrossMoments") -> "CrossMoments":
+        """Combines moments of two disjoint samples
+
+        Args:
+            other (CrossMoments): moments of the other sample
+
+        Returns:
+            CrossMoments: moments of both samples
+        """
+        if self.n == 0 or other.n == 0:
+            source = other if self.n == 0 else self
+            return CrossMoments(source.n, source.total_y, source.total_x,
+                                source.m2_y, source.m2_x, source.c_xy)
+        n = self.n + other.n
+        weight = self.n * other.n / n
+        delta_y = other.mean_y - self.mean_y
+        delta_x = other.mean_x - self.mean_x
+        return CrossMoments(n, self.total_y + other.total_y,
+                            self.total_x + other.total_x,
+                            self.m2_y + other.m2_y + delta_y**2 * weight,
+                            self.m2_x + other.m2_x + delta_x**2 * weight,
+                            self.c_xy + other.c_xy +
+                            delta_x * delta_y * weight)
+
+    __add__ = merge
+
+    def update(self, values: np.ndarray,
+               covariates: np.ndarray) -> "CrossMoments":
+        """Folds a chunk of new rows into the moments in place
+
+        Args:
+            values (np.ndarray): chunk of metric values, rows x metrics
+            covariates (np.ndarray): covariates of the chunk
+
+        Returns:
+            CrossMoments: the updated moments
+        """
+        n = len(values)
+        if n == 0:
+            return self
+        total_y = np.sum(values, axis=0)
+        total_x = np.sum(covariates, axis=0)
+        deviation_y = values - total_y / n
+        deviation_x = covariates - total_x / n
+        chunk = CrossMoments(n, total_y, total_x,
+                             np.sum(deviation_y**2, axis=0),
+                             np.sum(deviation_x**2, axis=0),
+                             np.sum(deviation_x * deviation_y, axis=0))
+        merged = self.merge(chunk)
+        for name in self.__slots__:
+            setattr(self, name, getattr(merged, name))
+        return self
+
+    def __repr__(self) -> str:
+        return "CrossMoments(n={!r}, total_y={!r}, total_x={!r}, " \
+            "m2_y={!r}, m2_x={!r}, c_xy={!r})".format(
+                self.n, self.total_y, self.total_x, self.m2_y, self.m2_x,
+                self.c_xy)
+
+
+def as_summary(values) -> SummaryStats:
+    """Gets summary of the input sample
+
+    Args:
+        values (np.ndarray or SummaryStats): sample values or their summary
+
+    Returns:
+        SummaryStats: summary of the sample
+    """
+    if isinstance(values, SummaryStats):
+        return values
+    return SummaryStats.from_values(values)
+
+
+def as_binary_summary(values) -> SummaryStats:
+    """Gets summary of the input binary sample
+
+    Args:
+        values (np.ndarray or SummaryStats): sample binary(0/1) values or
+                                             their summary
+
+    Returns:
+        SummaryStats: summary of the sample
+    """
+    if isinstance(values, SummaryStats):
+        return values
+    return SummaryStats.from_binary(values)
@@ -0,0 +1,164 @@
+"""Contingency tables of two categorical variables
+
+Builds the observed r x c table expected by two_categorical_hypothesis
+from the raw integer codes of both variables, as one bincount over the
+combined codes of every row (row code * c + column code). The codes are
+read a block at a time, so no temporary array of the size of the data is
+created, and tables of chunks of a stream are accumulated in place.
+
+Codes may be integer arrays or pandas Categoricals (anything with a
+`codes` attribute, or a Series with a `cat` accessor). Negative codes mark
+missing values, as in pandas, and are left out of the table.
+
+1. ContingencyTable
+2. contingency_table
+"""
+
+import numpy as np
+from classical.summary import BLOCK_SIZE
+
+
+class ContingencyTable:
+    """Counts of every pair of codes of two categorical variables
+
+    `observed` is the r x c table of counts, which can be passed to the chi
+    square tests as is. Tables of disjoint chunks are combined with
+    `merge` (or `+`).
+    """
+
+    __slots__ = ("observed",)
+
+    def __init__(self, n_rows: int, n_cols: int):
+        """
+        Args:
+            n_rows (int): number of categories of the first variable
+            n_cols (int): number of categories of the second variable
+        """
+        self.observed = np.zeros((n_rows, n_cols), dtype=np.int64)
+
+    @classmethod
+    def from_chunks(cls, chunks, n_rows: int,
+                    n_cols: int) -> "ContingencyTable":
+        """Builds table of two variables streamed as chunks of codes
+
+        Args:
+            chunks (iterable): iterable of (codes1, codes2) chunks
+            n_rows (int): number of categories of the first variable
+            n_cols (int): number of categories of the second variable
+
+        Returns:
+            ContingencyTable: table of all chunks
+        """
+        table = cls(n_rows, n_cols)
+        for codes1, codes2 in chunks:
+            table.update(codes1, codes2)
+        return table
+
+    @property
+    def shape(self) -> tuple:
+        return self.observed.shape
+
+    def update(self, codes1, codes2) -> "ContingencyTable":
+        """Counts a chunk of pairs of codes into the table in place
+
+        Args:
+            codes1 (np.ndarray or pd.Categorical): codes of the first
+                                                   variable (table rows)
+            codes2 (np.ndarray or pd.Categorical): codes of the second
+                                                   variable (table columns)
+
+        Raises:
+            ValueError: when the codes are not integers, have different
+                        lengths or do not fit in the table
+
+        Returns:
+            ContingencyTable: the updated table
+        """
+        codes1, codes2 = self.__get_codes(codes1), self.__get_codes(codes2)
+        if len(codes1) != len(codes2):
+            raise ValueError("codes have different lengths")
+        n_rows, n_cols = self.observed.shape
+        size = n_rows * n_cols
+        counts = self.observed.reshape(size)
+        for start in range(0, len(codes1), BLOCK_SIZE):
+            rows = codes1[start:start + BLOCK_SIZE]
+            cols = codes2[start:start + BLOCK_SIZE]
+            if rows.max(initial=-1) >= n_rows or \
+                    cols.max(initial=-1) >= n_cols:
+                raise ValueError("codes do not fit in the table")
+            combined = rows.astype(np.int64) * n_cols + cols
+            valid = (rows >= 0) & (cols >= 0)
+            if not valid.all():
+                combined = combined[valid]
+            counts += np.bincount(combined, minlength=size)
+        return self
+
+    def merge(self, other: "ContingencyTable") -> "ContingencyTable":
+        """Combines tables of two disjoint samples
+
+        Args:
+            other (ContingencyTable): table of the other sample
+
+        Returns:
+            ContingencyTable: table of both samples
+        """
+        table = ContingencyTable(*self.shape)
+        np.add(self.observed, other.observed, out=table.observed)
+        return table
+
+    __add__ = merge
+
+    def __repr__(self) -> str:
+        return "ContingencyTable({!r})".format(self.observed)
+
+    @staticmethod
+    def __get_codes(values) -> np.ndarray:
+        """Gets integer codes of a categorical variable without copying"""
+        if hasattr(values, "cat"):
+            values = values.cat.codes
+        values = np.asarray(getattr(values, "codes", values))
+        if not np.issubdtype(values.dtype, np.integer):
+            raise ValueError("codes must be integers")
+        return values
+
+
+def contingency_table(codes1, codes2, n_rows: int = None,
+                      n_cols: int = None) -> np.ndarray:
+    """Builds the r x c table of counts of two categorical variables
+
+    Args:
+        codes1 (np.ndarray or pd.Categorical): codes of the first variable
+                                               (table rows)
+        codes2 (np.ndarray or pd.Categorical): codes of the second variable
+                                               (table columns)
+        n_rows (int, optional): number of categories of the first variable.
+            Defaults to the number of categories of a Categorical, else to
+            the largest code + 1.
+        n_cols (int, optional): number of categories of the second variable,
+                                with the same default.
+
+    Returns:
+        np.ndarray: observed counts, rows are codes of the first variable
+                    and columns codes of the second one
+    """
+    if n_rows is None:
+        n_rows = __get_n_categories(codes1)
+    if n_cols is None:
+        n_cols = __get_n_categories(codes2)
+    return ContingencyTable(n_rows, n_cols).update(codes1, codes2).observed
+
+
+def __get_n_categories(values) -> int:
+    """Gets number of categories of a categorical variable
+
+    Raises:
+        ValueError: when the codes are not integers
+    """
+    if hasattr(values, "cat"):
+        values = values.cat
+    if hasattr(values, "categories"):
+        return len(values.categories)
+    codes = np.asarray(getattr(values, "codes", values))
+    if not np.issubdtype(codes.dtype, np.integer):
+        raise ValueError("codes must be integers")
+    return int(codes.max(initial=-1)) + 1
@@ -5,13 +5,15 @@ functions:
 
 1. one_categorical_hypothesis
 2. two_categorical_hypothesis
+3. two_categorical_hypothesis_ragged
 """
 
 import numpy as np
-import scipy.stats
+from scipy import special
 
 
-def one_categorical_hypothesis(counts: np.ndarray, nobs: np.ndarray) -> tuple:
+def one_categorical_hypothesis(counts: np.ndarray, nobs: np.ndarray,
+                               mask: np.ndarray = None) -> tuple:
     """Applying chi square test goodness of fit
 
     Ho: the observed counts of the input groups follow population distribution
@@ -19,17 +21,32 @@ def one_categorical_hypothesis(counts: np.ndarray, nobs: np.ndarray) -> tuple:
         (not random pick form population)
 
     Args:
-        counts (np.ndarray): input group  observed counts
-        nobs (np.ndarray): input group total count
+        counts (np.ndarray): input group  observed counts, or 2d array of
+                             experiments x groups to test all at once
+        nobs (np.ndarray): input group total count (same shape as counts)
+        mask (np.ndarray, optional): True for missing groups, which are
+                                     left out of the test
 
     Returns:
-        tuple: chi square value, p value
+        tuple: chi square value, p value (arrays of one value per
+               experiment for 2d counts)
     """
-    p_expected = sum(counts) / sum(nobs)
+    counts = np.asarray(counts, dtype=float)
+    nobs = np.asarray(nobs, dtype=float)
+    present = np.ones(counts.shape, dtype=bool)
+    if mask is not None:
+        present = ~np.broadcast_to(mask, counts.shape)
+        counts = np.where(present, counts, 0)
+        nobs = np.where(present, nobs, 0)
+    p_expected = np.sum(counts, axis=-1, keepdims=True) / \
+        np.sum(nobs, axis=-1, keepdims=True)
     expected_counts = nobs * p_expected
-    chi_square = sum((counts-expected_counts)**2/expected_counts)
-    df = len(nobs) - 1
-    p_value = scipy.stats.chi2.sf(chi_square, df)
+    chi_square = np.sum(np.divide((counts-expected_counts)**2,
+                                  expected_counts,
+                                  out=np.zeros(counts.shape),
+                                  where=present), axis=-1)
+    df = np.sum(present, axis=-1) - 1
+    p_value = special.chdtrc(df, chi_square)
     return chi_square, p_value
 
 
@@ -41,19 +58,58 @@ def two_categorical_hypothesis(observed: np.ndarray) -> tuple:
 
     Args:
         observed (np.ndarray): 2d array the rows represent first variable
-                                        the columns represent second variable
+                                        the columns represent second variable,
+                               or 3d array stacking k tables of the same
+                               shape to test all at once
 
     Returns:
-        tuple: chi square value, p value
+        tuple: chi square value, p value (arrays of k values for a stack
+               of tables)
     """
-    nrow, ncol = observed.shape
-    row_totals = np.sum(observed, axis=1).reshape(nrow, 1)
-    column_totals = np.sum(observed, axis=0).reshape(ncol, 1)
-    total = np.sum(observed)
-
-    expected = column_totals.T * (row_totals/total)
-    print(expected.shape)
-    chi_square = np.sum((observed-expected)**2/expected)
+    observed = np.asarray(observed)
+    nrow, ncol = observed.shape[-2:]
+    row_totals = np.sum(observed, axis=-1, keepdims=True)
+    column_totals = np.sum(observed, axis=-2, keepdims=True)
+    total = np.sum(row_totals, axis=-2, keepdims=True)
+
+    expected = row_totals * (column_totals / total)
+    chi_square = np.sum((observed-expected)**2/expected, axis=(-2, -1))
     df = (nrow - 1) * (ncol - 1)
-    p_value = scipy.stats.chi2.sf(chi_square, df)
+    p_value = special.chdtrc(df, chi_square)
+    return chi_square, p_value
+
+
+def two_categorical_hypothesis_ragged(observed: np.ndarray,
+                                      offsets: np.ndarray) -> tuple:
+    """Applying chi square independence test to many tables with the same
+    columns and different numbers of rows
+
+    Args:
+        observed (np.ndarray): 2d array of the rows of all tables, one
+                               table after the other
+        offsets (np.ndarray): index of the first row of every table
+
+    Raises:
+        ValueError: when offsets do not start at 0 or are not increasing
+
+    Returns:
+        tuple: arrays of chi square values and p values, one per table
+    """
+    observed = np.asarray(observed)
+    offsets = np.asarray(offsets)
+    nrows = np.diff(np.append(offsets, len(observed)))
+    if offsets[0] != 0 or np.any(nrows <= 0):
+        raise ValueError("offsets must start at 0 and be increasing")
+    ncol = observed.shape[1]
+    table = np.repeat(np.arange(len(offsets)), nrows)
+
+    row_totals = np.sum(observed, axis=1, keepdims=True)
+    column_totals = np.add.reduceat(observed, offsets, axis=0)
+    total = np.sum(column_totals, axis=1, keepdims=True)
+
+    expected = row_totals * (column_totals / total)[table]
+    contributions = np.sum((observed-expected)**2/expected, axis=1)
+    chi_square = np.add.reduceat(contributions, offsets)
+    df = (nrows - 1) * (ncol - 1)
+    p_value = special.chdtrc(df, chi_square)
     return chi_square, p_value
@@ -7,12 +7,17 @@ The module contains useful functions for evaluating AB tests
 2. one_mean_hypothesis
 3. two_means_diff_conf_interval
 4. two_means_hypothesis
+5. two_means_test
+6. multiple_mean_hypothesis
+7. multiple_mean_hypothesis_by_label
+8. two_means_cuped_test
 
 """
 
 import math
 import numpy as np
 import classical.workout.utils as utils
+from classical.summary import CrossMoments, SummaryStats, as_summary
 
 
 def one_mean_conf_interval(values: np.ndarray,
@@ -20,15 +25,16 @@ def one_mean_conf_interval(values: np.ndarray,
     """calculates confidence interval for mean
 
     Args:
-        values (np.array): list of sample values
+        values (np.array or SummaryStats): list of sample values
         conf_level (float, optional): confidence level. Defaults to 0.95.
 
     Returns:
         tuple: lower and upper bounds of confidence interval
     """
-    x_bar = np.mean(values)
-    sd = np.std(values,  ddof=1)
-    n = len(values)
+    stats = as_summary(values)
+    x_bar = stats.mean
+    sd = stats.std
+    n = stats.n
     se = sd/math.sqrt(n)
     t_critical = utils.get_t_critical(conf_level, n-1)
     lower_ci = x_bar - t_critical * se
@@ -39,9 +45,21 @@ def one_mean_conf_interval(values: np.ndarray,
 def one_mean_hypothesis(values: np.ndarray,
                         null_val: float = 0,
                         alternative: str = "two-sided") -> tuple:
-    x_bar = np.mean(values)
-    sd = np.std(values, ddof=1)
-    n = len(values)
+    """Null hypothesis testing that mean of population is equal to null_val
+
+    Args:
+        values (np.ndarray or SummaryStats): sample values
+        null_val (float, optional): null value. Defaults to 0.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+
+    Returns:
+        tuple: t statistic,  p_value of the test
+    """
+    stats = as_summary(values)
+    x_bar = stats.mean
+    sd = stats.std
+    n = stats.n
     se = sd/math.sqrt(n)
     t_statistic = (x_bar-null_val)/se
     df = n - 1
@@ -55,8 +73,8 @@ def two_means_diff_conf_interval(values1: np.ndarray, values2: np.ndarray,
     """Calculates confidence interval for the difference of two means
 
     Args:
-        values1 (np.array): sample 1 values
-        values2 (np.array): sample 2 values
+        values1 (np.array or SummaryStats): sample 1 values
+        values2 (np.array or SummaryStats): sample 2 values
         conf_level (float): confidence level
         pooled (bool, optional): whether to calculate pooled std.
                                  Defaults to False.
@@ -64,12 +82,8 @@ def two_means_diff_conf_interval(values1: np.ndarray, values2: np.ndarray,
     Returns:
         tuple: lower and upper values of confidence interval
     """
-    x_bar1 = np.mean(values1)
-    x_bar2 = np.mean(values2)
-    x_diff = x_bar1 - x_bar2
-    n1, n2 = len(values1), len(values2)
-    se = __get_two_sample_standard_error(values1, values2, pooled)
-    df = (n1 + n2 - 2) if pooled else min(n1 - 1, n2 - 1)
+    stats1, stats2 = as_summary(values1), as_summary(values2)
+    x_diff, se, df = __compare_means(stats1, stats2, pooled)
 
     t_critical = utils.get_t_critical(conf_level, df)
     lower_ci = x_diff - t_critical * se
@@ -83,8 +97,8 @@ def two_means_hypothesis(values1: np.ndarray, values2: np.ndarray,
     """Perform two sided t test to comparing two means
 
     Args:
-        values1 (np.array): sample 1 values
-        values2 (np.array): sample 2 values
+        values1 (np.array or SummaryStats): sample 1 values
+        values2 (np.array or SummaryStats): sample 2 values
         pooled (bool, optional): whether to calculate pooled std.
                                  Defaults to False.
         alternative (str, optional): two-sided/larger/smaller.
@@ -92,13 +106,8 @@ def two_means_hypothesis(values1: np.ndarray, values2: np.ndarray,
     Returns:
         tuple: t_statistic and p_value of the test
     """
-    x_bar1 = np.mean(values1)
-    x_bar2 = np.mean(values2)
-    x_diff = x_bar1 - x_bar2
-    n1, n2 = len(values1), len(values2)
-
-    se = __get_two_sample_standard_error(values1, values2, pooled)
-    df = (n1 + n2 - 2) if pooled else min(n1 - 1, n2 - 1)
+    stats1, stats2 = as_summary(values1), as_summary(values2)
+    x_diff, se, df = __compare_means(stats1, stats2, pooled)
 
     t_statistic = x_diff/se
 
@@ -107,26 +116,162 @@ def two_means_hypothesis(values1: np.ndarray, values2: np.ndarray,
     return (t_statistic, p_value)
 
 
+def two_means_test(values1: np.ndarray, values2: np.ndarray,
+                   conf_level: float = 0.95,
+                   pooled: bool = False,
+                   alternative: str = "two-sided") -> tuple:
+    """Perform t test comparing two means together with the confidence
+    interval for their difference, summarizing each sample only once
+
+    Args:
+        values1 (np.array or SummaryStats): sample 1 values
+        values2 (np.array or SummaryStats): sample 2 values
+        conf_level (float, optional): confidence level. Defaults to 0.95.
+        pooled (bool, optional): whether to calculate pooled std.
+                                 Defaults to False.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+    Returns:
+        tuple: t_statistic, p_value, lower and upper values of confidence
+               interval
+    """
+    stats1, stats2 = as_summary(values1), as_summary(values2)
+    x_diff, se, df = __compare_means(stats1, stats2, pooled)
+
+    t_statistic = x_diff/se
+    p_value = utils.get_t_pvalue(t_statistic, df, alternative)
+
+    t_critical = utils.get_t_critical(conf_level, df)
+    lower_ci = x_diff - t_critical * se
+    upper_ci = x_diff + t_critical * se
+    return (t_statistic, p_value, lower_ci, upper_ci)
+
+
 def multiple_mean_hypothesis(*args) -> tuple:
     """Computes Anova test to get whether the mean of at least one group is 
     different
     Args:
         *args consecutive sample group values each group sample
-              is represented by a list
+              is represented by a list or SummaryStats
     Returns:
         tuple: f statistic, p value
     """
-    groups = [np.asarray(arg, dtype=float) for arg in args]
-    all = np.concatenate(groups)
-    n_g = len(groups)
-    n_t = len(all)
-    y_bar = np.mean(all)
-    sst = np.sum((all-y_bar)**2)
-    y_barg = list(map(np.mean, groups))
-    n_per_g = list(map(len, groups))
-    ssg = sum([n_per_g[i] * (y_g-y_bar)**2 for i, y_g in enumerate(y_barg)])
-
-    sse = sst - ssg
+    groups = [arg if isinstance(arg, SummaryStats)
+              else SummaryStats.from_values(np.asarray(arg, dtype=float))
+              for arg in args]
+    stats = SummaryStats(np.array([group.n for group in groups]),
+                         np.array([group.total for group in groups]),
+                         np.array([group.m2 for group in groups]))
+    return __anova(stats)
+
+
+def multiple_mean_hypothesis_by_label(values: np.ndarray,
+                                      labels: np.ndarray = None,
+                                      n_groups: int = None) -> tuple:
+    """Computes Anova test on a sample whose groups are given by labels
+    instead of separate arrays
+
+    Args:
+        values (np.ndarray or SummaryStats): sample values, or a summary
+            holding one array element per group
+        labels (np.ndarray, optional): integer group (0 to n_groups - 1) of
+            every value, not needed for a summary
+        n_groups (int, optional): number of groups. Defaults to the largest
+                                  label + 1.
+
+    Returns:
+        tuple: f statistic, p value
+    """
+    if isinstance(values, SummaryStats):
+        return __anova(values)
+    return __anova(SummaryStats.from_labels(values, labels, n_groups))
+
+
+def two_means_cuped_test(values1: np.ndarray, covariates1: np.ndarray,
+                         values2: np.ndarray, covariates2: np.ndarray,
+                         conf_level: float = 0.95, pooled: bool = False,
+                         alternative: str = "two-sided") -> tuple:
+    """Perform covariate adjusted (CUPED) t tests comparing the means of
+    many metrics at once, with confidence intervals for their differences
+
+    Every metric is adjusted by its covariate (usually the same metric
+    before the experiment) with the coefficient theta = cov(x, y) / var(x)
+    of both samples together, which removes the variance the covariate
+    explains without biasing the difference.
+
+    Args:
+        values1 (np.ndarray or CrossMoments): sample 1 metric values, rows
+            x metrics, or their moments with the covariates
+        covariates1 (np.ndarray): sample 1 covariates of the metrics (same
+            shape) or one covariate per row, None for moments
+        values2 (np.ndarray or CrossMoments): sample 2 metric values
+        covariates2 (np.ndarray): sample 2 covariates
+        conf_level (float, optional): confidence level. Defaults to 0.95.
+        pooled (bool, optional): whether to calculate pooled std.
+                                 Defaults to False.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+
+    Returns:
+        tuple: arrays of adjusted differences of means, t statistics,
+               p values, lower and upper values of confidence intervals,
+               one element per metric
+    """
+    moments1 = __as_moments(values1, covariates1)
+    moments2 = __as_moments(values2, covariates2)
+    both = moments1 + moments2
+    theta = np.divide(both.c_xy, both.m2_x,
+                      out=np.zeros(np.shape(both.c_xy)), where=both.m2_x > 0)
+    x_diff = moments1.mean_y - moments2.mean_y - \
+        theta * (moments1.mean_x - moments2.mean_x)
+
+    n1, n2 = moments1.n, moments2.n
+    m2_1 = moments1.m2_y - 2 * theta * moments1.c_xy + \
+        theta**2 * moments1.m2_x
+    m2_2 = moments2.m2_y - 2 * theta * moments2.c_xy + \
+        theta**2 * moments2.m2_x
+    if pooled:
+        var = (m2_1 + m2_2) / (n1 + n2 - 2)
+        se = np.sqrt(var / n1 + var / n2)
+        df = n1 + n2 - 2
+    else:
+        se = np.sqrt(m2_1 / (n1 - 1) / n1 + m2_2 / (n2 - 1) / n2)
+        df = min(n1 - 1, n2 - 1)
+
+    t_statistic = x_diff/se
+    p_value = utils.get_t_pvalue(t_statistic, df, alternative)
+    t_critical = utils.get_t_critical(conf_level, df)
+    lower_ci = x_diff - t_critical * se
+    upper_ci = x_diff + t_critical * se
+    return (x_diff, t_statistic, p_value, lower_ci, upper_ci)
+
+
+def __as_moments(values, covariates) -> CrossMoments:
+    """Gets moments of metrics and covariates of a sample"""
+    if isinstance(values, CrossMoments):
+        return values
+    return CrossMoments.from_values(values, covariates)
+
+
+def __anova(stats: SummaryStats) -> tuple:
+    """Computes Anova test from the summaries of the groups, ignoring
+    empty groups
+
+    Args:
+        stats (SummaryStats): summary holding one array element per group
+
+    Returns:
+        tuple: f statistic, p value
+    """
+    nonempty = np.asarray(stats.n) > 0
+    n = np.asarray(stats.n)[nonempty]
+    total = np.asarray(stats.total, dtype=float)[nonempty]
+    n_g = len(n)
+    n_t = np.sum(n)
+    y_bar = np.sum(total) / n_t
+    ssg = np.sum(n * (total / n - y_bar)**2)
+    sse = np.sum(np.asarray(stats.m2, dtype=float)[nonempty])
+
     df_t = n_t - 1
     df_g = n_g - 1
     df_e = df_t - df_g
@@ -137,28 +282,50 @@ def multiple_mean_hypothesis(*args) -> tuple:
     return (f_statistic, p_value)
 
 
-def __get_two_sample_standard_error(values1: np.ndarray, values2: np.ndarray,
+def __compare_means(stats1: SummaryStats, stats2: SummaryStats,
+                    pooled: bool = False) -> tuple:
+    """Calculates difference of two means with its standard error and
+    degrees of freedom, elementwise for summaries holding arrays
+
+    Args:
+        stats1 (SummaryStats): first sample summary
+        stats2 (SummaryStats): second sample summary
+        pooled (bool, optional): whether to calculate pooled estimate.
+                                 Defaults to False.
+
+    Returns:
+        tuple: difference of means, standard error, degrees of freedom
+    """
+    n1, n2 = stats1.n, stats2.n
+    x_diff = stats1.mean - stats2.mean
+    se = __get_two_sample_standard_error(stats1, stats2, pooled)
+    df = (n1 + n2 - 2) if pooled else np.minimum(n1 - 1, n2 - 1)
+    return (x_diff, se, df)
+
+
+def __get_two_sample_standard_error(stats1: SummaryStats,
+                                    stats2: SummaryStats,
                                     pooled: bool = False) -> float:
     """Calculates standard error for the mean of two samples
 
     Args:
-        values1 (np.array): first sample values
-        values2 (np.array): second sample values
+        stats1 (SummaryStats): first sample summary
+        stats2 (SummaryStats): second sample summary
         pooled (bool, optional): whether to calculate pooled estimate.
                                  Defaults to False.
 
     Returns:
         float: standard error
     """
-    n1 = len(values1)
-    n2 = len(values2)
-    s1 = np.std(values1, ddof=1)
-    s2 = np.std(values2, ddof=1)
+    n1 = stats1.n
+    n2 = stats2.n
+    s1 = stats1.std
+    s2 = stats2.std
     if pooled:
         s_pool = __get_pooled_standard_deviation(s1, s2, n1, n2)
         s1, s2 = s_pool, s_pool
 
-    se = math.sqrt(s1**2 / n1 + s2**2 / n2)
+    se = np.sqrt(s1**2 / n1 + s2**2 / n2)
     return se
 
 
@@ -175,6 +342,6 @@ def __get_pooled_standard_deviation(s1: float, s2: float,
     Returns:
         float: pooled standard deviation
     """
-    s_pool = math.sqrt((s1**2 * (n1 - 1) + s2**2 * (n2 - 1)) /
-                       (n1 + n2 - 2))
+    s_pool = np.sqrt((s1**2 * (n1 - 1) + s2**2 * (n2 - 1)) /
+                     (n1 + n2 - 2))
     return s_pool
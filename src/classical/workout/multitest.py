@@ -0,0 +1,176 @@
+"""Multiple testing corrections of p values
+
+Adjusts the p values of many tests for the number of tests run, either as
+one family or as families given by a label array. Every method sorts the
+p values once (by family, then p value) and computes the adjusted values
+with cumulative reductions over the sorted array, so it runs in
+O(n log n). Within family cumulative maxima and minima are taken over the
+whole array at once on the integer ranks of the values, offset by a
+multiple of the family label so families do not mix, which leaves the
+values themselves untouched.
+
+OnlineFDR controls the false discovery rate of a stream of tests whose
+results arrive over time (LORD++), deciding on every test once, when it
+arrives.
+
+1. multiple_testing_correction
+2. OnlineFDR
+"""
+
+import numpy as np
+
+METHODS = ("bonferroni", "holm", "fdr_bh", "fdr_by")
+
+
+def multiple_testing_correction(p_values: np.ndarray, alpha: float = 0.05,
+                                method: str = "holm",
+                                groups: np.ndarray = None) -> tuple:
+    """Adjusts p values for multiple tests
+
+    Args:
+        p_values (np.ndarray): p values of the tests
+        alpha (float, optional): family wise error rate (false discovery
+                                 rate for fdr methods). Defaults to 0.05.
+        method (str, optional): bonferroni/holm/fdr_bh (Benjamini-Hochberg)
+                                /fdr_by (Benjamini-Yekutieli).
+                                Defaults to "holm".
+        groups (np.ndarray, optional): integer family (0 to k - 1) of every
+            test, which is corrected separately. Defaults to one family.
+
+    Raises:
+        ValueError: when the method is invalid
+
+    Returns:
+        tuple: whether each null hypothesis is rejected, adjusted p values
+    """
+    if method not in METHODS:
+        raise ValueError("invalid method")
+    p_values = np.asarray(p_values, dtype=float)
+    if groups is None:
+        groups = np.zeros(len(p_values), dtype=np.intp)
+    groups = np.asarray(groups)
+    sizes = np.bincount(groups)
+    if method == "bonferroni":
+        adjusted = np.minimum(p_values * sizes[groups], 1)
+        return (adjusted <= alpha, adjusted)
+
+    order = np.lexsort((p_values, groups))
+    sorted_p = p_values[order]
+    sorted_groups = groups[order]
+    starts = np.cumsum(sizes) - sizes
+    # 0 based rank of every p value within its family
+    rank = np.arange(len(order)) - starts[sorted_groups]
+    size = sizes[sorted_groups]
+
+    if method == "holm":
+        adjusted = np.minimum((size - rank) * sorted_p, 1)
+        adjusted = __accumulate_by_group(np.maximum, adjusted, sorted_groups)
+    else:
+        adjusted = sorted_p * size / (rank + 1)
+        if method == "fdr_by":
+            harmonic = np.cumsum(1 / np.arange(1, sizes.max(initial=1) + 1))
+            adjusted = adjusted * harmonic[size - 1]
+        adjusted = np.minimum(adjusted, 1)
+        adjusted = __accumulate_by_group(np.minimum, adjusted[::-1],
+                                         sorted_groups[::-1])[::-1]
+
+    result = np.empty_like(adjusted)
+    result[order] = adjusted
+    return (result <= alpha, result)
+
+
+def __accumulate_by_group(ufunc, values: np.ndarray,
+                          groups: np.ndarray) -> np.ndarray:
+    """Cumulative maximum or minimum restarting at every family
+
+    The reduction runs on the integer ranks of the values, offset by the
+    family so that a new family always restarts it: groups must be sorted
+    ascending for np.maximum and descending for np.minimum.
+
+    Returns:
+        np.ndarray: cumulative reduction of the values within each family
+    """
+    order = np.argsort(values, kind="stable")
+    ranks = np.empty(len(values), dtype=np.int64)
+    ranks[order] = np.arange(len(values))
+    offset = groups.astype(np.int64) * len(values)
+    ranks = ufunc.accumulate(ranks + offset) - offset
+    return values[order][ranks]
+
+
+class OnlineFDR:
+    """LORD++ online control of the false discovery rate
+
+    Every test gets a significance level when it arrives, which is paid
+    from an alpha wealth that grows with every rejection, so the false
+    discovery rate of the stream stays below alpha at any time however
+    many tests are run (Ramdas et al. 2017).
+    """
+
+    # normalizes the default gamma sequence to sum 1
+    GAMMA_CONSTANT = 0.07720838
+
+    def __init__(self, alpha: float = 0.05, w0: float = None):
+        """
+        Args:
+            alpha (float, optional): false discovery rate. Defaults to 0.05.
+            w0 (float, optional): initial wealth, below alpha.
+                                  Defaults to alpha / 2.
+
+        Raises:
+            ValueError: when the initial wealth is not in (0, alpha)
+        """
+        w0 = alpha / 2 if w0 is None else w0
+        if not 0 < w0 < alpha:
+            raise ValueError("w0 must be between 0 and alpha")
+        self.alpha = alpha
+        self.w0 = w0
+        self.n_tests = 0
+        self.rejections = []
+
+    def update(self, p_values: np.ndarray) -> np.ndarray:
+        """Decides on the next tests of the stream
+
+        Significance levels of the whole chunk are computed at once, and
+        only recomputed after each rejection.
+
+        Args:
+            p_values (np.ndarray): p values of the new tests, in order of
+                                   arrival
+
+        Returns:
+            np.ndarray: whether each null hypothesis is rejected
+        """
+        p_values = np.asarray(p_values, dtype=float)
+        times = self.n_tests + 1 + np.arange(len(p_values))
+        levels = self.w0 * self.gamma(times)
+        for i, rejection in enumerate(self.rejections):
+            levels += self.__reward(i) * self.gamma(times - rejection)
+
+        reject = np.zeros(len(p_values), dtype=bool)
+        start = 0
+        while start < len(p_values):
+            below = np.flatnonzero(p_values[start:] <= levels[start:])
+            if len(below) == 0:
+                break
+            i = start + below[0]
+            reject[i] = True
+            reward = self.__reward(len(self.rejections))
+            self.rejections.append(int(times[i]))
+            start = i + 1
+            levels[start:] += reward * self.gamma(times[start:] - times[i])
+        self.n_tests += len(p_values)
+        return reject
+
+    @classmethod
+    def gamma(cls, steps: np.ndarray) -> np.ndarray:
+        """Fraction of wealth spent on the test a number of steps after a
+        rejection (or the start)"""
+        steps = np.asarray(steps, dtype=float)
+        log_steps = np.log(np.maximum(steps, 2))
+        return cls.GAMMA_CONSTANT * log_steps / (
+            steps * np.exp(np.sqrt(np.log(steps))))
+
+    def __reward(self, i: int) -> float:
+        """Wealth earned by the i-th rejection (0 based)"""
+        return self.alpha - self.w0 if i == 0 else self.alpha
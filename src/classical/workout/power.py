@@ -0,0 +1,412 @@
+"""Power analysis for the z and t tests of means and proportions
+
+Required sample size, power and minimum detectable effect (MDE) of the
+tests in classical.workout.means and classical.workout.proportions, using
+the normal approximation of the test statistics.
+
+Every argument may be an array and the results broadcast over all of them,
+so a whole planning grid is evaluated in one call. Passing each grid axis
+as an array shaped along its own dimension, e.g.
+    two_props_sample_size(baseline[:, None, None], mde[None, :, None],
+                          alpha[None, None, :])
+computes the critical values once per alpha and power value, through the
+cache of classical.workout.utils, instead of once per grid cell.
+
+Sample 2 is the control (with proportion `baseline`) and sample 1 the
+treatment, so effects are sample 1 - sample 2 as in the tests, and `ratio`
+is n2 / n1.
+
+1. one_mean_sample_size
+2. one_mean_power
+3. one_mean_mde
+4. two_means_sample_size
+5. two_means_power
+6. two_means_mde
+7. one_prop_sample_size
+8. one_prop_power
+9. one_prop_mde
+10. two_props_sample_size
+11. two_props_power
+12. two_props_mde
+"""
+
+import numpy as np
+from scipy import special
+import classical.workout.utils as utils
+
+# fixed point iterations solving the MDE of proportions, whose variance
+# depends on the effect
+MDE_ITERATIONS = 30
+
+
+def one_mean_sample_size(mde, std, alpha=0.05, power=0.8,
+                         alternative: str = "two-sided") -> np.ndarray:
+    """Calculates sample size needed to detect a difference of the mean
+    from the null value
+
+    Args:
+        mde (float or np.ndarray): minimum detectable effect
+        std (float or np.ndarray): standard deviation of the values
+        alpha (float or np.ndarray, optional): significance level.
+                                               Defaults to 0.05.
+        power (float or np.ndarray, optional): power. Defaults to 0.8.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+
+    Returns:
+        np.ndarray: sample size
+    """
+    return __sample_size(mde, std, std, alpha, power, alternative)
+
+
+def one_mean_power(mde, std, n, alpha=0.05,
+                   alternative: str = "two-sided") -> np.ndarray:
+    """Calculates power of the test of one mean
+
+    Args:
+        mde (float or np.ndarray): difference of the mean from the null
+        std (float or np.ndarray): standard deviation of the values
+        n (int or np.ndarray): sample size
+        alpha (float or np.ndarray, optional): significance level.
+                                               Defaults to 0.05.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+
+    Returns:
+        np.ndarray: power
+    """
+    return __power(mde, std, std, n, alpha, alternative)
+
+
+def one_mean_mde(std, n, alpha=0.05, power=0.8,
+                 alternative: str = "two-sided") -> np.ndarray:
+    """Calculates minimum detectable difference of the mean from the null
+    value
+
+    Args:
+        std (float or np.ndarray): standard deviation of the values
+        n (int or np.ndarray): sample size
+        alpha (float or np.ndarray, optional): significance level.
+                                               Defaults to 0.05.
+        power (float or np.ndarray, optional): power. Defaults to 0.8.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+
+    Returns:
+        np.ndarray: minimum detectable effect (negative for smaller)
+    """
+    return __mde(lambda effect: (std, std), n, alpha, power, alternative)
+
+
+def two_means_sample_size(mde, std, alpha=0.05, power=0.8, ratio=1,
+                          alternative: str = "two-sided") -> tuple:
+    """Calculates sample sizes needed to detect a difference of two means
+
+    Args:
+        mde (float or np.ndarray): minimum detectable difference of means
+        std (float or np.ndarray): standard deviation of the values
+        alpha (float or np.ndarray, optional): significance level.
+                                               Defaults to 0.05.
+        power (float or np.ndarray, optional): power. Defaults to 0.8.
+        ratio (float or np.ndarray, optional): n2 / n1. Defaults to 1.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+
+    Returns:
+        tuple: sample sizes of sample 1 and sample 2
+    """
+    sd = std * np.sqrt(1 + 1 / np.asarray(ratio))
+    n1 = __sample_size(mde, sd, sd, alpha, power, alternative)
+    return (n1, np.ceil(n1 * ratio))
+
+
+def two_means_power(mde, std, n1, alpha=0.05, ratio=1,
+                    alternative: str = "two-sided") -> np.ndarray:
+    """Calculates power of the test comparing two means
+
+    Args:
+        mde (float or np.ndarray): difference of means
+        std (float or np.ndarray): standard deviation of the values
+        n1 (int or np.ndarray): sample 1 size
+        alpha (float or np.ndarray, optional): significance level.
+                                               Defaults to 0.05.
+        ratio (float or np.ndarray, optional): n2 / n1. Defaults to 1.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+
+    Returns:
+        np.ndarray: power
+    """
+    sd = std * np.sqrt(1 + 1 / np.asarray(ratio))
+    return __power(mde, sd, sd, n1, alpha, alternative)
+
+
+def two_means_mde(std, n1, alpha=0.05, power=0.8, ratio=1,
+                  alternative: str = "two-sided") -> np.ndarray:
+    """Calculates minimum detectable difference of two means
+
+    Args:
+        std (float or np.ndarray): standard deviation of the values
+        n1 (int or np.ndarray): sample 1 size
+        alpha (float or np.ndarray, optional): significance level.
+                                               Defaults to 0.05.
+        power (float or np.ndarray, optional): power. Defaults to 0.8.
+        ratio (float or np.ndarray, optional): n2 / n1. Defaults to 1.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+
+    Returns:
+        np.ndarray: minimum detectable effect (negative for smaller)
+    """
+    sd = std * np.sqrt(1 + 1 / np.asarray(ratio))
+    return __mde(lambda effect: (sd, sd), n1, alpha, power, alternative)
+
+
+def one_prop_sample_size(null_val, mde, alpha=0.05, power=0.8,
+                         alternative: str = "two-sided") -> np.ndarray:
+    """Calculates sample size needed to detect a difference of the
+    proportion from the null value
+
+    Args:
+        null_val (float or np.ndarray): null proportion
+        mde (float or np.ndarray): minimum detectable effect
+        alpha (float or np.ndarray, optional): significance level.
+                                               Defaults to 0.05.
+        power (float or np.ndarray, optional): power. Defaults to 0.8.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+
+    Returns:
+        np.ndarray: sample size
+    """
+    sd0, sd1 = __one_prop_std(null_val, mde)
+    return __sample_size(mde, sd0, sd1, alpha, power, alternative)
+
+
+def one_prop_power(null_val, mde, n, alpha=0.05,
+                   alternative: str = "two-sided") -> np.ndarray:
+    """Calculates power of the test of one proportion
+
+    Args:
+        null_val (float or np.ndarray): null proportion
+        mde (float or np.ndarray): difference of the proportion from the null
+        n (int or np.ndarray): sample size
+        alpha (float or np.ndarray, optional): significance level.
+                                               Defaults to 0.05.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+
+    Returns:
+        np.ndarray: power
+    """
+    sd0, sd1 = __one_prop_std(null_val, mde)
+    return __power(mde, sd0, sd1, n, alpha, alternative)
+
+
+def one_prop_mde(null_val, n, alpha=0.05, power=0.8,
+                 alternative: str = "two-sided") -> np.ndarray:
+    """Calculates minimum detectable difference of the proportion from the
+    null value
+
+    Args:
+        null_val (float or np.ndarray): null proportion
+        n (int or np.ndarray): sample size
+        alpha (float or np.ndarray, optional): significance level.
+                                               Defaults to 0.05.
+        power (float or np.ndarray, optional): power. Defaults to 0.8.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+
+    Returns:
+        np.ndarray: minimum detectable effect (negative for smaller)
+    """
+    return __mde(lambda effect: __one_prop_std(null_val, effect), n, alpha,
+                 power, alternative)
+
+
+def two_props_sample_size(baseline, mde, alpha=0.05, power=0.8, ratio=1,
+                          alternative: str = "two-sided") -> tuple:
+    """Calculates sample sizes needed to detect a difference of two
+    proportions
+
+    Args:
+        baseline (float or np.ndarray): sample 2 (control) proportion
+        mde (float or np.ndarray): minimum detectable difference of
+                                   proportions
+        alpha (float or np.ndarray, optional): significance level.
+                                               Defaults to 0.05.
+        power (float or np.ndarray, optional): power. Defaults to 0.8.
+        ratio (float or np.ndarray, optional): n2 / n1. Defaults to 1.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+
+    Returns:
+        tuple: sample sizes of sample 1 and sample 2
+    """
+    sd0, sd1 = __two_props_std(baseline, mde, ratio)
+    n1 = __sample_size(mde, sd0, sd1, alpha, power, alternative)
+    return (n1, np.ceil(n1 * ratio))
+
+
+def two_props_power(baseline, mde, n1, alpha=0.05, ratio=1,
+                    alternative: str = "two-sided") -> np.ndarray:
+    """Calculates power of the test comparing two proportions
+
+    Args:
+        baseline (float or np.ndarray): sample 2 (control) proportion
+        mde (float or np.ndarray): difference of proportions
+        n1 (int or np.ndarray): sample 1 size
+        alpha (float or np.ndarray, optional): significance level.
+                                               Defaults to 0.05.
+        ratio (float or np.ndarray, optional): n2 / n1. Defaults to 1.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+
+    Returns:
+        np.ndarray: power
+    """
+    sd0, sd1 = __two_props_std(baseline, mde, ratio)
+    return __power(mde, sd0, sd1, n1, alpha, alternative)
+
+
+def two_props_mde(baseline, n1, alpha=0.05, power=0.8, ratio=1,
+                  alternative: str = "two-sided") -> np.ndarray:
+    """Calculates minimum detectable difference of two proportions
+
+    Args:
+        baseline (float or np.ndarray): sample 2 (control) proportion
+        n1 (int or np.ndarray): sample 1 size
+        alpha (float or np.ndarray, optional): significance level.
+                                               Defaults to 0.05.
+        power (float or np.ndarray, optional): power. Defaults to 0.8.
+        ratio (float or np.ndarray, optional): n2 / n1. Defaults to 1.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+
+    Returns:
+        np.ndarray: minimum detectable effect (negative for smaller)
+    """
+    return __mde(lambda effect: __two_props_std(baseline, effect, ratio),
+                 n1, alpha, power, alternative)
+
+
+def __sample_size(effect, sd0, sd1, alpha, power,
+                  alternative: str) -> np.ndarray:
+    """Calculates sample size of a z test
+
+    Args:
+        effect (np.ndarray): effect to detect
+        sd0 (np.ndarray): standard deviation of one observation under the
+                          null (standard error times square root of n)
+        sd1 (np.ndarray): same under the alternative
+        alpha (np.ndarray): significance level
+        power (np.ndarray): power
+        alternative (str): two-sided/larger/smaller
+
+    Returns:
+        np.ndarray: sample size, rounded up
+    """
+    z_alpha = __get_z_alpha(alpha, alternative)
+    z_beta = __get_z_beta(power)
+    return np.ceil(((z_alpha * sd0 + z_beta * sd1) / effect)**2)
+
+
+def __power(effect, sd0, sd1, n, alpha, alternative: str) -> np.ndarray:
+    """Calculates power of a z test, counting both tails of two sided tests
+
+    Returns:
+        np.ndarray: power
+    """
+    z_alpha = __get_z_alpha(alpha, alternative)
+    shift = effect * np.sqrt(n)
+    if alternative == "smaller":
+        shift = -shift
+    power = special.ndtr((shift - z_alpha * sd0) / sd1)
+    if alternative == "two-sided":
+        power = power + special.ndtr((-shift - z_alpha * sd0) / sd1)
+    return power
+
+
+def __mde(get_std, n, alpha, power, alternative: str) -> np.ndarray:
+    """Calculates minimum detectable effect of a z test, iterating when the
+    standard deviations depend on the effect
+
+    Args:
+        get_std (callable): gets standard deviations under the null and the
+                            alternative of an effect
+        n (np.ndarray): sample size
+        alpha (np.ndarray): significance level
+        power (np.ndarray): power
+        alternative (str): two-sided/larger/smaller
+
+    Returns:
+        np.ndarray: minimum detectable effect
+    """
+    z_alpha = __get_z_alpha(alpha, alternative)
+    z_beta = __get_z_beta(power)
+    sign = -1 if alternative == "smaller" else 1
+    sqrt_n = np.sqrt(n)
+    effect = np.zeros(())
+    for _ in range(MDE_ITERATIONS):
+        sd0, sd1 = get_std(effect)
+        updated = sign * (z_alpha * sd0 + z_beta * sd1) / sqrt_n
+        if np.all(np.isclose(updated, effect, rtol=1e-12, atol=0)):
+            return updated
+        effect = updated
+    return effect
+
+
+def __one_prop_std(null_val, effect) -> tuple:
+    """Standard deviations of one observation of a binary sample under the
+    null and the alternative
+
+    Returns:
+        tuple: standard deviations under the null and the alternative
+    """
+    p0 = np.asarray(null_val)
+    p1 = np.clip(p0 + effect, 0, 1)
+    return (np.sqrt(p0 * (1 - p0)), np.sqrt(p1 * (1 - p1)))
+
+
+def __two_props_std(baseline, effect, ratio) -> tuple:
+    """Standard deviations of the difference of two proportions scaled to
+    one observation of sample 1, under the null (pooled proportion) and the
+    alternative
+
+    Returns:
+        tuple: standard deviations under the null and the alternative
+    """
+    ratio = np.asarray(ratio)
+    p2 = np.asarray(baseline)
+    p1 = np.clip(p2 + effect, 0, 1)
+    p_pool = (p1 + ratio * p2) / (1 + ratio)
+    sd0 = np.sqrt(p_pool * (1 - p_pool) * (1 + 1 / ratio))
+    sd1 = np.sqrt(p1 * (1 - p1) + p2 * (1 - p2) / ratio)
+    return (sd0, sd1)
+
+
+def __get_z_alpha(alpha, alternative: str):
+    """Gets critical value of the test at significance level alpha
+
+    Raises:
+        ValueError: when the test type is invalid
+    """
+    if alternative not in utils.ALTERNATIVES:
+        raise ValueError("invalid alternative")
+    alpha = __as_scalar(alpha)
+    if alternative == "two-sided":
+        return utils.get_z_critical(1 - alpha)
+    return utils.get_z_critical(1 - 2 * alpha)
+
+
+def __get_z_beta(power):
+    """Gets quantile of the statistic under the alternative for a power"""
+    return utils.get_z_critical(2 * __as_scalar(power) - 1)
+
+
+def __as_scalar(value):
+    """Converts single values to python floats, so their critical values
+    are cached"""
+    if np.ndim(value) == 0:
+        return float(value)
+    return np.asarray(value)
@@ -7,11 +7,18 @@ The module contains useful functions for evaluating AB tests
 2. one_prop_hypothesis
 3. two_props_diff_conf_interval
 4. two_props_hypothesis
+5. two_props_diff_conf_interval_batch
+6. two_props_hypothesis_batch
+
+Samples are arrays of 0/1 or boolean values, or their SummaryStats: counts
+of ones given directly as SummaryStats.from_counts(successes, trials), and
+bit-packed arrays as SummaryStats.from_packed(packed, n).
 
 """
 import math
 import numpy as np
 import classical.workout.utils as utils
+from classical.summary import as_binary_summary
 
 
 def one_prop_conf_interval(values: np.ndarray,
@@ -19,14 +26,16 @@ def one_prop_conf_interval(values: np.ndarray,
     """calculates confidence interval for a proportion
 
     Args:
-        values (np.array): sample values (values are of values 0 and 1)
+        values (np.array or SummaryStats): sample values
+                                           (values are of values 0 and 1)
         conf_level (float): confidence level
 
     Returns:
         tuple: lower and upper values of confidence interval
     """
-    p = np.mean(values)
-    n = len(values)
+    stats = as_binary_summary(values)
+    p = stats.mean
+    n = stats.n
     se = math.sqrt(p*(1-p)/n)
     z_critical = utils.get_z_critical(conf_level)
     lower_ci = p - z_critical * se
@@ -37,8 +46,20 @@ def one_prop_conf_interval(values: np.ndarray,
 def one_prop_hypothesis(values: np.ndarray,
                         null_val: float = 0,
                         alternative: str = "two-sided"):
-    p = np.mean(values)
-    n = len(values)
+    """z test for comparing the proportion of 1 population with null value
+
+    Args:
+        values (np.ndarray or SummaryStats): sample binary(0/1) values
+        null_val (float, optional): null value. Defaults to 0.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+
+    Returns:
+        tuple: z statistic, p value
+    """
+    stats = as_binary_summary(values)
+    p = stats.mean
+    n = stats.n
     se = math.sqrt(null_val*(1-null_val)/n)
     z_statistic = (p - null_val)/se
     p_value = utils.get_norm_pvalue(z_statistic, alternative)
@@ -50,18 +71,19 @@ def two_props_diff_conf_interval(values1: np.ndarray, values2: np.ndarray,
     """Calculates the confidence interval for the diff between two proportions
 
     Args:
-        values1 (np.array): sample 1 binary(0/1) values
-        values2 (np.array): sample 2 binary(0/1) values
+        values1 (np.array or SummaryStats): sample 1 binary(0/1) values
+        values2 (np.array or SummaryStats): sample 2 binary(0/1) values
         conf_level (float): confidence level
 
     Returns:
         tuple: lower and upper values of confidence interval
     """
-    p1 = np.mean(values1)
-    p2 = np.mean(values2)
+    stats1, stats2 = as_binary_summary(values1), as_binary_summary(values2)
+    p1 = stats1.mean
+    p2 = stats2.mean
     p_diff = p1-p2
-    n1 = len(values1)
-    n2 = len(values2)
+    n1 = stats1.n
+    n2 = stats2.n
     SE = math.sqrt(((p1*(1-p1))/n1) + ((p2*(1-p2))/n2))
     z_critical = utils.get_z_critical(conf_level)
     lower = p_diff - z_critical*SE
@@ -75,20 +97,85 @@ def two_props_hypothesis(values1: np.ndarray,
     """Perform two sided z test to comparing two proportions
 
     Args:
-        values1 (np.array): sample 1 binary(0/1) values
-        values2 (np.array): sample 2 binaray(0/1) values
+        values1 (np.array or SummaryStats): sample 1 binary(0/1) values
+        values2 (np.array or SummaryStats): sample 2 binaray(0/1) values
         alternative (str, optional): two-sided/larger/smaller.
                                      Defaults to "two-sided".
 
     Returns:
         tuple: z_statistic and p value of the test
     """
-    p1 = np.mean(values1)
-    p2 = np.mean(values2)
-    n1 = len(values1)
-    n2 = len(values2)
-    p_pool = (np.sum(values1) + np.sum(values2))/(n1+n2)
+    stats1, stats2 = as_binary_summary(values1), as_binary_summary(values2)
+    p1 = stats1.mean
+    p2 = stats2.mean
+    n1 = stats1.n
+    n2 = stats2.n
+    p_pool = (stats1.total + stats2.total)/(n1+n2)
     se = math.sqrt((p_pool*(1-p_pool))/n1 + (p_pool*(1-p_pool))/n2)
     z_statistic = (p1-p2)/se
     p_value = utils.get_norm_pvalue(z_statistic, alternative)
     return (z_statistic, p_value)
+
+
+def two_props_diff_conf_interval_batch(counts1: np.ndarray, nobs1: np.ndarray,
+                                       counts2: np.ndarray, nobs2: np.ndarray,
+                                       conf_level: float) -> tuple:
+    """Calculates confidence intervals for the diff between two proportions
+    for many pairs of samples at once
+
+    Args:
+        counts1 (np.ndarray): sample 1 counts of ones, shape (k,) or (k, m)
+        nobs1 (np.ndarray): sample 1 number of observations
+        counts2 (np.ndarray): sample 2 counts of ones
+        nobs2 (np.ndarray): sample 2 number of observations
+        conf_level (float): confidence level
+
+    Returns:
+        tuple: arrays of lower and upper values of confidence intervals
+    """
+    counts1, nobs1, counts2, nobs2 = __as_float_arrays(counts1, nobs1,
+                                                       counts2, nobs2)
+    p1 = counts1 / nobs1
+    p2 = counts2 / nobs2
+    p_diff = p1 - p2
+    se = np.sqrt(p1 * (1 - p1) / nobs1 + p2 * (1 - p2) / nobs2)
+    z_critical = utils.get_z_critical(conf_level)
+    lower = p_diff - z_critical * se
+    upper = p_diff + z_critical * se
+    return (lower, upper)
+
+
+def two_props_hypothesis_batch(counts1: np.ndarray, nobs1: np.ndarray,
+                               counts2: np.ndarray, nobs2: np.ndarray,
+                               alternative: str = "two-sided") -> tuple:
+    """Perform z tests comparing two proportions for many pairs of samples
+    at once
+
+    Args:
+        counts1 (np.ndarray): sample 1 counts of ones, shape (k,) or (k, m)
+        nobs1 (np.ndarray): sample 1 number of observations
+        counts2 (np.ndarray): sample 2 counts of ones
+        nobs2 (np.ndarray): sample 2 number of observations
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+
+    Returns:
+        tuple: arrays of z statistics and p values of the tests
+    """
+    counts1, nobs1, counts2, nobs2 = __as_float_arrays(counts1, nobs1,
+                                                       counts2, nobs2)
+    p_diff = counts1 / nobs1 - counts2 / nobs2
+    p_pool = (counts1 + counts2) / (nobs1 + nobs2)
+    se = np.sqrt(p_pool * (1 - p_pool) * (1 / nobs1 + 1 / nobs2))
+    z_statistic = p_diff / se
+    p_value = utils.get_norm_pvalue(z_statistic, alternative)
+    return (z_statistic, p_value)
+
+
+def __as_float_arrays(*arrays) -> list:
+    """Converts counts and number of observations to broadcast float arrays
+
+    Returns:
+        list: float arrays of a common shape
+    """
+    return np.broadcast_arrays(*[np.asarray(a, dtype=float) for a in arrays])
@@ -0,0 +1,200 @@
+"""Workout of Statistical tests of ratio metrics
+
+Ratio metrics divide a per unit numerator by a per unit denominator
+(e.g. clicks / impressions of every user). The units are independent but
+the numerators and denominators are not, so the mean and proportion tests
+do not apply. Two estimates are supported:
+
+- ratio of means (sum of numerators / sum of denominators), whose
+  variance comes from the delta method using the variances of numerators
+  and denominators and their covariance
+- mean of ratios (mean of the per unit ratios), a plain mean
+
+Every function takes units x metrics arrays and tests all metrics at once
+in one pass over the data, or for the ratio of means the CrossMoments of
+numerators (y) and denominators (x). Statistics are z statistics, as the
+delta method is a large sample approximation.
+
+1. one_ratio_conf_interval
+2. one_ratio_hypothesis
+3. two_ratios_diff_conf_interval
+4. two_ratios_hypothesis
+"""
+
+import numpy as np
+import classical.workout.utils as utils
+from classical.summary import BLOCK_SIZE, CrossMoments, SummaryStats
+
+KINDS = ("ratio_of_means", "mean_of_ratios")
+
+
+def one_ratio_conf_interval(numerators: np.ndarray,
+                            denominators: np.ndarray = None,
+                            conf_level: float = 0.95,
+                            kind: str = "ratio_of_means") -> tuple:
+    """Calculates confidence intervals of ratio metrics
+
+    Args:
+        numerators (np.ndarray or CrossMoments): per unit numerators, units
+            x metrics, or moments of numerators and denominators
+        denominators (np.ndarray, optional): per unit denominators, None
+                                             for moments
+        conf_level (float, optional): confidence level. Defaults to 0.95.
+        kind (str, optional): ratio_of_means/mean_of_ratios.
+                              Defaults to "ratio_of_means".
+
+    Returns:
+        tuple: lower and upper bounds of confidence intervals
+    """
+    ratio, var = __estimate(numerators, denominators, kind)
+    se = np.sqrt(var)
+    z_critical = utils.get_z_critical(conf_level)
+    lower_ci = ratio - z_critical * se
+    upper_ci = ratio + z_critical * se
+    return (lower_ci, upper_ci)
+
+
+def one_ratio_hypothesis(numerators: np.ndarray,
+                         denominators: np.ndarray = None,
+                         null_val: float = 0,
+                         alternative: str = "two-sided",
+                         kind: str = "ratio_of_means") -> tuple:
+    """z tests that ratio metrics are equal to null_val
+
+    Args:
+        numerators (np.ndarray or CrossMoments): per unit numerators, units
+            x metrics, or moments of numerators and denominators
+        denominators (np.ndarray, optional): per unit denominators, None
+                                             for moments
+        null_val (float, optional): null value. Defaults to 0.
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+        kind (str, optional): ratio_of_means/mean_of_ratios.
+                              Defaults to "ratio_of_means".
+
+    Returns:
+        tuple: z statistics, p values of the tests
+    """
+    ratio, var = __estimate(numerators, denominators, kind)
+    z_statistic = (ratio - null_val) / np.sqrt(var)
+    p_value = utils.get_norm_pvalue(z_statistic, alternative)
+    return (z_statistic, p_value)
+
+
+def two_ratios_diff_conf_interval(numerators1: np.ndarray,
+                                  denominators1: np.ndarray,
+                                  numerators2: np.ndarray,
+                                  denominators2: np.ndarray,
+                                  conf_level: float = 0.95,
+                                  kind: str = "ratio_of_means") -> tuple:
+    """Calculates confidence intervals for the differences of ratio metrics
+    between two samples (sample 1 - sample 2)
+
+    Args:
+        numerators1 (np.ndarray or CrossMoments): sample 1 per unit
+            numerators, units x metrics, or their moments
+        denominators1 (np.ndarray): sample 1 per unit denominators, None
+                                    for moments
+        numerators2 (np.ndarray or CrossMoments): sample 2 numerators
+        denominators2 (np.ndarray): sample 2 denominators
+        conf_level (float, optional): confidence level. Defaults to 0.95.
+        kind (str, optional): ratio_of_means/mean_of_ratios.
+                              Defaults to "ratio_of_means".
+
+    Returns:
+        tuple: lower and upper values of confidence intervals
+    """
+    ratio1, var1 = __estimate(numerators1, denominators1, kind)
+    ratio2, var2 = __estimate(numerators2, denominators2, kind)
+    diff = ratio1 - ratio2
+    se = np.sqrt(var1 + var2)
+    z_critical = utils.get_z_critical(conf_level)
+    lower_ci = diff - z_critical * se
+    upper_ci = diff + z_critical * se
+    return (lower_ci, upper_ci)
+
+
+def two_ratios_hypothesis(numerators1: np.ndarray,
+                          denominators1: np.ndarray,
+                          numerators2: np.ndarray,
+                          denominators2: np.ndarray,
+                          alternative: str = "two-sided",
+                          kind: str = "ratio_of_means") -> tuple:
+    """z tests comparing ratio metrics of two samples
+
+    Args:
+        numerators1 (np.ndarray or CrossMoments): sample 1 per unit
+            numerators, units x metrics, or their moments
+        denominators1 (np.ndarray): sample 1 per unit denominators, None
+                                    for moments
+        numerators2 (np.ndarray or CrossMoments): sample 2 numerators
+        denominators2 (np.ndarray): sample 2 denominators
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+        kind (str, optional): ratio_of_means/mean_of_ratios.
+                              Defaults to "ratio_of_means".
+
+    Returns:
+        tuple: z statistics and p values of the tests
+    """
+    ratio1, var1 = __estimate(numerators1, denominators1, kind)
+    ratio2, var2 = __estimate(numerators2, denominators2, kind)
+    z_statistic = (ratio1 - ratio2) / np.sqrt(var1 + var2)
+    p_value = utils.get_norm_pvalue(z_statistic, alternative)
+    return (z_statistic, p_value)
+
+
+def __estimate(numerators, denominators, kind: str) -> tuple:
+    """Estimates ratio metrics and the variances of the estimates
+
+    Raises:
+        ValueError: when the kind is invalid, or moments are given for the
+                    mean of ratios
+
+    Returns:
+        tuple: ratio estimates, variances of the estimates
+    """
+    if kind not in KINDS:
+        raise ValueError("invalid kind")
+    if kind == "mean_of_ratios":
+        if isinstance(numerators, CrossMoments):
+            raise ValueError("mean of ratios needs per unit values")
+        stats = __summarize_ratios(numerators, denominators)
+        return (stats.mean, stats.var / stats.n)
+
+    moments = numerators
+    if not isinstance(moments, CrossMoments):
+        moments = CrossMoments.from_values(numerators, denominators)
+    n = moments.n
+    mean_x = moments.mean_x
+    ratio = moments.mean_y / mean_x
+    # delta method: variance of the linearized values (y - ratio x) / mean_x
+    var = (moments.m2_y - 2 * ratio * moments.c_xy +
+           ratio**2 * moments.m2_x) / (n - 1) / mean_x**2
+    return (ratio, var / n)
+
+
+def __summarize_ratios(numerators: np.ndarray,
+                       denominators: np.ndarray) -> SummaryStats:
+    """Summarizes per unit ratios of every metric, computing them a block
+    of units at a time
+
+    Returns:
+        SummaryStats: summary holding one array element per metric
+    """
+    numerators = np.asarray(numerators, dtype=float)
+    if numerators.ndim == 1:
+        numerators = numerators[:, np.newaxis]
+    denominators = np.asarray(denominators, dtype=float)
+    if denominators.ndim == 1:
+        denominators = denominators[:, np.newaxis]
+    block_rows = max(BLOCK_SIZE // numerators.shape[1], 1)
+    stats = SummaryStats()
+    for start in range(0, len(numerators), block_rows):
+        ratios = numerators[start:start + block_rows] / \
+            denominators[start:start + block_rows]
+        n = len(ratios)
+        total = np.sum(ratios, axis=0)
+        m2 = np.sum((ratios - total / n)**2, axis=0)
+        stats = stats.merge(SummaryStats(n, total, m2))
+    return stats
@@ -1,4 +1,23 @@
-import scipy.stats
+import functools
+from collections import namedtuple
+import numpy as np
+from scipy import special
+
+ALTERNATIVES = ("two-sided", "larger", "smaller")
+
+# confidence levels with a precomputed table of t critical values
+TABLE_CONF_LEVELS = (0.8, 0.9, 0.95, 0.975, 0.99, 0.995, 0.999)
+# largest degrees of freedom in the precomputed table
+TABLE_MAX_DF = 1000
+# number of (conf_level, df) critical values kept outside the table
+CACHE_SIZE = 1024
+
+CriticalCacheInfo = namedtuple("CriticalCacheInfo",
+                               ["table_hits", "hits", "misses",
+                                "maxsize", "currsize"])
+
+_t_tables = {}
+_table_hits = 0
 
 
 def get_z_critical(conf_level: float) -> float:
@@ -11,13 +30,18 @@ def get_z_critical(conf_level: float) -> float:
     Returns:
         float: z critical value
     """
-    return scipy.stats.norm.ppf(1-(1-conf_level)/2)
+    if np.ndim(conf_level):
+        return special.ndtri(1-(1-np.asarray(conf_level))/2)
+    return _cached_z_critical(conf_level)
 
 
 def get_t_critical(conf_level: float, df: int) -> float:
     """Gets t critical , which is t value corresponding to a specific
     confidence level (for a two sided test)
 
+    Values are looked up in a precomputed table for common confidence levels
+    and integer df up to TABLE_MAX_DF, then in an LRU cache.
+
     Args:
         conf_level (float): confidence level
         df (int): degrees of freedom
@@ -25,7 +49,95 @@ def get_t_critical(conf_level: float, df: int) -> float:
     Returns:
         float: t critical value
     """
-    return scipy.stats.t.ppf(1-(1-conf_level)/2, df)
+    global _table_hits
+    if np.ndim(conf_level) or np.ndim(df):
+        return special.stdtrit(df, 1-(1-np.asarray(conf_level))/2)
+    if 1 <= df <= TABLE_MAX_DF and float(df).is_integer():
+        table = __get_t_table(conf_level)
+        if table is not None:
+            _table_hits += 1
+            return table[int(df)]
+    return _cached_t_critical(conf_level, df)
+
+
+def configure_critical_cache(cache_size: int = None,
+                             table_max_df: int = None,
+                             table_conf_levels: tuple = None):
+    """Changes sizes of the critical values cache and table and clears them
+
+    Args:
+        cache_size (int, optional): max number of cached critical values
+        table_max_df (int, optional): largest df in the precomputed table
+        table_conf_levels (tuple, optional): confidence levels of the table
+    """
+    global CACHE_SIZE, TABLE_MAX_DF, TABLE_CONF_LEVELS
+    global _cached_z_critical, _cached_t_critical
+    if cache_size is not None:
+        CACHE_SIZE = cache_size
+    if table_max_df is not None:
+        TABLE_MAX_DF = table_max_df
+    if table_conf_levels is not None:
+        TABLE_CONF_LEVELS = tuple(table_conf_levels)
+    _cached_z_critical = functools.lru_cache(CACHE_SIZE)(__z_critical)
+    _cached_t_critical = functools.lru_cache(CACHE_SIZE)(__t_critical)
+    clear_critical_cache()
+
+
+def clear_critical_cache():
+    """Empties the critical values cache and table and resets statistics"""
+    global _table_hits
+    _cached_z_critical.cache_clear()
+    _cached_t_critical.cache_clear()
+    _t_tables.clear()
+    _table_hits = 0
+
+
+def critical_cache_info() -> CriticalCacheInfo:
+    """Gets usage statistics of the critical values table and cache
+
+    Returns:
+        CriticalCacheInfo: table hits, cache hits, misses, max size and
+                           current size of the cache
+    """
+    z_info = _cached_z_critical.cache_info()
+    t_info = _cached_t_critical.cache_info()
+    return CriticalCacheInfo(_table_hits, z_info.hits + t_info.hits,
+                             z_info.misses + t_info.misses, CACHE_SIZE,
+                             z_info.currsize + t_info.currsize)
+
+
+def __z_critical(conf_level: float) -> float:
+    return special.ndtri(1-(1-conf_level)/2)
+
+
+def __t_critical(conf_level: float, df: float) -> float:
+    return special.stdtrit(df, 1-(1-conf_level)/2)
+
+
+def __get_t_table(conf_level: float) -> np.ndarray:
+    """Gets table of t critical values indexed by df, computing it on first
+    use
+
+    Args:
+        conf_level (float): confidence level
+
+    Returns:
+        np.ndarray: t critical values or None when conf_level has no table
+    """
+    if conf_level not in TABLE_CONF_LEVELS:
+        return None
+    table = _t_tables.get(conf_level)
+    if table is None:
+        df = np.arange(1, TABLE_MAX_DF + 1)
+        table = np.empty(TABLE_MAX_DF + 1)
+        table[0] = np.nan
+        table[1:] = special.stdtrit(df, 1-(1-conf_level)/2)
+        _t_tables[conf_level] = table
+    return table
+
+
+_cached_z_critical = functools.lru_cache(CACHE_SIZE)(__z_critical)
+_cached_t_critical = functools.lru_cache(CACHE_SIZE)(__t_critical)
 
 
 def get_t_pvalue(t_value: float,
@@ -33,6 +145,9 @@ def get_t_pvalue(t_value: float,
                  alternative: str = "two-sided") -> float:
     """Get corresponding p value for t value depending on test type
 
+    Accepts arrays of t values, df and alternatives, which are broadcast
+    together.
+
     Args:
         t_value (float): t value
         df (int): degrees of freedom
@@ -45,22 +160,20 @@ def get_t_pvalue(t_value: float,
     Returns:
         float: p value
     """
-
-    if alternative == "two-sided":
-        p_value = scipy.stats.t.sf(abs(t_value), df=df)*2
-    elif alternative == "larger":
-        p_value = scipy.stats.t.sf(t_value, df=df)
-    elif alternative == "smaller":
-        p_value = scipy.stats.t.cdf(t_value, df=df)
-    else:
-        raise ValueError("invalid alternative")
-    return p_value
+    return __select_alternative(
+        alternative,
+        lambda: special.stdtr(df, -np.abs(t_value))*2,
+        lambda: special.stdtr(df, np.negative(t_value)),
+        lambda: special.stdtr(df, t_value))
 
 
 def get_norm_pvalue(z_value: float,
                     alternative: str = "two-sided") -> float:
     """Get corresponding p value for z value depending on test type
 
+    Accepts arrays of z values and alternatives, which are broadcast
+    together.
+
     Args:
         z_value (float): z value
         alternative (str, optional): two-sided/larger/smaller.
@@ -72,17 +185,52 @@ def get_norm_pvalue(z_value: float,
     Returns:
         float: p value
     """
+    return __select_alternative(
+        alternative,
+        lambda: special.ndtr(-np.abs(z_value))*2,
+        lambda: special.ndtr(np.negative(z_value)),
+        lambda: special.ndtr(z_value))
 
-    if alternative == "two-sided":
-        p_value = scipy.stats.norm.sf(abs(z_value))*2
-    elif alternative == "larger":
-        p_value = scipy.stats.norm.sf(z_value)
-    elif alternative == "smaller":
-        p_value = scipy.stats.norm.cdf(z_value)
-    else:
-        raise ValueError("invalid alternative")
-    return p_value
 
+def get_f_pvalue(f_value: float, dfg: int, dfe: int) -> float:
+    """Get corresponding p value for f value (right tail)
+
+    Args:
+        f_value (float): f value
+        dfg (int): degrees of freedom between groups
+        dfe (int): degrees of freedom within groups (error)
+
+    Returns:
+        float: p value
+    """
+    return special.fdtrc(dfg, dfe, f_value)
+
+
+def __select_alternative(alternative, two_sided, larger, smaller):
+    """Evaluates p values for the requested alternative hypotheses
+
+    Args:
+        alternative (str or np.ndarray): two-sided/larger/smaller
+        two_sided (callable): computes two sided p values
+        larger (callable): computes right tail p values
+        smaller (callable): computes left tail p values
+
+    Raises:
+        ValueError: when the test type is invalid
 
-def get_f_pvalue(f_value: float, dfg: int, dfe: int):
-    return scipy.stats.f.sf(f_value, dfg, dfe)
+    Returns:
+        float: p value
+    """
+    if isinstance(alternative, str):
+        if alternative == "two-sided":
+            return two_sided()
+        elif alternative == "larger":
+            return larger()
+        elif alternative == "smaller":
+            return smaller()
+        raise ValueError("invalid alternative")
+    alternative = np.asarray(alternative)
+    if not np.isin(alternative, ALTERNATIVES).all():
+        raise ValueError("invalid alternative")
+    return np.select([alternative == "two-sided", alternative == "larger"],
+                     [two_sided(), larger()], smaller())
@@ -0,0 +1,93 @@
+"""Running resampling blocks in a process pool
+
+The resampling engines split their work into blocks of resamples, each
+drawn from its own seed, so results do not depend on how many processes
+run them. The sample data is sent once to every worker process instead of
+with every block.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+_worker_data = None
+
+
+def spawn_seeds(seed, n_blocks: int) -> list:
+    """Creates independent seeds for blocks of resamples
+
+    Args:
+        seed (int or np.random.SeedSequence): base seed
+        n_blocks (int): number of blocks
+
+    Returns:
+        list: seed sequence per block
+    """
+    return np.random.SeedSequence(seed).spawn(n_blocks)
+
+
+def split_blocks(n_resamples: int, block_rows: int) -> list:
+    """Splits resamples into blocks of at most block_rows resamples
+
+    Returns:
+        list: number of resamples per block
+    """
+    block_rows = max(1, block_rows)
+    n_full, rest = divmod(n_resamples, block_rows)
+    return [block_rows] * n_full + ([rest] if rest else [])
+
+
+class BlockRunner:
+    """Applies block functions to the sample data, in worker processes when
+    n_jobs > 1
+
+    Used as a context manager so the pool is reused across calls of `map`.
+    """
+
+    def __init__(self, data, n_jobs: int = 1):
+        """
+        Args:
+            data: sample data passed as first argument of block functions
+            n_jobs (int, optional): number of processes, -1 for all cores.
+                                    Defaults to 1.
+        """
+        self.data = data
+        self.n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+        self.pool = None
+
+    def __enter__(self) -> "BlockRunner":
+        if self.n_jobs > 1:
+            self.pool = ProcessPoolExecutor(self.n_jobs,
+                                            initializer=_set_worker_data,
+                                            initargs=(self.data,))
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def map(self, func, tasks: list) -> list:
+        """Calls func(data, *task) for every task
+
+        Args:
+            func (callable): module level block function
+            tasks (list): tuples of arguments of each call
+
+        Returns:
+            list: results in the order of tasks
+        """
+        if self.pool is None:
+            return [func(self.data, *task) for task in tasks]
+        return list(self.pool.map(_call_block,
+                                  [(func, task) for task in tasks]))
+
+
+def _set_worker_data(data):
+    global _worker_data
+    _worker_data = data
+
+
+def _call_block(call: tuple):
+    func, task = call
+    return func(_worker_data, *task)
@@ -0,0 +1,268 @@
+"""Bootstrap confidence intervals
+
+Simulation based counterparts of the closed form confidence intervals in
+classical.means and classical.proportions, for any statistic.
+
+Resamples are drawn as matrices of indices, a block of resamples at a
+time, with the block size chosen to keep memory bounded. A resample of n
+values takes 16n bytes (indices and values); when a single one does not
+fit in max_block_bytes, resamples are drawn a chunk of columns at a time:
+means are summed over the chunks, and other statistics gather each
+resample into one buffer of 8n bytes, the least they need, before reducing
+it. Blocks are seeded independently and can run in parallel processes, and
+results for a given seed are the same for any number of processes.
+
+1. one_sample_conf_interval
+2. two_samples_diff_conf_interval
+3. resample_statistic
+"""
+
+import numpy as np
+from scipy import special
+from simulation._blocks import BlockRunner, spawn_seeds, split_blocks
+
+STATISTICS = {"mean": np.mean, "proportion": np.mean, "median": np.median}
+METHODS = ("percentile", "bca")
+# resamples per block when resamples are split into chunks of columns
+COLUMN_BLOCK_ROWS = 100
+# smallest chunk of a resample drawn at once
+MIN_COLUMNS = 1 << 16
+
+
+def one_sample_conf_interval(values: np.ndarray, statistic="mean",
+                             conf_level: float = 0.95,
+                             n_resamples: int = 10000,
+                             method: str = "percentile",
+                             seed=None, n_jobs: int = 1,
+                             max_block_bytes: int = 2**27,
+                             jackknife_groups: int = 1000) -> tuple:
+    """Calculates bootstrap confidence interval for a statistic of a sample
+
+    Args:
+        values (np.ndarray): sample values
+        statistic (str or callable, optional): mean/proportion/median or a
+            reducer called as statistic(x, axis=-1). Defaults to "mean".
+        conf_level (float, optional): confidence level. Defaults to 0.95.
+        n_resamples (int, optional): number of resamples.
+                                     Defaults to 10000.
+        method (str, optional): percentile/bca. Defaults to "percentile".
+        seed (int, optional): seed of the random resamples.
+        n_jobs (int, optional): number of processes, -1 for all cores.
+                                Defaults to 1.
+        max_block_bytes (int, optional): memory used per block of
+                                         resamples. Defaults to 128MB.
+        jackknife_groups (int, optional): max number of leave-out groups in
+            the jackknife of bca for statistics other than the mean.
+            Defaults to 1000.
+
+    Returns:
+        tuple: lower and upper bounds of confidence interval
+    """
+    return __conf_interval((np.asarray(values),), statistic, conf_level,
+                           n_resamples, method, seed, n_jobs,
+                           max_block_bytes, jackknife_groups)
+
+
+def two_samples_diff_conf_interval(values1: np.ndarray, values2: np.ndarray,
+                                   statistic="mean",
+                                   conf_level: float = 0.95,
+                                   n_resamples: int = 10000,
+                                   method: str = "percentile",
+                                   seed=None, n_jobs: int = 1,
+                                   max_block_bytes: int = 2**27,
+                                   jackknife_groups: int = 1000) -> tuple:
+    """Calculates bootstrap confidence interval for the difference of a
+    statistic between two samples (sample 1 - sample 2)
+
+    Args:
+        values1 (np.ndarray): sample 1 values
+        values2 (np.ndarray): sample 2 values
+        statistic (str or callable, optional): mean/proportion/median or a
+            reducer called as statistic(x, axis=-1). Defaults to "mean".
+        conf_level (float, optional): confidence level. Defaults to 0.95.
+        n_resamples (int, optional): number of resamples.
+                                     Defaults to 10000.
+        method (str, optional): percentile/bca. Defaults to "percentile".
+        seed (int, optional): seed of the random resamples.
+        n_jobs (int, optional): number of processes, -1 for all cores.
+                                Defaults to 1.
+        max_block_bytes (int, optional): memory used per block of
+                                         resamples. Defaults to 128MB.
+        jackknife_groups (int, optional): max number of leave-out groups in
+            the jackknife of bca for statistics other than the mean.
+            Defaults to 1000.
+
+    Returns:
+        tuple: lower and upper values of confidence interval
+    """
+    return __conf_interval((np.asarray(values1), np.asarray(values2)),
+                           statistic, conf_level, n_resamples, method, seed,
+                           n_jobs, max_block_bytes, jackknife_groups)
+
+
+def resample_statistic(samples: tuple, statistic="mean",
+                       n_resamples: int = 10000, seed=None, n_jobs: int = 1,
+                       max_block_bytes: int = 2**27) -> np.ndarray:
+    """Draws the bootstrap distribution of a statistic of one sample or of
+    the difference of a statistic between two samples
+
+    Args:
+        samples (tuple): one or two sample arrays
+        statistic (str or callable, optional): mean/proportion/median or a
+            reducer called as statistic(x, axis=-1). Defaults to "mean".
+        n_resamples (int, optional): number of resamples.
+                                     Defaults to 10000.
+        seed (int, optional): seed of the random resamples.
+        n_jobs (int, optional): number of processes, -1 for all cores.
+                                Defaults to 1.
+        max_block_bytes (int, optional): memory used per block of
+                                         resamples. Defaults to 128MB.
+
+    Returns:
+        np.ndarray: statistic of every resample
+    """
+    __get_statistic(statistic)
+    n = max(len(values) for values in samples)
+    if statistic == "proportion":
+        # resampled counts of ones are drawn directly, one value per resample
+        block_rows = max_block_bytes // 8
+    elif 16 * n <= max_block_bytes:
+        # every resampled value needs an int64 index and a copy of the value
+        block_rows = max_block_bytes // (16 * n)
+    else:
+        block_rows = COLUMN_BLOCK_ROWS
+    rows = split_blocks(n_resamples, block_rows)
+    seeds = spawn_seeds(seed, len(rows))
+    with BlockRunner(samples, n_jobs) as runner:
+        blocks = runner.map(_resample_block,
+                            [(statistic, seed, n_rows, max_block_bytes)
+                             for seed, n_rows in zip(seeds, rows)])
+    return np.concatenate(blocks)
+
+
+def _resample_block(samples: tuple, statistic, seed, rows: int,
+                    max_block_bytes: int) -> np.ndarray:
+    """Computes statistic of one block of resamples
+
+    Returns:
+        np.ndarray: statistic of each resample in the block
+    """
+    rng = np.random.default_rng(seed)
+    func = __get_statistic(statistic)
+    result = None
+    for values in samples:
+        n = len(values)
+        if statistic == "proportion":
+            # the count of ones in a resample of a binary sample is binomial
+            stat = rng.binomial(n, np.mean(values), rows) / n
+        elif 16 * rows * n <= max_block_bytes:
+            index = rng.integers(0, n, (rows, n))
+            stat = func(values[index], axis=-1)
+        elif statistic == "mean":
+            # the mean of a resample is summed a chunk of columns at a time
+            columns = max(max_block_bytes // (16 * rows), 1)
+            total = np.zeros(rows)
+            for start in range(0, n, columns):
+                index = rng.integers(0, n, (rows, min(columns, n - start)))
+                total += values[index].sum(axis=-1)
+            stat = total / n
+        else:
+            # other statistics need whole resamples, each gathered into one
+            # buffer a chunk of columns at a time
+            columns = max((max_block_bytes - 8 * n) // 16, MIN_COLUMNS)
+            resample = np.empty(n, dtype=values.dtype)
+            stat = np.empty(rows)
+            for row in range(rows):
+                for start in range(0, n, columns):
+                    stop = min(start + columns, n)
+                    resample[start:stop] = values[
+                        rng.integers(0, n, stop - start)]
+                stat[row] = func(resample, axis=-1)
+        result = stat if result is None else result - stat
+    return result
+
+
+def __conf_interval(samples: tuple, statistic, conf_level: float,
+                    n_resamples: int, method: str, seed, n_jobs: int,
+                    max_block_bytes: int, jackknife_groups: int) -> tuple:
+    """Calculates bootstrap confidence interval of one or two samples
+
+    Raises:
+        ValueError: when the method is invalid
+
+    Returns:
+        tuple: lower and upper bounds of confidence interval
+    """
+    if method not in METHODS:
+        raise ValueError("invalid method")
+    alpha = 1 - conf_level
+    boot = resample_statistic(samples, statistic, n_resamples, seed, n_jobs,
+                              max_block_bytes)
+    if method == "percentile":
+        quantiles = [alpha / 2, 1 - alpha / 2]
+    else:
+        quantiles = __get_bca_quantiles(boot, samples, statistic, alpha,
+                                        jackknife_groups)
+    lower, upper = np.quantile(boot, quantiles)
+    return (lower, upper)
+
+
+def __get_bca_quantiles(boot: np.ndarray, samples: tuple, statistic,
+                        alpha: float, jackknife_groups: int) -> list:
+    """Gets bias corrected and accelerated quantiles of the bootstrap
+    distribution
+
+    Returns:
+        list: lower and upper quantiles
+    """
+    func = __get_statistic(statistic)
+    estimates = [func(values, axis=-1) for values in samples]
+    estimate = estimates[0] - sum(estimates[1:])
+    z0 = special.ndtri((np.sum(boot < estimate) +
+                        0.5 * np.sum(boot == estimate)) / len(boot))
+
+    numerator, denominator = 0.0, 0.0
+    for i, values in enumerate(samples):
+        jackknife = __jackknife(values, statistic, jackknife_groups)
+        # difference of statistics with sample i left out
+        if i > 0:
+            jackknife = estimates[0] - jackknife
+        n = len(jackknife)
+        u = (n - 1) * (jackknife.mean() - jackknife)
+        numerator += np.sum(u**3) / n**3
+        denominator += np.sum(u**2) / n**2
+    acceleration = numerator / (6 * denominator**1.5) if denominator else 0
+
+    z_alpha = special.ndtri(np.array([alpha / 2, 1 - alpha / 2]))
+    z = z0 + (z0 + z_alpha) / (1 - acceleration * (z0 + z_alpha))
+    return list(special.ndtr(z))
+
+
+def __jackknife(values: np.ndarray, statistic, groups: int) -> np.ndarray:
+    """Computes leave one out values of the statistic, leaving out groups
+    of consecutive values when the sample has more than `groups` values
+
+    Returns:
+        np.ndarray: statistic of each leave out sample
+    """
+    n = len(values)
+    if statistic in ("mean", "proportion"):
+        return (np.sum(values) - values) / (n - 1)
+    func = __get_statistic(statistic)
+    bounds = np.linspace(0, n, min(n, groups) + 1).astype(int)
+    return np.array([func(np.concatenate([values[:start], values[end:]]),
+                          axis=-1)
+                     for start, end in zip(bounds[:-1], bounds[1:])])
+
+
+def __get_statistic(statistic):
+    """Gets reducer function of the statistic
+
+    Raises:
+        ValueError: when the statistic name is invalid
+    """
+    if callable(statistic):
+        return statistic
+    if statistic not in STATISTICS:
+        raise ValueError("invalid statistic")
+    return STATISTICS[statistic]
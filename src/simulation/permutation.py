@@ -0,0 +1,177 @@
+"""Permutation tests comparing two samples
+
+Simulation based counterparts of two_means_hypothesis and
+two_props_hypothesis. Permutations are computed a block at a time: a block
+shuffles many copies of the pooled sample at once, and for binary samples
+a permutation reduces to drawing the count of ones falling in sample 1 from
+a hypergeometric distribution, so no data is shuffled at all.
+
+Blocks are seeded independently and can run in parallel processes. When
+`precision` is given, the test stops as soon as the standard error of the
+estimated p value is below it; blocks are checked in order, so the result
+for a given seed does not depend on the number of processes.
+
+1. two_means_permutation_test
+2. two_props_permutation_test
+"""
+
+import numpy as np
+from classical.summary import SummaryStats
+from simulation._blocks import BlockRunner, spawn_seeds, split_blocks
+
+ALTERNATIVES = ("two-sided", "larger", "smaller")
+# permutations per block, which is also how often early stopping is checked
+MAX_BLOCK_PERMUTATIONS = 1000
+
+
+def two_means_permutation_test(values1: np.ndarray, values2: np.ndarray,
+                               alternative: str = "two-sided",
+                               n_permutations: int = 10000,
+                               precision: float = None, seed=None,
+                               n_jobs: int = 1,
+                               max_block_bytes: int = 2**27) -> tuple:
+    """Perform permutation test comparing two means
+
+    Args:
+        values1 (np.array): sample 1 values
+        values2 (np.array): sample 2 values
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+        n_permutations (int, optional): max number of permutations.
+                                        Defaults to 10000.
+        precision (float, optional): stop once the standard error of the
+                                     p value is below it.
+        seed (int, optional): seed of the random permutations.
+        n_jobs (int, optional): number of processes, -1 for all cores.
+                                Defaults to 1.
+        max_block_bytes (int, optional): memory used per block of
+                                         permutations. Defaults to 128MB.
+
+    Returns:
+        tuple: difference of means, p value of the test
+    """
+    values1, values2 = np.asarray(values1), np.asarray(values2)
+    pooled = np.concatenate([values1, values2])
+    n1 = len(values1)
+    observed = np.mean(values1) - np.mean(values2)
+    block_rows = max_block_bytes // (8 * len(pooled))
+    p_value = __permutation_pvalue((pooled, n1), _means_block, observed,
+                                   alternative, n_permutations, precision,
+                                   seed, n_jobs, block_rows)
+    return (observed, p_value)
+
+
+def two_props_permutation_test(values1, values2,
+                               alternative: str = "two-sided",
+                               n_permutations: int = 10000,
+                               precision: float = None, seed=None,
+                               n_jobs: int = 1,
+                               max_block_bytes: int = 2**27) -> tuple:
+    """Perform permutation test comparing two proportions
+
+    Args:
+        values1 (np.array or SummaryStats): sample 1 binary(0/1) values
+        values2 (np.array or SummaryStats): sample 2 binary(0/1) values
+        alternative (str, optional): two-sided/larger/smaller.
+                                     Defaults to "two-sided".
+        n_permutations (int, optional): max number of permutations.
+                                        Defaults to 10000.
+        precision (float, optional): stop once the standard error of the
+                                     p value is below it.
+        seed (int, optional): seed of the random permutations.
+        n_jobs (int, optional): number of processes, -1 for all cores.
+                                Defaults to 1.
+        max_block_bytes (int, optional): memory used per block of
+                                         permutations. Defaults to 128MB.
+
+    Returns:
+        tuple: difference of proportions, p value of the test
+    """
+    count1, n1 = __get_count_nobs(values1)
+    count2, n2 = __get_count_nobs(values2)
+    observed = count1 / n1 - count2 / n2
+    p_value = __permutation_pvalue((count1 + count2, n1, n2), _props_block,
+                                   observed, alternative, n_permutations,
+                                   precision, seed, n_jobs,
+                                   max_block_bytes // 8)
+    return (observed, p_value)
+
+
+def _means_block(data: tuple, seed, rows: int) -> np.ndarray:
+    """Computes differences of means of one block of permutations
+
+    Returns:
+        np.ndarray: difference of means of each permutation
+    """
+    pooled, n1 = data
+    n2 = len(pooled) - n1
+    rng = np.random.default_rng(seed)
+    permuted = np.tile(pooled, (rows, 1))
+    rng.permuted(permuted, axis=1, out=permuted)
+    sum1 = permuted[:, :n1].sum(axis=1)
+    return sum1 / n1 - (pooled.sum() - sum1) / n2
+
+
+def _props_block(data: tuple, seed, rows: int) -> np.ndarray:
+    """Computes differences of proportions of one block of permutations
+
+    Returns:
+        np.ndarray: difference of proportions of each permutation
+    """
+    count, n1, n2 = data
+    rng = np.random.default_rng(seed)
+    count1 = rng.hypergeometric(count, n1 + n2 - count, n1, rows)
+    return count1 / n1 - (count - count1) / n2
+
+
+def __permutation_pvalue(data: tuple, block_func, observed: float,
+                         alternative: str, n_permutations: int,
+                         precision: float, seed, n_jobs: int,
+                         block_rows: int) -> float:
+    """Estimates p value from blocks of permuted statistics
+
+    Raises:
+        ValueError: when the test type or number of permutations is invalid
+
+    Returns:
+        float: p value
+    """
+    if alternative not in ALTERNATIVES:
+        raise ValueError("invalid alternative")
+    if n_permutations < 1:
+        raise ValueError("n_permutations must be at least 1")
+    rows = split_blocks(n_permutations,
+                        min(block_rows, MAX_BLOCK_PERMUTATIONS))
+    tasks = list(zip(spawn_seeds(seed, len(rows)), rows))
+    # ties up to rounding error count as extreme
+    tolerance = 1e-9 * max(abs(observed), 1e-300)
+    n_extreme, n_done = 0, 0
+    with BlockRunner(data, n_jobs) as runner:
+        step = max(runner.n_jobs, 1)
+        for start in range(0, len(tasks), step):
+            blocks = runner.map(block_func, tasks[start:start + step])
+            for block in blocks:
+                if alternative == "two-sided":
+                    extreme = np.abs(block) >= abs(observed) - tolerance
+                elif alternative == "larger":
+                    extreme = block >= observed - tolerance
+                else:
+                    extreme = block <= observed + tolerance
+                n_extreme += np.count_nonzero(extreme)
+                n_done += len(block)
+                p_value = (n_extreme + 1) / (n_done + 1)
+                if precision is not None and \
+                        np.sqrt(p_value * (1 - p_value) / n_done) <= precision:
+                    return p_value
+    return p_value
+
+
+def __get_count_nobs(values) -> tuple:
+    """Gets count of ones and number of observations of a binary sample
+
+    Returns:
+        tuple: count of ones, number of observations
+    """
+    if isinstance(values, SummaryStats):
+        return int(values.total), values.n
+    return int(np.count_nonzero(values)), len(values)
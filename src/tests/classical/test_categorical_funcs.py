@@ -17,3 +17,46 @@ def test_two_categorical_hypothesis():
     workout_result = workout.two_categorical_hypothesis(observed)
     actual_result = categorical.two_categorical_hypothesis(observed)
     assert workout_result == actual_result
+
+
+def test_two_categorical_hypothesis_stack():
+    tables = np.random.default_rng(0).integers(10, 50, (20, 3, 4))
+    chi_square, p_value = workout.two_categorical_hypothesis(tables)
+    expected = categorical.two_categorical_hypothesis(tables)
+    assert chi_square.shape == p_value.shape == (20,)
+    assert np.allclose(chi_square, expected[0])
+    assert np.allclose(p_value, expected[1])
+
+
+def test_two_categorical_hypothesis_ragged():
+    rng = np.random.default_rng(1)
+    tables = [rng.integers(10, 50, (nrow, 3)) for nrow in (2, 5, 3)]
+    offsets = np.cumsum([0] + [len(table) for table in tables[:-1]])
+    observed = np.concatenate(tables)
+    chi_square, p_value = workout.two_categorical_hypothesis_ragged(
+        observed, offsets)
+    for i, table in enumerate(tables):
+        expected = categorical.two_categorical_hypothesis(table)
+        assert np.allclose((chi_square[i], p_value[i]), expected)
+    assert np.allclose((chi_square, p_value),
+                       categorical.two_categorical_hypothesis_ragged(
+                           observed, offsets))
+
+
+def test_one_categorical_hypothesis_batch():
+    rng = np.random.default_rng(2)
+    nobs = rng.integers(1000, 2000, (30, 4))
+    counts = rng.binomial(nobs, 0.3)
+    mask = np.zeros(counts.shape, dtype=bool)
+    mask[::3, 1] = True
+    for batch_mask in (None, mask):
+        chi_square, p_value = workout.one_categorical_hypothesis(
+            counts, nobs, batch_mask)
+        expected = categorical.one_categorical_hypothesis(counts, nobs,
+                                                          batch_mask)
+        assert np.allclose(chi_square, expected[0])
+        assert np.allclose(p_value, expected[1])
+    # a masked group is the same as a group left out
+    single = workout.one_categorical_hypothesis(counts[0][[0, 2, 3]],
+                                                nobs[0][[0, 2, 3]])
+    assert np.allclose((chi_square[0], p_value[0]), single)
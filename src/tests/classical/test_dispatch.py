@@ -0,0 +1,89 @@
+""" Testing dispatching of tests to workout and statsmodels backends
+
+"""
+import numpy as np
+import classical.dispatch as dispatch
+import classical.means as means
+import classical.proportions as proportions
+from classical.summary import SummaryStats
+import pytest
+
+np.random.seed(0)
+
+
+@pytest.fixture(autouse=True)
+def reset_dispatch():
+    yield
+    dispatch.reset_thresholds()
+
+
+def test_choose_backend_by_size():
+    small = np.random.choice(2, 10)
+    large = np.random.choice(2, 200000)
+    assert dispatch.choose_backend("one_prop_hypothesis", large) == "workout"
+    dispatch.set_threshold("one_prop_hypothesis", 100000)
+    assert dispatch.choose_backend("one_prop_hypothesis", small) == "workout"
+    assert dispatch.choose_backend("one_prop_hypothesis", large) == \
+        "statsmodels"
+    assert dispatch.choose_backend(
+        "one_prop_hypothesis", SummaryStats.from_values(large)) == "workout"
+    dispatch.set_threshold("one_prop_hypothesis", None)
+    assert dispatch.choose_backend("one_prop_hypothesis", large) == "workout"
+
+
+def test_choose_backend_override():
+    small = np.random.choice(2, 10)
+    assert dispatch.choose_backend("one_prop_hypothesis", small,
+                                   backend="statsmodels") == "statsmodels"
+    dispatch.set_backend("statsmodels")
+    assert dispatch.choose_backend("one_prop_hypothesis", small) == \
+        "statsmodels"
+    with pytest.raises(ValueError):
+        dispatch.set_backend("fastest")
+
+
+def test_dispatch_same_method():
+    sample1 = np.random.normal(50, 1, 10)
+    sample2 = np.random.normal(51, 2, 15)
+    result = dispatch.two_means_hypothesis(sample1, sample2)
+    assert result == pytest.approx(means.two_means_hypothesis(sample1,
+                                                              sample2))
+    observed = np.array([[10, 20], [30, 25]])
+    assert dispatch.two_categorical_hypothesis(observed) == \
+        pytest.approx(dispatch.two_categorical_hypothesis(
+            observed, backend="statsmodels"))
+
+
+def test_dispatch_results():
+    sample1 = np.random.choice(2, 100, p=[0.5, 0.5])
+    sample2 = np.random.choice(2, 100, p=[0.55, 0.45])
+    for backend in ["workout", "statsmodels"]:
+        assert dispatch.two_props_hypothesis(
+            sample1, sample2, backend=backend) == pytest.approx(
+            proportions.two_props_hypothesis(sample1, sample2))
+
+
+def test_backends_agree_at_thresholds():
+    # inputs of every function with a default threshold, by input size
+    inputs = {
+        "one_categorical_hypothesis": lambda size: (
+            np.random.binomial(1000, 0.3, size), np.full(size, 1000)),
+    }
+    for name, threshold in dispatch.DEFAULT_THRESHOLDS.items():
+        if threshold is None:
+            continue
+        for size in [threshold - 1, threshold]:
+            args = inputs[name](size)
+            assert dispatch.choose_backend(name, args[0]) == \
+                ("workout" if size < threshold else "statsmodels")
+            func = getattr(dispatch, name)
+            assert func(*args, backend="workout") == pytest.approx(
+                func(*args, backend="statsmodels"))
+
+
+def test_dispatch_one_prop_null_zero():
+    sample = np.random.choice(2, 100)
+    assert dispatch.one_prop_hypothesis(sample) == pytest.approx(
+        proportions.one_prop_hypothesis(sample))
+    assert dispatch.one_prop_hypothesis(sample, 0.5) == pytest.approx(
+        dispatch.one_prop_hypothesis(sample, 0.5, backend="statsmodels"))
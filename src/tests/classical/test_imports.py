@@ -0,0 +1,48 @@
+""" Testing that importing the package does not load heavy backends
+
+    statsmodels, pandas and scipy.stats are only loaded on first use
+
+"""
+import os
+import subprocess
+import sys
+import classical
+import pytest
+
+SRC_DIR = os.path.dirname(os.path.dirname(classical.__file__))
+HEAVY_MODULES = ["statsmodels", "pandas", "scipy.stats"]
+
+
+def get_loaded_modules(statement: str) -> set:
+    """Runs import statement in a new interpreter and returns which of the
+    heavy modules were loaded
+    """
+    code = "import sys\n{}\nprint(' '.join(m for m in {!r} if m in " \
+           "sys.modules))".format(statement, HEAVY_MODULES)
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    output = subprocess.check_output([sys.executable, "-c", code], env=env)
+    return set(output.decode().split())
+
+
+@pytest.mark.parametrize("module", ["classical.workout.means",
+                                    "classical.workout.proportions",
+                                    "classical.workout.categorical",
+                                    "classical.workout.ratios"])
+def test_workout_import_is_light(module):
+    assert get_loaded_modules("import " + module) == set()
+
+
+@pytest.mark.parametrize("module", ["classical.means",
+                                    "classical.proportions",
+                                    "classical.categorical",
+                                    "classical.results",
+                                    "classical.io"])
+def test_backends_load_lazily(module):
+    assert get_loaded_modules("import " + module) == set()
+
+
+def test_backend_loads_on_first_use():
+    loaded = get_loaded_modules(
+        "import numpy as np\nimport classical.proportions as p\n"
+        "p.one_prop_conf_interval(np.array([0, 1, 1]))")
+    assert "statsmodels" in loaded
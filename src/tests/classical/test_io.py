@@ -0,0 +1,102 @@
+""" Testing readers of test inputs from files
+
+    testing whether summaries read in chunks match those of the full data
+
+"""
+import numpy as np
+import pandas as pd
+import classical.workout.means as means
+from classical.io import (read_csv_summaries, read_csv_table,
+                          read_npy_summaries, read_npy_table)
+from classical.summary import SummaryStats
+import pytest
+
+rng = np.random.default_rng(0)
+
+
+@pytest.fixture
+def csv_files(tmp_path):
+    frames = []
+    for i in range(3):
+        frame = pd.DataFrame({
+            "arm": rng.choice(["control", "treatment"], 1000),
+            "revenue": rng.normal(50, 5, 1000),
+            "country": rng.choice(["de", "fr", "us"][:i + 1], 1000),
+        })
+        frame.loc[5, "revenue"] = np.nan
+        frame.to_csv(tmp_path / "log{}.csv".format(i), index=False)
+        frames.append(frame)
+    paths = [str(tmp_path / "log{}.csv".format(i)) for i in range(3)]
+    return paths, pd.concat(frames, ignore_index=True)
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_read_csv_summaries(csv_files, n_jobs):
+    paths, data = csv_files
+    data = data.dropna()
+    summaries = read_csv_summaries(paths, "revenue", "arm", chunksize=300,
+                                   n_jobs=n_jobs)
+    for arm in ["control", "treatment"]:
+        values = data.loc[data["arm"] == arm, "revenue"].to_numpy()
+        assert summaries[arm].n == len(values)
+        assert summaries[arm].mean == pytest.approx(values.mean())
+        assert summaries[arm].var == pytest.approx(values.var(ddof=1))
+    total = read_csv_summaries(paths, "revenue", chunksize=300)
+    assert total.n == len(data)
+    assert means.one_mean_hypothesis(total, 50) == pytest.approx(
+        means.one_mean_hypothesis(data["revenue"].to_numpy(), 50))
+
+
+def test_read_csv_table(csv_files):
+    paths, data = csv_files
+    observed, rows, columns = read_csv_table(paths, "arm", "country",
+                                             chunksize=300, n_jobs=2)
+    expected = pd.crosstab(data["arm"], data["country"])
+    assert np.array_equal(observed,
+                          expected.loc[rows, columns].to_numpy())
+
+
+def test_read_npy(tmp_path):
+    values = [rng.normal(10, 2, 70000), rng.normal(11, 2, 5000)]
+    arms = [rng.integers(0, 3, 70000), rng.integers(0, 2, 5000)]
+    for i in range(2):
+        np.save(tmp_path / "values{}.npy".format(i), values[i])
+        np.save(tmp_path / "arms{}.npy".format(i), arms[i])
+    paths = [str(tmp_path / "values{}.npy".format(i)) for i in range(2)]
+    arm_paths = [str(tmp_path / "arms{}.npy".format(i)) for i in range(2)]
+
+    total = read_npy_summaries(paths)
+    assert total.mean == pytest.approx(np.concatenate(values).mean())
+    stats = read_npy_summaries(paths, arm_paths, n_jobs=2)
+    expected = SummaryStats.from_labels(np.concatenate(values),
+                                        np.concatenate(arms))
+    assert np.array_equal(stats.n, expected.n)
+    assert np.allclose(stats.m2, expected.m2)
+
+    table = read_npy_table(arm_paths, arm_paths, 3, 3, n_jobs=2)
+    assert np.array_equal(np.diag(table), expected.n)
+
+
+def test_read_no_files():
+    with pytest.raises(ValueError):
+        read_npy_summaries([])
+    with pytest.raises(ValueError):
+        read_npy_table([], [], 2, 2)
+
+
+def test_read_npy_path_objects(tmp_path):
+    values = rng.normal(10, 2, 1000)
+    np.save(tmp_path / "values.npy", values)
+    stats = read_npy_summaries(tmp_path / "values.npy")
+    assert stats.n == 1000
+    assert stats.mean == pytest.approx(values.mean())
+
+
+def test_read_npy_unpaired_files(tmp_path):
+    for i in range(2):
+        np.save(tmp_path / "arms{}.npy".format(i), rng.integers(0, 2, 10))
+    arm_paths = [tmp_path / "arms{}.npy".format(i) for i in range(2)]
+    with pytest.raises(ValueError):
+        read_npy_summaries(arm_paths, arm_paths[:1])
+    with pytest.raises(ValueError):
+        read_npy_table(arm_paths[:1], arm_paths, 2, 2)
@@ -4,8 +4,10 @@
 
 """
 import numpy as np
+from scipy import stats
 import classical.means as means
 import classical.workout.means as workout
+from classical.summary import BLOCK_SIZE, CrossMoments, SummaryStats
 import pytest
 
 np.random.seed(0)
@@ -60,3 +62,63 @@ def test_multiple_means_hypothesis():
     actual_result = means.multiple_mean_hypothesis(sample1, sample2, sample3)
 
     assert workout_result == pytest.approx(actual_result)
+
+
+def test_multiple_means_hypothesis_by_label():
+    n_groups = 5
+    # spans several blocks, one label is never used
+    labels = np.random.choice([0, 1, 2, 4], 3 * BLOCK_SIZE + 7)
+    values = np.random.normal(50, 1, len(labels)) + labels / 100
+    expected = stats.f_oneway(*[values[labels == group]
+                                for group in (0, 1, 2, 4)])
+
+    for module in (workout, means):
+        result = module.multiple_mean_hypothesis_by_label(values, labels,
+                                                          n_groups)
+        assert result == pytest.approx(tuple(expected))
+        summary = SummaryStats.from_labels(values, labels, n_groups)
+        result = module.multiple_mean_hypothesis_by_label(summary)
+        assert result == pytest.approx(tuple(expected))
+
+
+def test_two_means_test():
+    sample1 = np.random.normal(50, 1, 10)
+    sample2 = np.random.normal(51, 2, 12)
+    for pooled in [True, False]:
+        tstat, pvalue, lower, upper = workout.two_means_test(
+            sample1, sample2, conf_level=0.9, pooled=pooled)
+        assert (tstat, pvalue) == pytest.approx(
+            workout.two_means_hypothesis(sample1, sample2, pooled=pooled))
+        assert (lower, upper) == pytest.approx(
+            workout.two_means_diff_conf_interval(sample1, sample2, 0.9,
+                                                 pooled=pooled))
+
+
+def test_two_means_cuped_test():
+    covariates1 = np.random.normal(10, 2, (300, 4))
+    covariates2 = np.random.normal(10, 2, (250, 4))
+    values1 = covariates1 * [1, 2, 0, -1] + np.random.normal(0.5, 1, (300, 4))
+    values2 = covariates2 * [1, 2, 0, -1] + np.random.normal(0, 1, (250, 4))
+    for pooled in [True, False]:
+        result = workout.two_means_cuped_test(values1, covariates1, values2,
+                                              covariates2, 0.9, pooled)
+        x = np.concatenate([covariates1, covariates2])
+        y = np.concatenate([values1, values2])
+        for metric in range(4):
+            theta = np.cov(x[:, metric], y[:, metric])[0, 1] / \
+                np.var(x[:, metric], ddof=1)
+            adjusted1 = values1[:, metric] - theta * covariates1[:, metric]
+            adjusted2 = values2[:, metric] - theta * covariates2[:, metric]
+            expected = workout.two_means_test(adjusted1, adjusted2, 0.9,
+                                              pooled)
+            assert [r[metric] for r in result[1:]] == \
+                pytest.approx(expected)
+            assert result[0][metric] == pytest.approx(
+                np.mean(adjusted1) - np.mean(adjusted2))
+
+    moments1 = CrossMoments.from_values(values1[:100], covariates1[:100]) + \
+        CrossMoments.from_values(values1[100:], covariates1[100:])
+    moments2 = CrossMoments.from_values(values2, covariates2)
+    merged = workout.two_means_cuped_test(moments1, None, moments2, None)
+    assert np.allclose(merged, workout.two_means_cuped_test(
+        values1, covariates1, values2, covariates2))
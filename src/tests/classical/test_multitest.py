@@ -0,0 +1,69 @@
+""" Testing multiple testing corrections
+
+    testing whether corrections are equivalent to statsmodels multipletests
+
+"""
+import numpy as np
+import classical.workout.multitest as multitest
+from statsmodels.stats.multitest import multipletests
+import pytest
+
+rng = np.random.default_rng(0)
+
+
+@pytest.mark.parametrize("method", multitest.METHODS)
+def test_multiple_testing_correction(method):
+    p_values = np.concatenate([rng.uniform(0, 1, 500),
+                               rng.uniform(0, 0.001, 50)])
+    p_values[:10] = p_values[10]
+    reject, adjusted = multitest.multiple_testing_correction(
+        p_values, 0.05, method)
+    expected = multipletests(p_values, 0.05, method)
+    assert np.array_equal(reject, expected[0])
+    assert np.allclose(adjusted, expected[1])
+
+    groups = rng.integers(0, 4, len(p_values))
+    reject, adjusted = multitest.multiple_testing_correction(
+        p_values, 0.05, method, groups)
+    for group in range(4):
+        expected = multipletests(p_values[groups == group], 0.05, method)
+        assert np.array_equal(reject[groups == group], expected[0])
+        assert np.allclose(adjusted[groups == group], expected[1])
+
+
+@pytest.mark.parametrize("method", multitest.METHODS)
+def test_tiny_p_values_in_many_families(method):
+    groups = np.repeat(np.arange(1000), 4)
+    p_values = rng.uniform(0, 1, len(groups))
+    p_values[::4] = 1e-15
+    p_values[1::4] = 6e-12
+    _, adjusted = multitest.multiple_testing_correction(
+        p_values, 0.05, method, groups)
+    for group in range(0, 1000, 97):
+        expected = multipletests(p_values[groups == group], 0.05, method)
+        assert adjusted[groups == group] == pytest.approx(expected[1],
+                                                          rel=1e-12, abs=0)
+
+
+def test_online_fdr():
+    p_values = np.concatenate([rng.uniform(0, 1, 300),
+                               rng.uniform(0, 1e-4, 30)])
+    rng.shuffle(p_values)
+    fdr = multitest.OnlineFDR(alpha=0.05)
+    reject = np.concatenate([fdr.update(chunk)
+                             for chunk in np.array_split(p_values, 7)])
+
+    # reference: levels computed one test at a time
+    alpha, w0, rejections = 0.05, 0.025, []
+    expected = []
+    for t, p_value in enumerate(p_values, start=1):
+        level = w0 * multitest.OnlineFDR.gamma(t)
+        for i, tau in enumerate(rejections):
+            level += (alpha - w0 if i == 0 else alpha) * \
+                multitest.OnlineFDR.gamma(t - tau)
+        expected.append(p_value <= level)
+        if expected[-1]:
+            rejections.append(t)
+    assert np.array_equal(reject, expected)
+    assert fdr.rejections == rejections
+    assert 0 < reject.sum() <= 40
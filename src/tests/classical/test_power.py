@@ -0,0 +1,53 @@
+""" Testing power analysis functions
+
+    testing against statsmodels power classes and the consistency of
+    sample size, power and minimum detectable effect
+
+"""
+import numpy as np
+import classical.workout.power as power
+import pytest
+from statsmodels.stats.power import NormalIndPower
+
+
+def test_two_means_power():
+    for alternative in ["two-sided", "larger"]:
+        expected = NormalIndPower().power(0.2, nobs1=300, alpha=0.05,
+                                          ratio=2, alternative=alternative)
+        result = power.two_means_power(0.4, 2, 300, ratio=2,
+                                       alternative=alternative)
+        assert result == pytest.approx(expected)
+    n1, n2 = power.two_means_sample_size(0.4, 2, ratio=2)
+    expected = NormalIndPower().solve_power(0.2, power=0.8, alpha=0.05,
+                                            ratio=2)
+    assert n1 == np.ceil(expected)
+    assert n2 == np.ceil(2 * n1)
+
+
+def test_power_grid():
+    baseline = np.array([0.05, 0.1, 0.3])[:, None, None, None]
+    mde = np.array([0.01, 0.02])[None, :, None, None]
+    alpha = np.array([0.01, 0.05])[None, None, :, None]
+    ratio = np.array([1, 3])[None, None, None, :]
+    for alternative in ["two-sided", "larger", "smaller"]:
+        sign = -1 if alternative == "smaller" else 1
+        n1, _ = power.two_props_sample_size(baseline, sign * mde, alpha,
+                                            0.8, ratio, alternative)
+        assert n1.shape == (3, 2, 2, 2)
+        achieved = power.two_props_power(baseline, sign * mde, n1, alpha,
+                                         ratio, alternative)
+        assert np.all(achieved >= 0.8)
+        assert np.allclose(achieved, 0.8, atol=1e-3)
+        detectable = power.two_props_mde(baseline, n1, alpha, 0.8, ratio,
+                                         alternative)
+        assert np.all(np.abs(detectable) <= mde)
+        assert np.allclose(detectable, sign * mde, rtol=1e-2)
+
+
+def test_one_sample_power():
+    n = power.one_prop_sample_size(0.5, 0.05)
+    assert power.one_prop_power(0.5, 0.05, n) == pytest.approx(0.8, abs=1e-2)
+    assert power.one_prop_mde(0.5, n) == pytest.approx(0.05, rel=1e-2)
+    n = power.one_mean_sample_size(1, 4, alternative="larger")
+    assert power.one_mean_mde(4, n, alternative="larger") == \
+        pytest.approx(1, rel=1e-2)
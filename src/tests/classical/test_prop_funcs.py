@@ -6,6 +6,8 @@
 import numpy as np
 import classical.proportions as proportions
 import classical.workout.proportions as workout
+from classical.summary import SummaryStats
+import pytest
 
 np.random.seed(0)
 
@@ -44,3 +46,55 @@ def test_props_conf_interval():
                                                         conf_level=conf)
 
     assert base_ci == stats_ci
+
+
+def test_props_hypothesis_batch():
+    counts1 = np.random.randint(20, 60, (5, 3))
+    counts2 = np.random.randint(20, 60, (5, 3))
+    nobs1, nobs2 = np.full((5, 3), 100), np.full((5, 3), 120)
+    for alternative in ["two-sided", "larger", "smaller"]:
+        workout_z, workout_p = workout.two_props_hypothesis_batch(
+            counts1, nobs1, counts2, nobs2, alternative=alternative)
+        actual_z, actual_p = proportions.two_props_hypothesis_batch(
+            counts1, nobs1, counts2, nobs2, alternative=alternative)
+        assert workout_z.shape == (5, 3)
+        assert workout_z == pytest.approx(actual_z)
+        assert workout_p == pytest.approx(actual_p)
+
+
+def test_props_hypothesis_batch_matches_single():
+    sample1 = np.random.choice(2, 10, p=[0.5, 0.5])
+    sample2 = np.random.choice(2, 10, p=[0.55, 0.45])
+    single = workout.two_props_hypothesis(sample1, sample2)
+    z, p = workout.two_props_hypothesis_batch([sample1.sum()], [10],
+                                              [sample2.sum()], [10])
+    assert (z[0], p[0]) == pytest.approx(single)
+
+
+def test_props_conf_interval_batch():
+    counts1 = np.random.randint(20, 60, 8)
+    counts2 = np.random.randint(20, 60, 8)
+    nobs1, nobs2 = 100, np.full(8, 120)
+    workout_ci = workout.two_props_diff_conf_interval_batch(
+        counts1, nobs1, counts2, nobs2, conf_level=0.9)
+    actual_ci = proportions.two_props_diff_conf_interval_batch(
+        counts1, nobs1, counts2, nobs2, conf_level=0.9)
+    assert workout_ci[0] == pytest.approx(actual_ci[0])
+    assert workout_ci[1] == pytest.approx(actual_ci[1])
+
+
+def test_props_binary_inputs():
+    sample1 = np.random.choice(2, 1001, p=[0.6, 0.4])
+    sample2 = np.random.choice(2, 700, p=[0.5, 0.5])
+    expected = proportions.two_props_hypothesis(sample1, sample2)
+    inputs = [
+        (sample1.astype(bool), sample2.astype(bool)),
+        (SummaryStats.from_packed(np.packbits(sample1), len(sample1)),
+         SummaryStats.from_packed(np.packbits(sample2), len(sample2))),
+        (SummaryStats.from_counts(sample1.sum(), len(sample1)),
+         SummaryStats.from_counts(sample2.sum(), len(sample2))),
+    ]
+    for values1, values2 in inputs:
+        for module in (workout, proportions):
+            result = module.two_props_hypothesis(values1, values2)
+            assert result == pytest.approx(expected)
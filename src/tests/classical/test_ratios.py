@@ -0,0 +1,93 @@
+""" Testing delta method tests of ratio metrics
+
+    testing the vectorized tests against per metric computations
+
+"""
+import numpy as np
+import classical.workout.means as means
+import classical.workout.ratios as ratios
+import classical.workout.utils as utils
+from classical.summary import CrossMoments
+import pytest
+
+np.random.seed(0)
+
+
+def __linearize(numerators, denominators):
+    """per unit values whose mean variance is the delta method variance"""
+    ratio = np.sum(numerators) / np.sum(denominators)
+    return (numerators - ratio * denominators) / np.mean(denominators)
+
+
+def test_one_ratio():
+    denominators = np.random.poisson(20, (500, 3)) + 1
+    numerators = np.random.binomial(denominators, [0.1, 0.2, 0.3])
+    lower, upper = ratios.one_ratio_conf_interval(numerators, denominators,
+                                                  0.9)
+    z, p_value = ratios.one_ratio_hypothesis(numerators, denominators, 0.2)
+    for metric in range(3):
+        ratio = np.sum(numerators[:, metric]) / np.sum(denominators[:, metric])
+        se = np.std(__linearize(numerators[:, metric],
+                                denominators[:, metric]), ddof=1) / \
+            np.sqrt(500)
+        z_critical = utils.get_z_critical(0.9)
+        assert (lower[metric], upper[metric]) == pytest.approx(
+            (ratio - z_critical * se, ratio + z_critical * se))
+        assert z[metric] == pytest.approx((ratio - 0.2) / se)
+    assert p_value == pytest.approx(utils.get_norm_pvalue(z, "two-sided"))
+
+
+def test_two_ratios():
+    denominators1 = np.random.poisson(10, (400, 2)) + 1
+    numerators1 = np.random.binomial(denominators1, 0.25)
+    denominators2 = np.random.poisson(12, (300, 2)) + 1
+    numerators2 = np.random.binomial(denominators2, 0.2)
+    z, p_value = ratios.two_ratios_hypothesis(
+        numerators1, denominators1, numerators2, denominators2, "larger")
+    lower, upper = ratios.two_ratios_diff_conf_interval(
+        numerators1, denominators1, numerators2, denominators2)
+    for metric in range(2):
+        linear1 = __linearize(numerators1[:, metric], denominators1[:, metric])
+        linear2 = __linearize(numerators2[:, metric], denominators2[:, metric])
+        diff = np.sum(numerators1[:, metric]) / \
+            np.sum(denominators1[:, metric]) - \
+            np.sum(numerators2[:, metric]) / np.sum(denominators2[:, metric])
+        se = np.sqrt(np.var(linear1, ddof=1) / 400 +
+                     np.var(linear2, ddof=1) / 300)
+        assert z[metric] == pytest.approx(diff / se)
+        assert (lower[metric] + upper[metric]) / 2 == pytest.approx(diff)
+    assert p_value == pytest.approx(utils.get_norm_pvalue(z, "larger"))
+
+    moments1 = CrossMoments.from_values(numerators1[:150],
+                                        denominators1[:150]) + \
+        CrossMoments.from_values(numerators1[150:], denominators1[150:])
+    moments2 = CrossMoments.from_values(numerators2, denominators2)
+    assert np.allclose(ratios.two_ratios_hypothesis(
+        moments1, None, moments2, None, "larger"), (z, p_value))
+
+
+def test_mean_of_ratios():
+    denominators1 = np.random.uniform(1, 5, 200)
+    numerators1 = np.random.uniform(0, 2, 200) * denominators1
+    denominators2 = np.random.uniform(1, 5, 250)
+    numerators2 = np.random.uniform(0, 2.2, 250) * denominators2
+    z, _ = ratios.two_ratios_hypothesis(numerators1, denominators1,
+                                        numerators2, denominators2,
+                                        kind="mean_of_ratios")
+    t, _ = means.two_means_hypothesis(numerators1 / denominators1,
+                                      numerators2 / denominators2)
+    assert z == pytest.approx(t)
+    # with unit denominators both estimates are the mean
+    ones = np.ones_like(numerators1)
+    assert ratios.one_ratio_hypothesis(numerators1, ones) == \
+        pytest.approx(ratios.one_ratio_hypothesis(numerators1, ones,
+                                                  kind="mean_of_ratios"))
+
+
+def test_invalid_ratio_args():
+    moments = CrossMoments.from_values(np.ones(10), np.arange(1, 11))
+    with pytest.raises(ValueError):
+        ratios.one_ratio_hypothesis(moments, kind="mean_of_ratios")
+    with pytest.raises(ValueError):
+        ratios.one_ratio_conf_interval(np.ones(10), np.ones(10),
+                                       kind="ratio")
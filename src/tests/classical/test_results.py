@@ -0,0 +1,101 @@
+""" Testing structured results of the tests
+
+"""
+import numpy as np
+import pandas as pd
+import classical.workout.means as means
+import classical.workout.power as power
+import classical.workout.proportions as proportions
+import classical.workout.ratios as ratios
+from classical.results import DTYPE, BatchResult, TestResult
+import simulation.permutation as permutation
+import pytest
+
+np.random.seed(0)
+
+
+def test_test_result():
+    sample = np.random.normal(50, 1, 10)
+    result = TestResult.from_test("one_mean_hypothesis",
+                                  means.one_mean_hypothesis(sample, 50),
+                                  df=9, n=10)
+    statistic, p_value = means.one_mean_hypothesis(sample, 50)
+    assert (result.statistic, result.p_value) == (statistic, p_value)
+    assert (result.df, result.n) == (9, 10)
+    assert np.isnan(result.lower)
+    interval = TestResult.from_test("one_mean_conf_interval",
+                                    means.one_mean_conf_interval(sample))
+    assert (interval.lower, interval.upper) == \
+        means.one_mean_conf_interval(sample)
+    with pytest.raises(AttributeError):
+        result.other = 1
+
+
+def test_batch_result():
+    counts1, counts2 = np.array([10, 20, 30]), np.array([15, 25, 35])
+    nobs = np.array([100, 100, 100])
+    result = proportions.two_props_hypothesis_batch(counts1, nobs, counts2,
+                                                    nobs)
+    batch = BatchResult.from_test("two_props_hypothesis_batch", result,
+                                  n=2 * nobs)
+    assert len(batch) == 3
+    assert np.array_equal(batch.p_value, result[1])
+
+    records = batch.to_records()
+    assert records.dtype == DTYPE
+    assert np.array_equal(records["statistic"], result[0])
+    frame = batch.to_frame(index=["a", "b", "c"])
+    assert list(frame.columns) == list(DTYPE.names)
+    if int(pd.__version__.split(".")[0]) >= 2:
+        assert np.shares_memory(frame["p_value"].to_numpy(), batch.p_value)
+
+    single = [TestResult(statistic=s, p_value=p) for s, p in zip(*result)]
+    collected = BatchResult.from_results(single)
+    assert np.array_equal(collected.statistic, batch.statistic)
+    assert np.all(np.isnan(collected.n))
+
+
+def test_batch_result_shape():
+    counts1 = np.random.binomial(100, 0.3, (4, 3))
+    counts2 = np.random.binomial(100, 0.3, (4, 3))
+    result = proportions.two_props_hypothesis_batch(counts1, 100, counts2,
+                                                    100)
+    batch = BatchResult.from_test("two_props_hypothesis_batch", result)
+    assert len(batch) == 12
+    assert batch.shape == (4, 3)
+    assert np.array_equal(batch.statistic, result[0])
+    assert np.array_equal(batch["p_value"], result[1])
+    assert batch.to_records().shape == (4, 3)
+    assert len(batch.to_frame()) == 12
+
+
+def test_permutation_result_fields():
+    sample1 = np.random.normal(50, 1, 20)
+    sample2 = np.random.normal(51, 1, 20)
+    diff, p_value = permutation.two_means_permutation_test(
+        sample1, sample2, n_permutations=100, seed=0)
+    result = TestResult.from_test("two_means_permutation_test",
+                                  (diff, p_value))
+    assert (result.effect, result.p_value) == (diff, p_value)
+    assert np.isnan(result.statistic)
+
+
+def test_power_and_ratio_result_fields():
+    sizes = BatchResult.from_test(
+        "two_props_sample_size",
+        power.two_props_sample_size(0.1, [0.01, 0.02], ratio=2))
+    assert np.all(sizes.n2 >= 2 * sizes.n - 1)
+    achieved = TestResult.from_test("two_means_power",
+                                    power.two_means_power(0.2, 1, 400))
+    assert 0 < achieved.power < 1
+    assert np.isnan(achieved.statistic)
+    mde = BatchResult.from_test("one_mean_mde",
+                                power.one_mean_mde(1, [100, 400]))
+    assert np.all(mde.effect > 0)
+
+    denominators = np.random.poisson(10, (200, 2)) + 1
+    numerators = np.random.binomial(denominators, 0.3)
+    interval = BatchResult.from_test(
+        "one_ratio_conf_interval",
+        ratios.one_ratio_conf_interval(numerators, denominators))
+    assert np.all(interval.lower < interval.upper)
@@ -0,0 +1,95 @@
+""" Testing the parallel runner of tests
+
+"""
+import mmap
+import operator
+import time
+import numpy as np
+import classical.dispatch as dispatch
+from classical.runner import Task, run_tasks
+import pytest
+
+rng = np.random.default_rng(0)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_run_tasks(executor):
+    values1 = rng.normal(50, 1, 1000)
+    values2 = rng.normal(50.1, 1, 1000)
+    binary = rng.integers(0, 2, 1000)
+    tasks = [Task(experiment, "revenue", "two_means_hypothesis",
+                  (values1, values2), {"pooled": True})
+             for experiment in range(5)]
+    tasks.append(Task(5, "conversion", "one_prop_hypothesis", (binary, 0.5)))
+    tasks.append(Task(6, "conversion", "one_prop_hypothesis", ("bad",)))
+    # arrays above 1KB go through shared memory
+    results = list(run_tasks(tasks, executor, max_workers=2,
+                             shared_memory_bytes=1 << 10))
+
+    assert len(results) == len(tasks)
+    by_experiment = {result.experiment: result for result in results}
+    expected = dispatch.two_means_hypothesis(values1, values2, pooled=True)
+    for experiment in range(5):
+        assert by_experiment[experiment].error is None
+        assert by_experiment[experiment].result == pytest.approx(expected)
+    assert by_experiment[5].result == pytest.approx(
+        dispatch.one_prop_hypothesis(binary, 0.5))
+    assert by_experiment[6].result is None
+    assert by_experiment[6].error is not None
+
+
+def test_run_tasks_timeout():
+    tasks = [Task(0, "slow", time.sleep, (1,)),
+             Task(1, "fast", "one_mean_hypothesis", (np.arange(10.0),))]
+    results = list(run_tasks(tasks, max_workers=2, timeout=0.1))
+    assert [result.experiment for result in results] == [1, 0]
+    assert isinstance(results[1].error, TimeoutError)
+
+
+def test_run_tasks_timeout_waits_for_hung_worker():
+    # the second task only starts once the timed out one returns
+    tasks = [Task(0, "slow", time.sleep, (0.5,)),
+             Task(1, "fast", "one_mean_hypothesis", (np.arange(10.0),))]
+    results = list(run_tasks(tasks, max_workers=1, timeout=0.2))
+    assert [result.experiment for result in results] == [0, 1]
+    assert isinstance(results[0].error, TimeoutError)
+    assert results[1].error is None
+
+
+def test_run_tasks_shares_structured_arrays():
+    records = np.zeros(1000, dtype=[("a", float), ("b", np.int64)])
+    records["a"] = rng.normal(0, 1, 1000)
+    # results which are views of the shared arrays are copied
+    tasks = [Task(0, "a", np.asarray, (records,)),
+             Task(1, "a", operator.getitem, (records, 3)),
+             Task(2, "a", operator.getitem, (records, slice(10, 20)))]
+    results = list(run_tasks(tasks, "process", max_workers=1,
+                             shared_memory_bytes=1 << 10))
+    assert [result.error for result in results] == [None] * 3
+    by_experiment = {result.experiment: result for result in results}
+    assert by_experiment[0].result.dtype.names == ("a", "b")
+    assert np.array_equal(by_experiment[0].result, records)
+    assert by_experiment[1].result == records[3]
+    assert np.array_equal(by_experiment[2].result, records[10:20])
+
+
+def _is_mapped(values: np.ndarray) -> bool:
+    return isinstance(values.base, mmap.mmap)
+
+
+def test_run_tasks_shares_keyword_arrays():
+    values = rng.normal(0, 1, 1000)
+    tasks = [Task(0, "m", _is_mapped, (), {"values": values}),
+             Task(1, "m", "one_mean_hypothesis", (), {"values": values})]
+    results = list(run_tasks(tasks, "process", max_workers=1,
+                             shared_memory_bytes=1 << 10))
+    by_experiment = {result.experiment: result for result in results}
+    # workers map the shared memory instead of unpickling a copy
+    assert by_experiment[0].result is True
+    assert by_experiment[1].result == pytest.approx(
+        dispatch.one_mean_hypothesis(values))
+
+
+def test_run_tasks_invalid_test():
+    with pytest.raises(ValueError):
+        list(run_tasks([Task(0, "m", "no_such_test", ())]))
@@ -0,0 +1,56 @@
+""" Testing always valid sequential tests
+
+"""
+import numpy as np
+from classical.sequential import SequentialTest
+from classical.summary import SummaryStats
+import pytest
+
+
+def test_sequential_detects_effect():
+    rng = np.random.default_rng(0)
+    test = SequentialTest(mixture_variance=0.25)
+    p_values = []
+    for _ in range(50):
+        test.update(rng.normal(1, 1, 20), rng.normal(0, 1, 20))
+        p_values.append(test.p_value)
+    diff, p_value, lower, upper = test.result()
+    assert test.reject
+    assert np.all(np.diff(p_values) <= 0)
+    assert lower < 1 < upper
+    assert diff == pytest.approx(test.stats1.mean - test.stats2.mean)
+
+
+def test_sequential_null_rarely_rejects():
+    rng = np.random.default_rng(1)
+    rejections = 0
+    for _ in range(40):
+        test = SequentialTest(mixture_variance=0.01, kind="proportions")
+        for _ in range(30):
+            test.update(rng.integers(0, 2, 50), rng.integers(0, 2, 50))
+        rejections += test.reject
+    assert rejections <= 4
+
+
+def test_sequential_summary_updates():
+    rng = np.random.default_rng(2)
+    sample1, sample2 = rng.normal(0.3, 1, 500), rng.normal(0, 1, 400)
+    by_values = SequentialTest(mixture_variance=0.1)
+    by_summary = SequentialTest(mixture_variance=0.1)
+    by_values.update(sample1, sample2)
+    by_summary.update(SummaryStats.from_values(sample1[:200]))
+    by_summary.update(SummaryStats.from_values(sample1[200:]),
+                      SummaryStats.from_values(sample2))
+    assert by_summary.result() == pytest.approx(by_values.result())
+
+
+def test_sequential_disjoint_intervals():
+    rng = np.random.default_rng(3)
+    test = SequentialTest(mixture_variance=0.1)
+    test.update(rng.normal(0, 0.01, 1000), rng.normal(0, 0.01, 1000))
+    assert not test.inconsistent
+    # the effect jumps, so the new interval misses the previous one
+    _, _, lower, upper = test.update(rng.normal(10, 0.01, 10000))
+    assert test.inconsistent
+    assert lower <= upper
+    assert lower < test.stats1.mean - test.stats2.mean < upper
@@ -0,0 +1,85 @@
+""" Testing the batching stats service
+
+    testing whether batched results are the same as single calls
+
+"""
+import asyncio
+import numpy as np
+import classical.workout.means as means
+import classical.workout.proportions as proportions
+from classical.service import StatsService
+import pytest
+
+rng = np.random.default_rng(0)
+
+
+def test_service_batches_requests():
+    counts = rng.integers(100, 200, (50, 2))
+    samples = [(rng.normal(50, 1, 20), rng.normal(50.5, 2, 30))
+               for _ in range(20)]
+
+    async def run():
+        async with StatsService(max_batch_size=64, max_delay=0.01) as service:
+            props = [service.two_props_hypothesis(c1, 1000, c2, 1200)
+                     for c1, c2 in counts]
+            intervals = [service.two_props_diff_conf_interval(c1, 1000, c2,
+                                                              1200, 0.9)
+                         for c1, c2 in counts]
+            tests = [service.two_means_hypothesis(s1, s2, pooled=True)
+                     for s1, s2 in samples]
+            bad = service.two_props_hypothesis(1, 10, 2, 10, "unknown")
+            results = await asyncio.gather(*props, *intervals, *tests, bad,
+                                           return_exceptions=True)
+            return results, service.n_batches
+
+    results, n_batches = asyncio.run(run())
+    assert n_batches < len(results)
+    for (c1, c2), result in zip(counts, results[:50]):
+        assert result == pytest.approx(
+            proportions.two_props_hypothesis_batch(c1, 1000, c2, 1200))
+    for (c1, c2), result in zip(counts, results[50:100]):
+        assert result == pytest.approx(
+            proportions.two_props_diff_conf_interval_batch(c1, 1000, c2,
+                                                           1200, 0.9))
+    for (s1, s2), result in zip(samples, results[100:120]):
+        assert result == pytest.approx(
+            means.two_means_hypothesis(s1, s2, pooled=True))
+    assert isinstance(results[-1], ValueError)
+
+
+def test_service_bad_request_fails_alone(monkeypatch):
+    async def run(*requests):
+        async with StatsService(max_delay=0.01) as service:
+            return await asyncio.gather(
+                *[service.two_props_hypothesis(*args) for args in requests],
+                return_exceptions=True)
+
+    good = [(10, 100, 12, 100), (30, 200, 25, 150)]
+    expected = [proportions.two_props_hypothesis_batch(*args)
+                for args in good]
+    results = asyncio.run(run(good[0], ("abc", 100, 12, 100),
+                              (None, 100, 12, 100), good[1]))
+    assert results[0] == pytest.approx(expected[0])
+    assert isinstance(results[1], ValueError)
+    assert isinstance(results[2], ValueError)
+    assert results[3] == pytest.approx(expected[1])
+
+    # a batch which still fails is evaluated request by request
+    batch_test = proportions.two_props_hypothesis_batch
+
+    def fail_on_negative(counts1, *args):
+        if np.any(counts1 < 0):
+            raise ValueError("negative count")
+        return batch_test(counts1, *args)
+
+    monkeypatch.setattr(proportions, "two_props_hypothesis_batch",
+                        fail_on_negative)
+    results = asyncio.run(run(good[0], (-1, 100, 12, 100), good[1]))
+    assert results[0] == pytest.approx(expected[0])
+    assert isinstance(results[1], ValueError)
+    assert results[2] == pytest.approx(expected[1])
+
+
+def test_service_not_started():
+    with pytest.raises(RuntimeError):
+        asyncio.run(StatsService().two_props_hypothesis(1, 10, 2, 10))
@@ -0,0 +1,144 @@
+""" Testing summary statistics input for AB test functions
+
+    testing whether functions give the same results for raw values and
+    for their summaries
+
+"""
+import numpy as np
+import classical.means as means
+import classical.proportions as proportions
+import classical.workout.means as workout_means
+import classical.workout.proportions as workout_props
+from classical.summary import BLOCK_SIZE, CrossMoments, SummaryStats
+import pytest
+
+np.random.seed(0)
+
+
+def test_summary_merge():
+    sample1 = np.random.normal(50, 1, 10)
+    sample2 = np.random.normal(51, 2, 15)
+    merged = SummaryStats.from_values(sample1) + \
+        SummaryStats.from_values(sample2)
+    full = SummaryStats.from_values(np.concatenate([sample1, sample2]))
+    assert merged.n == full.n
+    assert merged.mean == pytest.approx(full.mean)
+    assert merged.var == pytest.approx(full.var)
+
+
+def test_summary_from_labels():
+    labels = np.random.randint(0, 3, 200)
+    values = np.random.normal(50, 1, 200)
+    stats = SummaryStats.from_labels(values, labels)
+    for group in range(3):
+        sample = values[labels == group]
+        assert stats.n[group] == len(sample)
+        assert stats.mean[group] == pytest.approx(np.mean(sample))
+        assert stats.var[group] == pytest.approx(np.var(sample, ddof=1))
+    stats = SummaryStats.from_labels(values, labels, n_groups=4)
+    assert (stats.n[3], stats.total[3], stats.m2[3]) == (0, 0, 0)
+
+
+def test_summary_from_large_counts():
+    # count**2 overflows int64
+    stats = SummaryStats.from_counts(np.int64(4 * 10**9), np.int64(10**10))
+    assert stats.var == pytest.approx(0.4 * 0.6)
+
+
+def test_summary_from_packed():
+    sample = np.random.choice(2, 8 * BLOCK_SIZE + 13).astype(bool)
+    stats = SummaryStats.from_packed(np.packbits(sample), len(sample))
+    assert (stats.n, stats.total) == (len(sample), sample.sum())
+    assert stats.var == pytest.approx(np.var(sample, ddof=1))
+    # padding bits set by the caller are ignored
+    dirty = np.packbits(sample)
+    dirty[-1] |= 0xFF >> (len(sample) % 8)
+    assert SummaryStats.from_packed(dirty, len(sample)).total == sample.sum()
+    with pytest.raises(ValueError):
+        SummaryStats.from_packed(np.packbits(sample), len(sample) + 8)
+
+
+def test_cross_moments():
+    # many metrics, so the rows span several blocks
+    covariates = np.random.normal(0, 1, (1000, 200))
+    values = covariates + np.random.normal(0, 1, (1000, 200))
+    moments = CrossMoments.from_values(values, covariates)
+    assert moments.n == 1000
+    assert np.allclose(moments.mean_y, values.mean(axis=0))
+    assert np.allclose(moments.m2_x, 999 * covariates.var(axis=0, ddof=1))
+    expected = [np.cov(covariates[:, i], values[:, i])[0, 1] * 999
+                for i in range(200)]
+    assert np.allclose(moments.c_xy, expected)
+
+
+def test_summary_from_sums():
+    sample = np.random.normal(50, 1, 10)
+    stats = SummaryStats.from_sums(len(sample), sample.sum(),
+                                   (sample**2).sum())
+    assert stats.mean == pytest.approx(np.mean(sample))
+    assert stats.std == pytest.approx(np.std(sample, ddof=1))
+
+
+def test_summary_from_counts():
+    sample = np.random.choice(2, 100, p=[0.5, 0.5])
+    stats = SummaryStats.from_counts(sample.sum(), len(sample))
+    assert stats.var == pytest.approx(np.var(sample, ddof=1))
+
+
+@pytest.mark.parametrize("module", [means, workout_means])
+def test_means_summary_input(module):
+    sample1 = np.random.normal(50, 1, 10)
+    sample2 = np.random.normal(51, 1, 12)
+    stats1 = SummaryStats.from_values(sample1)
+    stats2 = SummaryStats.from_values(sample2)
+    assert module.one_mean_conf_interval(stats1) == \
+        pytest.approx(module.one_mean_conf_interval(sample1))
+    assert module.one_mean_hypothesis(stats1, 50) == \
+        pytest.approx(module.one_mean_hypothesis(sample1, 50))
+    for pooled in [True, False]:
+        assert module.two_means_diff_conf_interval(
+            stats1, stats2, 0.9, pooled) == pytest.approx(
+            module.two_means_diff_conf_interval(sample1, sample2, 0.9,
+                                                pooled))
+        assert module.two_means_hypothesis(
+            stats1, stats2, pooled, "larger") == pytest.approx(
+            module.two_means_hypothesis(sample1, sample2, pooled, "larger"))
+    assert module.multiple_mean_hypothesis(stats1, sample2) == \
+        pytest.approx(module.multiple_mean_hypothesis(sample1, sample2))
+
+
+@pytest.mark.parametrize("module", [proportions, workout_props])
+def test_props_summary_input(module):
+    sample1 = np.random.choice(2, 100, p=[0.5, 0.5])
+    sample2 = np.random.choice(2, 100, p=[0.55, 0.45])
+    stats1 = SummaryStats.from_counts(sample1.sum(), len(sample1))
+    stats2 = SummaryStats.from_counts(sample2.sum(), len(sample2))
+    assert module.one_prop_conf_interval(stats1) == \
+        pytest.approx(module.one_prop_conf_interval(sample1))
+    assert module.one_prop_hypothesis(stats1, 0.4) == \
+        pytest.approx(module.one_prop_hypothesis(sample1, 0.4))
+    assert module.two_props_diff_conf_interval(stats1, stats2, 0.9) == \
+        pytest.approx(module.two_props_diff_conf_interval(sample1, sample2,
+                                                          0.9))
+    assert module.two_props_hypothesis(stats1, stats2) == \
+        pytest.approx(module.two_props_hypothesis(sample1, sample2))
+
+
+def test_summary_from_chunks():
+    sample1 = np.random.normal(50, 1, 1000)
+    sample2 = np.random.normal(51, 1, 800)
+    stats1 = SummaryStats.from_chunks(np.array_split(sample1, 7))
+    stats2 = SummaryStats.from_chunks(iter(np.array_split(sample2, 3)))
+    assert stats1.n == len(sample1)
+    assert workout_means.one_mean_conf_interval(stats1) == \
+        pytest.approx(workout_means.one_mean_conf_interval(sample1))
+    assert workout_means.two_means_hypothesis(stats1, stats2) == \
+        pytest.approx(workout_means.two_means_hypothesis(sample1, sample2))
+
+
+def test_summary_blocks():
+    sample = np.random.normal(1e6, 1, 200000)
+    stats = SummaryStats.from_values(sample)
+    assert stats.n == len(sample)
+    assert stats.mean == pytest.approx(np.mean(sample))
+    assert stats.var == pytest.approx(np.var(sample, ddof=1))
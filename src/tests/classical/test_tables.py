@@ -0,0 +1,55 @@
+""" Testing contingency tables built from raw codes
+
+"""
+import numpy as np
+import pandas as pd
+import classical.workout.categorical as workout
+from classical.summary import BLOCK_SIZE
+from classical.tables import ContingencyTable, contingency_table
+import pytest
+
+rng = np.random.default_rng(0)
+
+
+def test_contingency_table():
+    codes1 = rng.integers(-1, 3, 2 * BLOCK_SIZE + 5)
+    codes2 = rng.integers(0, 4, len(codes1))
+    table = contingency_table(codes1, codes2)
+    expected = np.zeros((3, 4), dtype=int)
+    valid = codes1 >= 0
+    np.add.at(expected, (codes1[valid], codes2[valid]), 1)
+    assert np.array_equal(table, expected)
+
+    chunks = [(codes1[i:i + 1000], codes2[i:i + 1000])
+              for i in range(0, len(codes1), 1000)]
+    streamed = ContingencyTable.from_chunks(chunks, 3, 4)
+    assert np.array_equal(streamed.observed, expected)
+    half = len(chunks) // 2
+    merged = ContingencyTable.from_chunks(chunks[:half], 3, 4) + \
+        ContingencyTable.from_chunks(chunks[half:], 3, 4)
+    assert np.array_equal(merged.observed, expected)
+    assert workout.two_categorical_hypothesis(table) == pytest.approx(
+        workout.two_categorical_hypothesis(expected))
+
+
+def test_contingency_table_categorical():
+    values1 = pd.Categorical(rng.choice(["a", "b", None], 500),
+                             categories=["a", "b", "c"])
+    values2 = pd.Series(rng.choice(["x", "y"], 500), dtype="category")
+    table = contingency_table(values1, values2)
+    expected = pd.crosstab(pd.Series(values1), values2, dropna=False)
+    assert table.shape == (3, 2)
+    assert np.array_equal(table, expected.reindex(["a", "b", "c"],
+                                                  fill_value=0).values)
+
+
+def test_contingency_table_out_of_range():
+    with pytest.raises(ValueError):
+        contingency_table(np.array([0, 3]), np.array([0, 1]), 3, 2)
+
+
+def test_contingency_table_float_codes():
+    with pytest.raises(ValueError):
+        contingency_table(np.array([0.0, 1.0]), np.array([0, 1]))
+    with pytest.raises(ValueError):
+        ContingencyTable(2, 2).update(np.array([0, 1]), np.array([0.0, 1.0]))
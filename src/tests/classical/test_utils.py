@@ -0,0 +1,66 @@
+""" Testing helper functions of the workout implementations
+
+"""
+import numpy as np
+import scipy.stats
+import classical.workout.utils as utils
+import pytest
+
+
+def test_t_critical_table():
+    utils.clear_critical_cache()
+    for df in [1, 7, 30, utils.TABLE_MAX_DF]:
+        expected = scipy.stats.t.ppf(0.975, df)
+        assert utils.get_t_critical(0.95, df) == pytest.approx(expected)
+    assert utils.critical_cache_info().table_hits == 4
+    assert utils.critical_cache_info().misses == 0
+
+
+def test_critical_cache():
+    utils.clear_critical_cache()
+    for _ in range(3):
+        t_critical = utils.get_t_critical(0.93, 12.5)
+        z_critical = utils.get_z_critical(0.93)
+    assert t_critical == pytest.approx(scipy.stats.t.ppf(0.965, 12.5))
+    assert z_critical == pytest.approx(scipy.stats.norm.ppf(0.965))
+    info = utils.critical_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (4, 2, 2)
+
+
+@pytest.fixture
+def restore_critical_cache():
+    config = (utils.CACHE_SIZE, utils.TABLE_MAX_DF, utils.TABLE_CONF_LEVELS)
+    yield
+    utils.configure_critical_cache(*config)
+
+
+def test_configure_critical_cache(restore_critical_cache):
+    utils.configure_critical_cache(cache_size=1, table_max_df=10)
+    utils.get_t_critical(0.95, 11)
+    utils.get_t_critical(0.95, 12)
+    info = utils.critical_cache_info()
+    assert (info.table_hits, info.misses, info.currsize) == (0, 2, 1)
+
+
+def test_pvalues_arrays():
+    values = np.linspace(-4, 4, 9)
+    df = np.arange(1, 10)
+    assert utils.get_t_pvalue(values, df) == pytest.approx(
+        scipy.stats.t.sf(np.abs(values), df) * 2)
+    assert utils.get_t_pvalue(values, df, "smaller") == pytest.approx(
+        scipy.stats.t.cdf(values, df))
+    assert utils.get_norm_pvalue(values, "larger") == pytest.approx(
+        scipy.stats.norm.sf(values))
+    assert utils.get_f_pvalue(np.abs(values), 2, df) == pytest.approx(
+        scipy.stats.f.sf(np.abs(values), 2, df))
+
+
+def test_pvalues_mixed_alternatives():
+    values = np.array([1.5, 1.5, 1.5])
+    alternatives = np.array(["two-sided", "larger", "smaller"])
+    expected = [utils.get_norm_pvalue(1.5, alternative)
+                for alternative in alternatives]
+    assert utils.get_norm_pvalue(values, alternatives) == \
+        pytest.approx(expected)
+    with pytest.raises(ValueError):
+        utils.get_t_pvalue(values, 3, ["two-sided", "larger", "bigger"])
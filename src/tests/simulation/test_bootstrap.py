@@ -0,0 +1,86 @@
+""" Testing bootstrap confidence intervals
+
+    testing whether bootstrap intervals agree with the closed form ones
+    of classical.means and with scipy.stats.bootstrap
+
+"""
+import numpy as np
+import scipy.stats
+import classical.workout.means as means
+import simulation.bootstrap as bootstrap
+import pytest
+
+np.random.seed(0)
+
+
+def test_mean_conf_interval():
+    sample = np.random.normal(50, 1, 200)
+    lower, upper = bootstrap.one_sample_conf_interval(sample, seed=0)
+    expected = means.one_mean_conf_interval(sample)
+    assert (lower, upper) == pytest.approx(expected, abs=0.03)
+
+
+def test_means_diff_conf_interval():
+    sample1 = np.random.normal(50, 1, 300)
+    sample2 = np.random.normal(51, 2, 200)
+    ci = bootstrap.two_samples_diff_conf_interval(sample1, sample2, seed=0,
+                                                  method="bca")
+    expected = means.two_means_diff_conf_interval(sample1, sample2, 0.95)
+    assert ci == pytest.approx(expected, abs=0.05)
+
+
+@pytest.mark.parametrize("statistic", ["median", np.std])
+def test_bca_matches_scipy(statistic):
+    sample = np.random.exponential(2, 100)
+    ci = bootstrap.one_sample_conf_interval(sample, statistic, method="bca",
+                                            n_resamples=20000, seed=1)
+    func = np.median if statistic == "median" else statistic
+    expected = scipy.stats.bootstrap((sample,), func, method="BCa",
+                                     n_resamples=20000, random_state=1)
+    assert ci == pytest.approx(tuple(expected.confidence_interval),
+                               rel=0.05)
+
+
+def test_blocks_and_jobs_are_deterministic(monkeypatch):
+    sample1 = np.random.choice(2, 500)
+    sample2 = np.random.choice(2, 400)
+    blocks = []
+    resample_block = bootstrap._resample_block
+
+    def count_blocks(*args):
+        blocks.append(args)
+        return resample_block(*args)
+
+    monkeypatch.setattr(bootstrap, "_resample_block", count_blocks)
+    # 100 resamples per block
+    single = bootstrap.resample_statistic((sample1, sample2), "proportion",
+                                          n_resamples=1000, seed=3,
+                                          max_block_bytes=800)
+    monkeypatch.undo()
+    parallel = bootstrap.resample_statistic((sample1, sample2), "proportion",
+                                            n_resamples=1000, seed=3,
+                                            max_block_bytes=800, n_jobs=2)
+    assert len(blocks) == 10
+    assert len(single) == 1000
+    assert np.array_equal(single, parallel)
+
+
+def test_large_resamples_are_split_by_columns():
+    sample = np.random.normal(50, 2, 1000)
+    # a resample needs 16000 bytes, 100 resamples of 5 columns fit in 8000
+    boot = bootstrap.resample_statistic((sample,), "mean", n_resamples=2000,
+                                        seed=4, max_block_bytes=8000)
+    assert len(boot) == 2000
+    assert np.mean(boot) == pytest.approx(np.mean(sample), abs=0.01)
+    assert np.std(boot) == pytest.approx(np.std(sample) / np.sqrt(1000),
+                                         rel=0.1)
+    boot = bootstrap.resample_statistic((sample,), "median",
+                                        n_resamples=300, seed=4,
+                                        max_block_bytes=8000)
+    assert len(boot) == 300
+    assert np.median(boot) == pytest.approx(np.median(sample), abs=0.1)
+
+
+def test_invalid_method():
+    with pytest.raises(ValueError):
+        bootstrap.one_sample_conf_interval(np.arange(10), method="basic")
@@ -0,0 +1,62 @@
+""" Testing permutation tests
+
+    testing whether permutation p values agree with exact ones computed by
+    scipy
+
+"""
+import numpy as np
+import scipy.stats
+from classical.summary import SummaryStats
+import simulation.permutation as permutation
+import pytest
+
+np.random.seed(0)
+
+
+@pytest.mark.parametrize("alternative", ["two-sided", "larger", "smaller"])
+def test_means_permutation_test(alternative):
+    rng = np.random.default_rng(0)
+    sample1 = rng.normal(50, 1, 7)
+    sample2 = rng.normal(51, 1, 6)
+    diff, p_value = permutation.two_means_permutation_test(
+        sample1, sample2, alternative, n_permutations=100000, seed=0)
+
+    def statistic(x, y, axis=-1):
+        diff = np.mean(x, axis=axis) - np.mean(y, axis=axis)
+        # scipy doubles the smaller tail for two sided tests
+        return np.abs(diff) if alternative == "two-sided" else diff
+
+    scipy_alternative = {"smaller": "less"}.get(alternative, "greater")
+    expected = scipy.stats.permutation_test(
+        (sample1, sample2), statistic, permutation_type="independent",
+        alternative=scipy_alternative, n_resamples=np.inf, vectorized=True)
+    assert diff == pytest.approx(np.mean(sample1) - np.mean(sample2))
+    assert p_value == pytest.approx(expected.pvalue, abs=0.01)
+
+
+def test_props_permutation_test():
+    sample1 = np.random.choice(2, 60, p=[0.4, 0.6])
+    sample2 = np.random.choice(2, 50, p=[0.6, 0.4])
+    diff, p_value = permutation.two_props_permutation_test(
+        sample1, SummaryStats.from_counts(sample2.sum(), len(sample2)),
+        "larger", n_permutations=50000, seed=0)
+    table = [[sample1.sum(), len(sample1) - sample1.sum()],
+             [sample2.sum(), len(sample2) - sample2.sum()]]
+    _, expected = scipy.stats.fisher_exact(table, alternative="greater")
+    assert diff == pytest.approx(sample1.mean() - sample2.mean())
+    assert p_value == pytest.approx(expected, abs=0.005)
+
+
+def test_early_stopping_is_deterministic():
+    sample1 = np.random.normal(50, 1, 100)
+    sample2 = np.random.normal(50, 1, 100)
+    results = [permutation.two_means_permutation_test(
+        sample1, sample2, n_permutations=100000, precision=0.01, seed=1,
+        n_jobs=n_jobs) for n_jobs in [1, 2]]
+    assert results[0] == results[1]
+
+
+def test_invalid_permutations():
+    with pytest.raises(ValueError):
+        permutation.two_means_permutation_test([1.0, 2.0], [3.0, 4.0],
+                                               n_permutations=0)